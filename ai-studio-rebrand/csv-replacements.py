@@ -9,10 +9,15 @@
 # - DEBUG: Set to 'true' to enable debug output (optional)
 
 import os
+import sys
 import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+# Use the shared text I/O of the scripts in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from textio import format_quarantine, read_text, encode_text, UndecodableFile
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -64,21 +69,20 @@ print(f"Found {len(files_to_process)} files to process")
 # Process files with progress bar
 file_count = 0
 modified_files = 0
+quarantined = []
 
 with tqdm(files_to_process, desc="Processing files", unit="file") as pbar:
     for file_path in pbar:
         file_count += 1
         
-        # Read the file
+        # Read the file in whatever encoding it has
         try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                original_content = f.read()
-        except UnicodeDecodeError:
-            if debug_mode:
-                print(f"  Skipped {file_path}: encoding error")
+            text_file = read_text(file_path)
+        except UndecodableFile as error:
+            quarantined.append((file_path, str(error)))
             continue
         
-        content = original_content
+        original_content = content = text_file.text
         replacements_made = 0
         
         # Apply all CSV replacements
@@ -90,11 +94,18 @@ with tqdm(files_to_process, desc="Processing files", unit="file") as pbar:
         
         # Write the file if changes were made
         if content != original_content:
+            try:
+                data = encode_text(content, text_file)
+            except UndecodableFile as error:
+                quarantined.append((file_path, str(error)))
+                continue
             modified_files += 1
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
             if debug_mode:
                 print(f"  Modified {file_path}: {replacements_made} replacement(s) applied")
 
+if quarantined:
+    print(format_quarantine(quarantined))
 print(f'✓ Completed! Total files processed: {file_count}, Files modified: {modified_files}')
\ No newline at end of file
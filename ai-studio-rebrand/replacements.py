@@ -37,10 +37,8 @@ replacements = pd.read_csv(replacements_file).to_dict('records')
 print(f"Using replacements file: {replacements_file}")
 print(f"Loaded {len(replacements)} replacement rules")
 # ml replacements does NOT have studio UI replaced with AI Foundry portal!  All other directories do.
-# if "articles/machine-learning" in path:
-#     # remove the studio UI replacement
-#     replacements = [replacement for replacement in replacements if replacement['search'] != 'Studio UI']
-#     replacements = [replacement for replacement in replacements if replacement['search'] != 'studio UI']
+# The rebrand scripts in the parent folder handle this with a .rebrand/remove.csv overlay in
+# articles/machine-learning (see the README) instead of a special case here.
 
 # Build list of files to process first
 print("Scanning directory...")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+## Run this script to check the rules in patterns/*.csv for conflicts
+# This script reads first_mention.csv, always.csv, cleanup.csv and never.csv and reports:
+# - shadowed: a shorter term earlier in the same file rewrites every occurrence of a longer term first
+# - overlapping: terms that nest or overlap, so the result depends on which runs first
+# - cyclic: a replacement contains a term that runs earlier (or its own term), so reruns keep rewriting
+# - dead: rules that can never change anything (same replacement, protected by never.csv,
+#   or rewritten by an earlier pattern file first)
+# It also prints the longest-match-first order that the rebrand scripts run the rules in.
+#
+# Usage:
+#   python analyze-rules.py            # report conflicts
+#   python analyze-rules.py --order    # also print the compiled rule order
+#   python analyze-rules.py --verbose  # also list every chain where one rule feeds another
+
+import argparse
+from engine import load_rule_engine
+from rule_analysis import analyze_rules, describe
+
+KINDS = ('shadowed', 'dead', 'cyclic', 'overlapping', 'chain')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report shadowed, overlapping, cyclic and dead rules in patterns/*.csv")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    parser.add_argument('--order', action='store_true', help="Print the compiled longest-match-first rule order")
+    parser.add_argument('--verbose', action='store_true', help="List chains where one replacement feeds another rule")
+    args = parser.parse_args()
+
+    engine = load_rule_engine(args.patterns)
+    findings = analyze_rules(engine.rules, engine.never_terms)
+
+    print(f"Analyzed {len(engine.rules)} rules and {len(engine.never_terms)} never-replace terms")
+    print("=" * 60)
+    for kind in KINDS:
+        kind_findings = [finding for finding in findings if finding['kind'] == kind]
+        if not kind_findings:
+            continue
+        if kind == 'chain' and not args.verbose:
+            print(f"\n{len(kind_findings)} chain(s) where a replacement feeds a later rule (use --verbose to list)")
+            continue
+        print(f"\n{kind.upper()} ({len(kind_findings)})")
+        print("-" * 60)
+        for finding in kind_findings:
+            print(f"  {describe(finding['rule'])}: {finding['message']}")
+
+    if engine.cycles:
+        print("\nORDER CONFLICTS")
+        print("-" * 60)
+        for predecessor, rule in engine.cycles:
+            print(f"  {describe(predecessor)} and {describe(rule)} each need to run first")
+
+    if args.order:
+        print("\nCOMPILED ORDER")
+        print("-" * 60)
+        for position, rule in enumerate(engine.plan, 1):
+            moved = " (moved)" if engine.rules.index(rule) != position - 1 else ""
+            print(f"  {position:3}. {describe(rule)}{moved}")
+
+    moved = sum(1 for rule, original in zip(engine.plan, engine.rules) if rule is not original)
+    print("\n" + "=" * 60)
+    print(f"✓ The rebrand scripts run these rules longest-match-first ({moved} rule(s) run earlier than their CSV row)")
+
+
+if __name__ == '__main__':
+    main()
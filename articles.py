@@ -0,0 +1,108 @@
+"""
+Fix the indefinite article in front of rewritten terms.
+
+A rebrand can change the first sound of a term ("an Azure AI Speech resource"
+becomes "a Speech resource"), so the article before it has to follow. Instead of
+cleanup rules for every "an X" spelling, the rule engine hands the spans of the
+replacements it just made to fix_articles, which only looks at the text right
+before each of them.
+"""
+import re
+
+# Words that start with a vowel letter but a consonant sound, and the other way around
+CONSONANT_SOUND_PREFIXES = ('eu', 'one', 'once', 'uni', 'use', 'usa', 'usi', 'usu', 'uti', 'ubi', 'uro')
+VOWEL_SOUND_PREFIXES = ('hour', 'honest', 'honor', 'heir')
+
+# Letters whose names start with a vowel sound, for acronyms read letter by letter ("an SDK")
+VOWEL_SOUND_LETTERS = 'AEFHILMNORSX'
+
+# Longer words in all caps are read as words ("A FOUNDRY PROJECT")
+MAX_ACRONYM_LENGTH = 4
+
+# An article right before a span: the article, its space and an optional link bracket
+_ARTICLE_BEFORE = re.compile(r'(?:^|(?<=\W))(an?) \[?$', re.IGNORECASE)
+
+# How far back to look for the article
+_LOOKBEHIND = 4
+
+
+def indefinite_article(phrase):
+    """Return 'a' or 'an' for a phrase, from the sound of its first word.
+
+    Args:
+        phrase: The text that follows the article
+
+    Returns:
+        str: 'an' if the first word starts with a vowel sound, otherwise 'a'
+             (None if the phrase doesn't start with a letter or digit)
+    """
+    word = re.match(r'[^\W_]*', phrase).group()
+    if not word:
+        return None
+    lower = word.lower()
+    if word.isupper() and 1 < len(word) <= MAX_ACRONYM_LENGTH:
+        return 'an' if word[0] in VOWEL_SOUND_LETTERS else 'a'
+    if lower.startswith(VOWEL_SOUND_PREFIXES) or lower.startswith('8') or lower in ('11', '18'):
+        return 'an'
+    if lower.startswith(CONSONANT_SOUND_PREFIXES):
+        return 'a'
+    return 'an' if lower[0] in 'aeiou' else 'a'
+
+
+def _in_case_of(article, written):
+    """Write article in the case of the article it replaces."""
+    if len(written) > 1 and written.isupper():
+        return article.upper()
+    if written[0].isupper():
+        return article.capitalize()
+    return article
+
+
+def article_edits(text, spans):
+    """Find the indefinite articles in front of the spans that don't match the span's first sound.
+
+    Args:
+        text: The text after the replacements
+        spans: List of (start, end) spans of the replacements, in document order
+
+    Returns:
+        list: (start, end, article) edits in document order
+    """
+    edits = []
+    for start, end in spans:
+        match = _ARTICLE_BEFORE.search(text, max(0, start - _LOOKBEHIND), start)
+        if not match:
+            continue
+        article = indefinite_article(text[start:end])
+        written = match.group(1)
+        if article is None or written.lower() == article:
+            continue
+        edits.append((match.start(1), match.end(1), _in_case_of(article, written)))
+    return edits
+
+
+def apply_edits(text, edits):
+    """Apply (start, end, new_text) edits in document order to a text."""
+    if not edits:
+        return text
+    parts = []
+    last = 0
+    for start, end, new_text in edits:
+        parts.append(text[last:start])
+        parts.append(new_text)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def fix_articles(text, spans):
+    """Fix the indefinite article in front of each span.
+
+    Args:
+        text: The text after the replacements
+        spans: List of (start, end) spans of the replacements, in document order
+
+    Returns:
+        str: The text with "a"/"an" before each span matching the span's first sound
+    """
+    return apply_edits(text, article_edits(text, spans))
@@ -0,0 +1,432 @@
+"""
+Binary change log of the replacements a rebrand run made, and reverting them.
+
+Every file a run rewrites gets one record in the log: the file's path and each
+replacement with its line, column, old text, new text and the rule that made it.
+The engine reports each replacement to a Replacements tracker as the rule makes
+it, and the tracker keeps them in the coordinates of the text as it changes, so
+the log says exactly which rule replaced what, without comparing the file before
+and after. When a rule rewrites the output of an earlier rule, the two are one
+change made by both rules. The article fixed in front of a replacement is a
+change of the same rule.
+
+The log is a folder of append-only files, one per run and process, so the worker
+processes never write to the same file. By default it is .rebrand-cache/changes
+under the root of the processed tree, next to the include cache. Strings and numbers are stored as
+LEB128 varints and UTF-8, and each record names its rules once.
+
+Reverting replays the log newest change first and puts back the old text of the
+selected changes only, so other edits to the files are kept.
+"""
+import fnmatch
+import os
+import re
+import time
+from collections import namedtuple
+from textio import encode_text, read_text, UndecodableFile
+
+DEFAULT_LOG_DIR = os.path.join('.rebrand-cache', 'changes')
+LOG_EXTENSION = '.rbcl'
+MAGIC = b'RBCL\x01'
+
+# line is 1-based, col is the 0-based offset in the line after the change;
+# rules is a tuple of the terms of the rules that made it
+Change = namedtuple('Change', 'line col old new rules')
+
+# One file rewritten by one run
+FileChanges = namedtuple('FileChanges', 'log_file path changes')
+
+# A replacement in the current text: text[start:end] is its new text, old the text it replaced
+Replacement = namedtuple('Replacement', 'start end old rules')
+
+
+def log_dir_for(root):
+    """Return the default change log folder of the tree under root."""
+    return os.path.join(os.path.abspath(root), DEFAULT_LOG_DIR)
+
+
+def change_log_from_env(root, directory=None):
+    """Return the ChangeLog of a run over root: the directory argument, else the CHANGE_LOG
+    environment variable, else .rebrand-cache/changes under root. 'off' (or an empty value)
+    turns the log off and returns None."""
+    if directory is None:
+        directory = os.getenv('CHANGE_LOG')
+    if directory is None:
+        directory = log_dir_for(root)
+    if not directory or directory.lower() in ('off', 'false', '0', 'no'):
+        return None
+    return ChangeLog(directory)
+
+
+class Replacements:
+    """The replacements made to one text while it is rebranded.
+
+    Attributes:
+        counts: Number of replacements per rule term (article fixes aren't counted)
+        positions: Whether the replacements themselves are kept, for the change log;
+                   without them only the counts are
+        entries: Replacement tuples in document order, in the coordinates of the current text
+    """
+
+    def __init__(self, positions=True):
+        self.positions = positions
+        self.counts = {}
+        self.entries = []
+
+    def clear(self):
+        """Forget everything, for a text that is rebranded again from the start."""
+        self.counts = {}
+        self.entries = []
+
+    def update(self, text, edits, count=True):
+        """Record the edits one step made to the text.
+
+        Args:
+            text: The text before the step
+            edits: (start, end, new_text, rule) tuples in text, in document order and not
+                   overlapping; rule is the term of the rule that made the edit, or None for an
+                   edit that isn't a replacement (putting back a protected term)
+            count: Whether to add the edits to the counts
+        """
+        if count:
+            for edit in edits:
+                if edit[3] is not None:
+                    self.counts[edit[3]] = self.counts.get(edit[3], 0) + 1
+        if not self.positions or not edits:
+            return
+
+        # Group the recorded replacements and the edits that overlap into components
+        items = sorted([(entry.start, entry.end, 0, entry) for entry in self.entries]
+                       + [(edit[0], edit[1], 1, edit) for edit in edits], key=lambda item: (item[0], item[2]))
+        components = []
+        for item in items:
+            if components and item[0] < components[-1][1]:
+                components[-1][1] = max(components[-1][1], item[1])
+                components[-1][2].append(item)
+            else:
+                components.append([item[0], item[1], [item]])
+
+        entries = []
+        delta = 0
+        for start, end, members in components:
+            found = [item[3] for item in members if item[2] == 0]
+            made = [item[3] for item in members if item[2] == 1]
+            if not made:
+                entries.append(found[0]._replace(start=start + delta, end=end + delta))
+                continue
+            # The new text applies the edits to the current text, the old text puts back what the
+            # recorded replacements replaced
+            new_text = _splice(text, start, end, [(edit[0], edit[1], edit[2]) for edit in made])
+            old_text = _splice(text, start, end, [(entry.start, entry.end, entry.old) for entry in found])
+            rules = tuple(dict.fromkeys([rule for entry in found for rule in entry.rules]
+                                        + [edit[3] for edit in made if edit[3] is not None]))
+            if rules:
+                entries.append(Replacement(start + delta, start + delta + len(new_text), old_text, rules))
+            delta += len(new_text) - (end - start)
+        self.entries = entries
+
+    def merge(self, other, place=None):
+        """Add the replacements another tracker recorded in a part of the text.
+
+        Args:
+            other: Replacements of the part; they come after the replacements recorded so far
+            place: Function that moves a Replacement of the part to this text, or returns None to
+                   drop it (default: keep it where it is)
+        """
+        for rule, count in other.counts.items():
+            self.counts[rule] = self.counts.get(rule, 0) + count
+        if self.positions:
+            entries = other.entries if place is None else (place(entry) for entry in other.entries)
+            self.entries.extend(entry for entry in entries if entry is not None)
+
+    def changes(self, text):
+        """Return the recorded replacements as Change tuples.
+
+        Args:
+            text: The current text (the text the last update produced)
+        """
+        changes = []
+        line = 1
+        line_start = position = 0
+        for entry in self.entries:
+            if text[entry.start:entry.end] == entry.old:
+                # A later rule put the old text back
+                continue
+            newlines = text.count('\n', position, entry.start)
+            if newlines:
+                line += newlines
+                line_start = text.rindex('\n', position, entry.start) + 1
+            position = entry.start
+            changes.append(Change(line, entry.start - line_start, entry.old, text[entry.start:entry.end], entry.rules))
+        return changes
+
+
+def _splice(text, start, end, parts):
+    """Return text[start:end] with the (part_start, part_end, new_text) parts in it replaced."""
+    pieces = []
+    last = start
+    for part_start, part_end, new_text in parts:
+        pieces.append(text[last:part_start])
+        pieces.append(new_text)
+        last = part_end
+    pieces.append(text[last:end])
+    return ''.join(pieces)
+
+
+class Rewritten:
+    """Task result for a file that was rewritten, with the number of replacements per rule term.
+
+    It is true, like the result of a task that changed its file. When the change log is on,
+    it also carries the Change tuples of the file, for the identical files that get a copy.
+    """
+
+    def __init__(self, rules, changes=()):
+        self.rules = rules
+        self.changes = changes
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"Rewritten({self.rules!r})"
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _write_string(out, text):
+    data = text.encode('utf-8')
+    _write_varint(out, len(data))
+    out.extend(data)
+
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _read_string(data, position):
+    length, position = _read_varint(data, position)
+    return data[position:position + length].decode('utf-8'), position + length
+
+
+def encode_record(path, changes):
+    """Encode the changes of one file as a log record."""
+    rule_names = list(dict.fromkeys(rule for change in changes for rule in change.rules))
+    index = {rule: i for i, rule in enumerate(rule_names)}
+    out = bytearray()
+    _write_string(out, path)
+    _write_varint(out, len(rule_names))
+    for rule in rule_names:
+        _write_string(out, rule)
+    _write_varint(out, len(changes))
+    for change in changes:
+        _write_varint(out, change.line)
+        _write_varint(out, change.col)
+        _write_string(out, change.old)
+        _write_string(out, change.new)
+        _write_varint(out, len(change.rules))
+        for rule in change.rules:
+            _write_varint(out, index[rule])
+    return bytes(out)
+
+
+def decode_records(data):
+    """Decode the records of a log file.
+
+    Returns:
+        list: (path, changes) tuples in the order they were written
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("not a rebrand change log")
+    records = []
+    position = len(MAGIC)
+    while position < len(data):
+        path, position = _read_string(data, position)
+        count, position = _read_varint(data, position)
+        rule_names = []
+        for _ in range(count):
+            rule, position = _read_string(data, position)
+            rule_names.append(rule)
+        count, position = _read_varint(data, position)
+        changes = []
+        for _ in range(count):
+            line, position = _read_varint(data, position)
+            col, position = _read_varint(data, position)
+            old, position = _read_string(data, position)
+            new, position = _read_string(data, position)
+            rule_count, position = _read_varint(data, position)
+            rules = []
+            for _ in range(rule_count):
+                rule, position = _read_varint(data, position)
+                rules.append(rule_names[rule])
+            changes.append(Change(line, col, old, new, tuple(rules)))
+        records.append((path, changes))
+    return records
+
+
+class ChangeLog:
+    """The change log folder of a run; each process appends to its own file in it."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        # Log files sort in run order
+        self.run_id = f"{time.time_ns():020d}"
+
+    def log_file(self):
+        """Return the log file of this run in the current process."""
+        return os.path.join(self.directory, f"{self.run_id}-{os.getpid()}{LOG_EXTENSION}")
+
+    def record(self, file_path, changes, copies=()):
+        """Record the changes a rebrand made to one file.
+
+        Args:
+            file_path: Path of the file
+            changes: Change tuples, from Replacements.changes
+            copies: Paths of identical files that got the same new text
+        """
+        for path in (file_path,) + tuple(copies):
+            if changes:
+                append_record(self.log_file(), os.path.abspath(path), changes)
+
+
+def append_record(log_file, path, changes):
+    """Append one file's changes to a log file, creating it if needed."""
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    with open(log_file, 'ab') as f:
+        if f.tell() == 0:
+            f.write(MAGIC)
+        f.write(encode_record(path, changes))
+
+
+def read_change_log(directory):
+    """Read every record of a change log folder, oldest run first.
+
+    Returns:
+        list: FileChanges tuples
+    """
+    if not os.path.isdir(directory):
+        return []
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(LOG_EXTENSION):
+            continue
+        log_file = os.path.join(directory, name)
+        with open(log_file, 'rb') as f:
+            data = f.read()
+        records.extend(FileChanges(log_file, path, changes) for path, changes in decode_records(data))
+    return records
+
+
+def select_changes(records, rule=None, path_glob=None, root='.'):
+    """Pick the changes to revert.
+
+    Args:
+        records: FileChanges tuples from read_change_log
+        rule: Only the changes made by the rule with this term (optional)
+        path_glob: Only the files whose path matches this glob, relative to root or absolute (optional)
+        root: Folder that relative globs start from
+
+    Returns:
+        list: (record_index, change_index) tuples
+    """
+    selected = []
+    for record_index, record in enumerate(records):
+        if path_glob is not None:
+            relative = os.path.relpath(record.path, os.path.abspath(root)).replace(os.sep, '/')
+            if not (fnmatch.fnmatch(relative, path_glob) or fnmatch.fnmatch(record.path.replace(os.sep, '/'), path_glob)):
+                continue
+        for change_index, change in enumerate(record.changes):
+            if rule is None or rule in change.rules:
+                selected.append((record_index, change_index))
+    return selected
+
+
+def _undo(lines, change):
+    """Put back the old text of one change; returns False if the new text is no longer where it was."""
+    # The lines the new text spans, from the line it starts on
+    line_count = change.new.count('\n') + 1
+    index = change.line - 1
+    if index + line_count > len(lines):
+        return False
+    segment = '\n'.join(lines[index:index + line_count])
+    col = change.col
+    if segment[col:col + len(change.new)] != change.new:
+        # The lines were edited since: use the closest occurrence of the new text
+        found = [match.start() for match in re.finditer(re.escape(change.new), segment)] if change.new else []
+        if not found:
+            return False
+        col = min(found, key=lambda position: abs(position - change.col))
+    lines[index:index + line_count] = (segment[:col] + change.old + segment[col + len(change.new):]).split('\n')
+    return True
+
+
+def revert_changes(records, selected, dry_run=False):
+    """Revert the selected changes in the files, newest change first.
+
+    Args:
+        records: FileChanges tuples from read_change_log
+        selected: (record_index, change_index) tuples from select_changes
+        dry_run: Only count what would be reverted
+
+    Returns:
+        tuple: (reverted, missing) lists of (record_index, change_index); a change is missing
+               when its new text is no longer in the file, or the file can't be read
+    """
+    by_path = {}
+    for record_index, change_index in selected:
+        by_path.setdefault(records[record_index].path, []).append((record_index, change_index))
+
+    reverted, missing = [], []
+    for path, items in by_path.items():
+        try:
+            text_file = read_text(path)
+        except (OSError, UndecodableFile):
+            missing.extend(items)
+            continue
+        lines = text_file.text.split('\n')
+        # Newest record first, and right to left within a record
+        for record_index, change_index in sorted(items, key=lambda item: (-item[0], -item[1])):
+            if _undo(lines, records[record_index].changes[change_index]):
+                reverted.append((record_index, change_index))
+            else:
+                missing.append((record_index, change_index))
+        text = '\n'.join(lines)
+        if not dry_run and text != text_file.text:
+            data = encode_text(text, text_file)
+            with open(path, 'wb') as f:
+                f.write(data)
+    return reverted, missing
+
+
+def drop_changes(records, dropped):
+    """Rewrite the log files without the dropped (record_index, change_index) changes."""
+    dropped = set(dropped)
+    log_files = {}
+    for record_index, record in enumerate(records):
+        changes = [change for change_index, change in enumerate(record.changes) if (record_index, change_index) not in dropped]
+        log_files.setdefault(record.log_file, [])
+        if changes:
+            log_files[record.log_file].append((record.path, changes))
+    for log_file, kept in log_files.items():
+        if not kept:
+            os.remove(log_file)
+            continue
+        with open(log_file, 'wb') as f:
+            f.write(MAGIC)
+            for path, changes in kept:
+                f.write(encode_record(path, changes))
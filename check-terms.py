@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+## Run this script to find terms that still need to be rebranded, without changing any file
+# This script reports every occurrence that rebrand-md.py and rebrand-yml.py would change:
+# first_mention.csv and always.csv terms outside "formerly" contexts and cleanup.csv terms
+# (such as old bookmarks). Never-replace terms from never.csv are skipped.
+# Pages that pull in shared content with [!INCLUDE] are scoped over the include graph
+# of the docs tree, like rebrand-md.py does, so a page is checked as it will be rewritten.
+# Each finding is printed as file:line:col with the replacement the scripts would use.
+# The exit code is 1 if anything was found, so it can be used as a pre-commit hook or CI check.
+#
+# Files used:
+# - patterns/first_mention.csv, always.csv, cleanup.csv, never.csv, formerly.csv: Same rules as the rebrand scripts
+# - patterns/skip_folders.csv, patterns/include_paths.csv: Folders to skip and paths to include when a directory is checked (optional)
+#
+# Environment variables:
+# - DIRECTORY_PATH: Directory to check (used when no paths are given)
+# - DEBUG: Set to 'true' to enable debug output (optional)
+#
+# Usage:
+#   python check-terms.py                             # check DIRECTORY_PATH
+#   python check-terms.py articles/a.md articles/b.yml # check only these files (or directories)
+#   python check-terms.py --staged path/to/docs-repo  # check the files staged for commit in a git repo
+#   python check-terms.py --format github             # GitHub Actions annotations (also: gcc, json)
+#   python check-terms.py --profile                   # also write cProfile stats (or --trace-memory for tracemalloc)
+
+import argparse
+import os
+import subprocess
+import sys
+from dotenv import load_dotenv
+from engine import load_rule_engine
+from includes import cache_file_for, IncludeScopes
+from overlays import RuleResolver
+from path_rules import load_path_rules
+from profiling import add_profiling_arguments, profile_run
+from term_check import TermChecker, format_diagnostics, FORMATS
+from term_scan import find_scan_files, MARKDOWN_EXTENSIONS, YAML_EXTENSIONS
+
+
+def staged_files(repo_path):
+    """Return the paths of the files added, copied, modified or renamed in the git index of a repo."""
+    top_level = subprocess.run(['git', '-C', repo_path, 'rev-parse', '--show-toplevel'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    names = subprocess.run(['git', '-C', top_level, 'diff', '--cached', '--name-only', '--diff-filter=ACMR', '-z'],
+                           capture_output=True, text=True, check=True).stdout
+    return [os.path.join(top_level, name) for name in names.split('\0') if name]
+
+
+def overlay_root(paths):
+    """Return the directory whose .rebrand/ overlays apply to the checked paths.
+
+    Like the rebrand scripts, this is DIRECTORY_PATH when it holds every path, else the
+    top level of the git repo of the paths, so overlays in folders above a single
+    checked file still apply. Without either, it's the common folder of the paths.
+    """
+    folders = [os.path.abspath(path if os.path.isdir(path) else os.path.dirname(path) or '.') for path in paths]
+    if not folders:
+        return os.getcwd()
+    common = os.path.commonpath(folders)
+    directory = os.getenv('DIRECTORY_PATH')
+    if directory and os.path.commonpath([os.path.abspath(directory), common]) == os.path.abspath(directory):
+        return os.path.abspath(directory)
+    top_level = subprocess.run(['git', '-C', common, 'rev-parse', '--show-toplevel'], capture_output=True, text=True)
+    if top_level.returncode == 0 and top_level.stdout.strip():
+        return os.path.abspath(top_level.stdout.strip())
+    return common
+
+
+def files_to_check(paths, path_rules):
+    """Expand directories (with the skip and include rules of path_rules) and keep the .md, .yml and .yaml files."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(find_scan_files(path, path_rules))
+        elif path.endswith(MARKDOWN_EXTENSIONS + YAML_EXTENSIONS) and os.path.exists(path):
+            files.append(path)
+    # special case: skip the new-name file which announces the change.
+    return [file_path for file_path in files if "new-name.md" not in os.path.basename(file_path)]
+
+
+def include_scopes(files, paths, root, engine, rules, path_rules, debug_mode=False):
+    """Return the first mention scope of each markdown file to check.
+
+    Like rebrand-md.py, the include graph covers every markdown file of the docs tree,
+    so a checked include file also sees the pages that include it.
+
+    Args:
+        files: Files to check, from files_to_check
+        paths: The paths given on the command line
+        root: Directory of the docs tree, from overlay_root
+        engine: RuleEngine with the rules of patterns/
+        rules: RuleResolver with the rules of each folder, whose first mention rules scope its pages
+        path_rules: path_rules.PathRules to skip and include files by
+        debug_mode: Whether to print debug information
+
+    Returns:
+        dict: File path -> scope from IncludeScopes.scope
+    """
+    markdown = [file_path for file_path in files if file_path.endswith(MARKDOWN_EXTENSIONS)]
+    if not markdown:
+        return {}
+    tree = markdown
+    if root not in {os.path.abspath(path) for path in paths if os.path.isdir(path)}:
+        tree = markdown + [file_path for file_path in find_scan_files(root, path_rules)
+                           if file_path.endswith(MARKDOWN_EXTENSIONS)]
+    tree = list(dict.fromkeys(os.path.abspath(file_path) for file_path in tree))
+    scopes = IncludeScopes(tree, engine, rules, cache_file_for(root), debug_mode)
+    return {file_path: scopes.scope(file_path) for file_path in markdown}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report terms that still need to be rebranded (read-only)")
+    parser.add_argument('paths', nargs='*', help="Files or directories to check (defaults to DIRECTORY_PATH)")
+    parser.add_argument('--staged', metavar='REPO', help="Check the files staged for commit in this git repo")
+    parser.add_argument('--format', choices=FORMATS, default='gcc', help="Output format (default gcc)")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    add_profiling_arguments(parser, slow_log=False)
+    args = parser.parse_args()
+
+    load_dotenv()
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+
+    paths = list(args.paths)
+    if args.staged:
+        paths.extend(staged_files(args.staged))
+    elif not paths:
+        directory = os.getenv('DIRECTORY_PATH')
+        if not directory:
+            print("Error: no paths given and DIRECTORY_PATH not found in .env file", file=sys.stderr)
+            return 2
+        paths = [directory]
+
+    with profile_run(args):
+        path_rules = load_path_rules(args.patterns, debug_mode=debug_mode)
+        # Rules per folder, with the .rebrand/ overlays of the docs tree applied
+        root = overlay_root(paths)
+        engine = load_rule_engine(args.patterns, debug_mode=debug_mode)
+        rules = RuleResolver(engine, root, debug_mode)
+        checkers = {}
+
+        diagnostics = []
+        files = files_to_check(paths, path_rules)
+        # First mention scopes over the include graph, so findings match what rebrand-md.py writes
+        scopes = include_scopes(files, paths, root, engine, rules, path_rules, debug_mode)
+        for file_path in files:
+            engine = rules.engine_for(file_path)
+            if id(engine) not in checkers:
+                checkers[id(engine)] = TermChecker(engine)
+            diagnostics.extend(checkers[id(engine)].check_file(file_path, scopes.get(file_path)))
+
+    if diagnostics or args.format == 'json':
+        print(format_diagnostics(diagnostics, args.format))
+    if debug_mode or args.format == 'gcc':
+        affected = len({diagnostic.path for diagnostic in diagnostics})
+        print(f"Checked {len(files)} files: {len(diagnostics)} term(s) to rebrand in {affected} file(s)", file=sys.stderr)
+    return 1 if diagnostics else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Content-addressed deduplication of the files of a run.
+
+Large doc sets hold many byte-identical copies of the same include, snippet or
+localized page. Files are grouped by a hash of their raw bytes (plus anything else
+the output depends on, like the first mention scope of a Markdown file or the
+exceptions of the file), only the first file of each group is rebranded, and its
+result is copied to the others.
+"""
+import hashlib
+import mmap
+import os
+from scheduler import run_tasks
+from textio import Quarantined
+
+
+def file_digest(file_path):
+    """Hash the raw bytes of a file with BLAKE2b, reading it through mmap.
+
+    Returns:
+        str: Hex digest (empty files all share one digest)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest.update(data)
+    return digest.hexdigest()
+
+
+def group_duplicates(files, keys=None):
+    """Group files with identical content.
+
+    Args:
+        files: List of file paths, in processing order
+        keys: Optional mapping of file path -> extra hashable key; files are only grouped
+              when both their content and their key are equal
+
+    Returns:
+        list: Groups as lists of file paths, in the order of their first file. The first
+              file of each group is the one to process.
+    """
+    groups = {}
+    for file_path in files:
+        key = (file_digest(file_path), keys[file_path] if keys else None)
+        groups.setdefault(key, []).append(file_path)
+    return list(groups.values())
+
+
+def scope_key(scope):
+    """Return a hashable key for a first mention scope from IncludeGraph.scope."""
+    return tuple(sorted(scope.items(), key=lambda item: item[0]))
+
+
+def exceptions_key(engine, file_path):
+    """Return a hashable key for the exceptions of a file, which change its output."""
+    return frozenset((entry.line, entry.anchor, entry.term) for entry in engine.exceptions.for_file(file_path))
+
+
+def copy_result(representative, duplicates):
+    """Write the processed content of a file to its duplicates."""
+    with open(representative, 'rb') as f:
+        content = f.read()
+    for file_path in duplicates:
+        with open(file_path, 'wb') as f:
+            f.write(content)
+
+
+def dedup_savings(groups):
+    """Count the work the deduplication saved.
+
+    Returns:
+        dict: 'unique' files processed, 'duplicates' reused, and 'bytes_saved' (the size of the duplicates)
+    """
+    duplicates = [file_path for group in groups for file_path in group[1:]]
+    return {
+        'unique': len(groups),
+        'duplicates': len(duplicates),
+        'bytes_saved': sum(os.path.getsize(file_path) for file_path in duplicates),
+    }
+
+
+def format_savings(savings):
+    """Format dedup_savings as one readable line."""
+    return (f"Dedup: {savings['duplicates']} duplicate file(s) ({savings['bytes_saved']:,} bytes) reused the result of "
+            f"{savings['unique']} unique file(s)")
+
+
+class DedupRun:
+    """Run a handler task once per unique file and copy each result to the file's duplicates.
+
+    Iterate over it for (file_path, changed) tuples, one per file (duplicates come
+    right after the file they share content with). The per-worker statistics of the
+    underlying scheduler.TaskRun are in `stats` once the iteration is finished, the
+    slow files in `slow`, the (file_path, reason) of each file that was left alone
+    because it can't be read or written as text in `quarantined`, and the
+    dedup_savings in `savings`.
+    """
+
+    def __init__(self, function, files, engine, workers=1, scopes=None, slow_seconds=None):
+        """Group the files and prepare the run.
+
+        Args:
+            function: Task function from handlers, taking (engine, item)
+            files: File paths, largest first
+            engine: Compiled RuleEngine, or an overlays.RuleResolver (files are only treated as
+                    duplicates if they get the same rules and the same exceptions)
+            workers: Number of worker processes
+            scopes: Mapping of file path -> first mention scope for Markdown files. When
+                    given, each item is a (file_path, scope) tuple, and only files with
+                    the same scope are treated as duplicates.
+            slow_seconds: Profile the tasks, and keep the profiles of the files that take at least this long
+        """
+        # Resolving the rules here also fills the resolver's cache before it goes to the workers
+        keys = {}
+        for file_path in files:
+            file_engine = engine.engine_for(file_path)
+            keys[file_path] = (id(file_engine), exceptions_key(file_engine, file_path),
+                               scope_key(scopes[file_path]) if scopes is not None else None)
+        groups = group_duplicates(files, keys)
+        self.savings = dedup_savings(groups)
+        self.files = files
+        self.engine = engine
+        self.duplicates = {group[0]: group[1:] for group in groups}
+        self.quarantined = []
+        items = [(group[0], scopes[group[0]]) if scopes is not None else group[0] for group in groups]
+        self.run = run_tasks(function, items, engine, workers, slow_seconds)
+
+    @property
+    def workers(self):
+        return self.run.workers
+
+    @property
+    def stats(self):
+        return self.run.stats
+
+    @property
+    def slow(self):
+        """(file_path, seconds, FileProfile) for each file that took at least slow_seconds."""
+        return [(item[0] if isinstance(item, tuple) else item, seconds, profile)
+                for item, seconds, profile in self.run.slow]
+
+    def __len__(self):
+        return len(self.files)
+
+    def _record_copies(self, file_path, changed):
+        """Record the changes of the duplicates of a rewritten file, which are the changes of the file."""
+        duplicates = self.duplicates[file_path]
+        engine = self.engine.engine_for(file_path)
+        if duplicates and engine.change_log is not None and getattr(changed, 'changes', None):
+            engine.change_log.record(duplicates[0], changed.changes, copies=duplicates[1:])
+
+    def __iter__(self):
+        for item, changed in self.run:
+            file_path = item[0] if isinstance(item, tuple) else item
+            if changed:
+                self._record_copies(file_path, changed)
+                copy_result(file_path, self.duplicates[file_path])
+            if isinstance(changed, Quarantined):
+                # Identical bytes: the duplicates can't be read either
+                self.quarantined.extend((path, changed.reason) for path in [file_path] + self.duplicates[file_path])
+            yield file_path, changed
+            for duplicate in self.duplicates[file_path]:
+                yield duplicate, changed
@@ -0,0 +1,561 @@
+"""
+Compiled rule engine shared by the rebrand scripts.
+
+The engine loads every pattern file once, runs the rules in the longest-match-first
+order from rule_analysis.compile_order, precompiles the cleanup regexes, and scans
+each document once with a multi-pattern matcher to skip the rules whose terms
+can't occur in it.
+
+Cleanup rules match in any case and keep the case of the text they replace, and a
+rule like "an X" -> "a X" also covers the link form "an [X", so cleanup.csv needs
+one row per logical rule.
+
+When a rule changes the first sound of a term ("Azure AI Speech" -> "Speech"), the
+article in front of each replacement it made is fixed right after the rule runs,
+so no "an X" -> "a X" cleanup rules are needed for rewritten terms.
+
+Given a changelog.Replacements, each rule reports the replacements it makes to it
+as it makes them, for the per-rule counts and the change log.
+
+Every cleanup regex is checked for super-linear backtracking when the engine is
+compiled, and each file runs under a time budget (see guardrails.py). A file that
+goes over it is rebranded again in one linear-time pass, with the replacements
+that term_check.TermChecker.find_edits finds, and reported.
+"""
+import copy
+import os
+import re
+import time
+from functools import partial
+from articles import apply_edits, article_edits, indefinite_article
+from exceptions import ExceptionIndex, load_exceptions
+from guardrails import superlinear_reason, time_budget_from_env, TimeBudget, TimeBudgetExceeded
+from includes import mentioned_before
+from matcher import TermMatcher, article_variants, match_case, split_article
+from rule_analysis import build_rules, compile_order, overlap_terms, PHASES
+from term_check import TermChecker
+from utils import (
+    load_csv_replacements,
+    load_first_mention_csv,
+    load_formerly_keywords,
+    load_never_terms,
+    protect_never_terms,
+    restore_never_terms,
+    first_mention_replace_in_body,
+    replace_all,
+    replace_matches,
+    safe_replace,
+    word_boundary_pattern,
+    FORMERLY_KEYWORDS
+)
+
+
+class RuleEngine:
+    """The replacement rules of all pattern files, compiled for repeated use."""
+
+    def __init__(self, first_mention_replacements, compound_replacements, cleanup_replacements,
+                 never_terms=(), formerly_keywords=FORMERLY_KEYWORDS, debug_mode=False, time_budget=None,
+                 exceptions=None, change_log=None):
+        """Compile the rules.
+
+        Args:
+            first_mention_replacements: List of (term, first_replace, subsequent_replace) tuples
+            compound_replacements: Dictionary of always.csv search->replace mappings
+            cleanup_replacements: Dictionary of cleanup.csv search->replace mappings
+            never_terms: Terms that should never be changed
+            formerly_keywords: Keywords that mark 'formerly' contexts
+            debug_mode: Whether to print debug information
+            time_budget: Seconds each file may take before it is rebranded in one linear-time pass
+                         instead (None for no limit)
+            exceptions: exceptions.ExceptionIndex of the places in specific files to leave alone
+            change_log: changelog.ChangeLog to record the changes of the files the handlers rewrite in (optional)
+        """
+        self.first_mention_replacements = list(first_mention_replacements)
+        self.compound_replacements = dict(compound_replacements)
+        self.cleanup_replacements = dict(cleanup_replacements)
+        self.never_terms = list(never_terms)
+        self.formerly_keywords = tuple(formerly_keywords)
+        self.debug_mode = debug_mode
+        self.time_budget = time_budget
+        self.exceptions = exceptions if exceptions is not None else ExceptionIndex()
+        self.change_log = change_log
+        self._region_engine = None
+
+        self.rules = build_rules(self.first_mention_replacements, self.compound_replacements, self.cleanup_replacements)
+        self.plan, self.cycles = compile_order(self.rules)
+        self.matcher = TermMatcher(rule.term for rule in self.plan)
+
+        # Terms that each rule's replacement could create, for rules that run after it
+        reverse_matcher = TermMatcher(rule.term[::-1] for rule in self.plan)
+        self._creates = []
+        for position, rule in enumerate(self.plan):
+            created = set()
+            for output in set(rule.outputs):
+                created |= overlap_terms(output, self.matcher, reverse_matcher)
+            later_terms = {later.term for later in self.plan[position + 1:]}
+            self._creates.append(created & later_terms)
+
+        # Terms whose replacement can need a different article ("an Azure AI Speech" -> "a Speech")
+        self.article_terms = {rule.term for rule in self.plan if rule.phase != 'cleanup'
+                              and any(indefinite_article(output) != indefinite_article(rule.term) for output in rule.outputs)}
+
+        # Cleanup terms are matched in any case, and in their article variants
+        cleanup_rules = [rule for rule in self.plan if rule.phase == 'cleanup']
+        self.cleanup_matcher = TermMatcher((rule.term for rule in cleanup_rules), ignore_case=True,
+                                           variants=self._cleanup_variants)
+        self._cleanup_patterns = {rule.term: self._cleanup_regex(rule, word_boundaries=True) for rule in cleanup_rules}
+        self._plain_patterns = {rule.term: self._cleanup_regex(rule, word_boundaries=False) for rule in cleanup_rules}
+        for term, pattern in list(self._cleanup_patterns.items()) + list(self._plain_patterns.items()):
+            reason = superlinear_reason(pattern.pattern, pattern.flags)
+            if reason:
+                raise ValueError(f"Cleanup rule '{term}' compiles to a regex that can take super-linear time: {reason}")
+
+        # First mention rules in the order they run, as (term, first_replace, subsequent_replace)
+        self.first_mention_order = [(rule.term,) + rule.outputs for rule in self.plan if rule.phase == 'first_mention']
+
+        # Terms of other pattern files that the compiled order runs before a first mention rule
+        last_first_mention = max((i for i, rule in enumerate(self.plan) if rule.phase == 'first_mention'), default=0)
+        self.hoisted_terms = [rule.term for rule in self.plan[:last_first_mention] if rule.phase != 'first_mention']
+
+        if debug_mode:
+            moved = sum(1 for rule, original in zip(self.plan, self.rules) if rule is not original)
+            print(f"Compiled {len(self.plan)} rules ({moved} moved for longest-match-first order)")
+            for predecessor, rule in self.cycles:
+                print(f"Warning: rule order conflict between '{predecessor.term}' and '{rule.term}'")
+
+    def engine_for(self, file_path):
+        """Return the engine for a file: this one (an overlays.RuleResolver picks one per folder)."""
+        return self
+
+    def region_engine(self):
+        """Return this engine with only the anchor exceptions, for string values or cells extracted from a file.
+
+        The line exceptions are numbered in the lines of the file, so the handlers of JSON files
+        and notebooks apply them to the values and cells themselves (see exceptions.covered_by_lines).
+        """
+        if self._region_engine is None:
+            if not any(entry.line is not None for entry in self.exceptions.entries):
+                self._region_engine = self
+            else:
+                self._region_engine = copy.copy(self)
+                self._region_engine.exceptions = self.exceptions.without_lines()
+                self._region_engine._region_engine = self._region_engine
+        return self._region_engine
+
+    def exception_spans(self, content, file_path):
+        """Find the term occurrences that the exceptions of a file cover.
+
+        Args:
+            content: The text of the file
+            file_path: Path of the file, to look up its exceptions
+
+        Returns:
+            list: Disjoint (start, end) spans in document order
+        """
+        spans = []
+        for start, end, term in self.exceptions.regions(content, file_path):
+            region = content[start:end]
+            if term is not None:
+                found = []
+                position = region.find(term)
+                while position != -1:
+                    found.append((position, position + len(term)))
+                    position = region.find(term, position + len(term))
+            else:
+                found = [(match_start, match_end) for match_start, match_end, _ in self.matcher.find_all(region)]
+                found += [(match_start, match_end) for match_start, match_end, _ in self.cleanup_matcher.find_all(region)]
+            spans.extend((start + match_start, start + match_end) for match_start, match_end in found)
+
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start < merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _protect(self, content, file_path, profile):
+        """Replace the places the exceptions cover and the never-replace terms with placeholders.
+
+        Returns:
+            tuple: (protected_text, replacements_map) for restore_never_terms
+        """
+        replacements = {}
+        spans = _timed(profile, 'exceptions', self.exception_spans, content, file_path)
+        if spans:
+            placeholders = [f"__EXCEPTION_{i}__" for i in range(len(spans))]
+            replacements = {placeholder: content[start:end] for placeholder, (start, end) in zip(placeholders, spans)}
+            content = replace_matches(content, spans, placeholders)
+            if self.debug_mode:
+                print(f"    Left {len(spans)} occurrence(s) alone for the exceptions of {file_path}")
+        content, never_replacements = _timed(profile, 'never', protect_never_terms, content, self.never_terms, self.debug_mode)
+        replacements.update(never_replacements)
+        return content, replacements
+
+    def _replacement_spans(self, rule, replacements):
+        """Return a list to collect the spans of a rule's replacements in, if they are recorded or their
+        article may need fixing."""
+        return [] if replacements is not None or rule.term in self.article_terms else None
+
+    def _replaced(self, rule, old_content, content, spans, replacements):
+        """Record the replacements a rule just made and fix the articles in front of them.
+
+        Args:
+            rule: The first mention or always Rule, whose replacements each replaced its term
+            old_content: The text before the replacements
+            content: The text after them
+            spans: (start, end) spans of the replacements in content (None if not collected)
+            replacements: changelog.Replacements to record them in (optional)
+
+        Returns:
+            str: The text with the articles fixed
+        """
+        if not spans:
+            return content
+        if replacements is not None:
+            # Where each replacement was before the replacements in front of it moved it
+            edits = []
+            delta = 0
+            for start, end in spans:
+                edits.append((start - delta, start - delta + len(rule.term), content[start:end], rule.term))
+                delta += end - start - len(rule.term)
+            replacements.update(old_content, edits)
+        if rule.term not in self.article_terms:
+            return content
+        edits = article_edits(content, spans)
+        if replacements is not None and edits:
+            replacements.update(content, [edit + (rule.term,) for edit in edits], count=False)
+        return apply_edits(content, edits)
+
+    def _restore(self, content, protected, replacements):
+        """Put back the protected places, keeping the recorded replacements where they are."""
+        if replacements is None or not replacements.positions or not protected:
+            return restore_never_terms(content, protected)
+        pattern = re.compile('|'.join(re.escape(placeholder) for placeholder in protected))
+        edits = [(match.start(), match.end(), protected[match.group()], None) for match in pattern.finditer(content)]
+        replacements.update(content, edits)
+        return apply_edits(content, [edit[:3] for edit in edits])
+
+    def _cleanup_variants(self, term):
+        """Article variants of a cleanup term, if its replacement starts with an article too."""
+        if split_article(self.cleanup_replacements.get(term, ''))[0] is None:
+            return []
+        return article_variants(term)
+
+    def _cleanup_regex(self, rule, word_boundaries):
+        """Compile the case-insensitive regex of a cleanup rule.
+
+        Args:
+            rule: The cleanup Rule
+            word_boundaries: Use the boundaries of word_boundary_pattern (otherwise match anywhere)
+
+        Returns:
+            re.Pattern: The regex; for a rule with article variants, group 1 captures the optional '['
+        """
+        if self._cleanup_variants(rule.term):
+            article, rest = split_article(rule.term)
+            boundary = r'\b' if word_boundaries else ''
+            pattern = boundary + re.escape(article) + boundary + r' (\[?)' + re.escape(rest)
+        elif word_boundaries:
+            pattern = word_boundary_pattern(rule.term)
+        else:
+            pattern = re.escape(rule.term)
+        return re.compile(pattern, re.IGNORECASE)
+
+    def _cleanup_output(self, rule, match):
+        """Return the replacement for one match of a cleanup rule, in the case of the match."""
+        replacement = rule.outputs[0]
+        if match.re.groups and match.group(1):
+            # The "an [X" variant: keep the link bracket after the new article
+            article, rest = split_article(replacement)
+            replacement = f"{article} [{rest}"
+        return match_case(match.group(0), rule.term, replacement)
+
+    def _run(self, content, phases, apply_rule, profile=None, budget=None):
+        """Run the planned rules of the given phases over the content.
+
+        The content is scanned once for all terms; a rule only runs if its term was
+        found, or could have been created by an earlier rule that changed the content.
+        Cleanup terms, which match in any case, are looked up with the cleanup matcher
+        again whenever the content changed since the last lookup.
+
+        With a profiling.FileProfile, the time of the scans and of each phase and the
+        rules that changed the content are added to it.
+
+        With a guardrails.TimeBudget, TimeBudgetExceeded is raised after the rule
+        that used it up.
+        """
+        candidates = _timed(profile, 'scan', self.matcher.present_terms, content)
+        cleanup_candidates = cleanup_scanned = None
+        for position, rule in enumerate(self.plan):
+            if rule.phase not in phases:
+                continue
+            if rule.phase == 'cleanup':
+                if cleanup_scanned != content:
+                    cleanup_candidates = _timed(profile, 'scan', self.cleanup_matcher.present_terms, content)
+                    cleanup_scanned = content
+                if rule.term not in cleanup_candidates:
+                    continue
+            elif rule.term not in candidates or rule.term not in content:
+                continue
+            old_content = content
+            content = _timed(profile, rule.phase, apply_rule, rule, content)
+            if content != old_content:
+                candidates |= self._creates[position]
+                if profile is not None:
+                    profile.hit(rule.term)
+            if budget is not None:
+                budget.check()
+        return content
+
+    def _within_budget(self, run, content, file_type, file_path, profile, scope=None, phases=PHASES, replacements=None):
+        """Call run(budget), or rebrand the content in one linear-time pass if it goes over the time budget.
+
+        Args:
+            run: Function taking a guardrails.TimeBudget and returning the rebranded content
+            content: The original content, for the linear-time pass
+            file_type: 'markdown' or 'yaml'
+            file_path: Path of the file, for the report
+            profile: profiling.FileProfile of the file (optional)
+            scope: First mention scope of the file (optional)
+            phases: Rule phases the linear-time pass applies
+            replacements: changelog.Replacements the replacements are recorded in (optional)
+        """
+        budget = TimeBudget(self.time_budget)
+        try:
+            return run(budget)
+        except TimeBudgetExceeded as error:
+            print(f"Warning: {file_path or 'document'} went {error}, rebranded it in one linear-time pass instead")
+            if profile is not None:
+                profile.over_budget = True
+            if replacements is not None:
+                replacements.clear()
+            return _timed(profile, 'linear', self.rebrand_in_one_pass, content, file_type, scope, phases, file_path,
+                          replacements)
+
+    def rebrand_in_one_pass(self, content, file_type='markdown', scope=None, phases=PHASES, file_path=None,
+                            replacements=None):
+        """Rebrand text with one scan for all terms, in time linear in its length.
+
+        Each occurrence gets the replacement of its rule as the text reads before the
+        pass, so a replacement never feeds into a later rule and the result can differ
+        from the rule-by-rule run where rules build on each other. Articles in front of
+        the replacements are fixed as usual.
+
+        Args:
+            content: The decoded text
+            file_type: 'markdown' (first mention logic) or 'yaml' (every occurrence gets first_replace)
+            scope: First mention scope of the file from includes.IncludeGraph.scope (optional)
+            phases: Rule phases to apply
+            file_path: Path of the file, to look up its exceptions
+            replacements: changelog.Replacements to record the replacements in (optional)
+
+        Returns:
+            str: The rebranded text
+        """
+        edits = [edit for edit in TermChecker(self).find_edits(content, file_type, scope, file_path)
+                 if edit.rule.phase in phases]
+        if replacements is not None:
+            replacements.update(content, [(edit.start, edit.end, edit.replacement, edit.rule.term) for edit in edits])
+        spans = []
+        content = replace_matches(content, [(edit.start, edit.end) for edit in edits],
+                                  [edit.replacement for edit in edits], spans)
+        fixes = [fix + (edit.rule.term,) for span, edit in zip(spans, edits) if edit.rule.term in self.article_terms
+                 for fix in article_edits(content, [span])]
+        if replacements is not None and fixes:
+            replacements.update(content, fixes, count=False)
+        return apply_edits(content, [fix[:3] for fix in fixes])
+
+    def rebrand_markdown(self, content, scope=None, file_path=None, profile=None, replacements=None):
+        """Rebrand markdown text with first mention logic.
+
+        Args:
+            content: The decoded markdown text
+            scope: First mention scope of the file from includes.IncludeGraph.scope (optional)
+            file_path: Path of the file, for debug output
+            profile: profiling.FileProfile to add the time per phase and the rule hits to (optional)
+            replacements: changelog.Replacements to record each replacement in (optional)
+
+        Returns:
+            str: The rebranded text
+        """
+        scope = scope or {}
+        return self._within_budget(
+            lambda budget: self._rebrand_markdown(content, scope, file_path, profile, budget, replacements),
+            content, 'markdown', file_path, profile, scope, replacements=replacements)
+
+    def _rebrand_markdown(self, content, scope, file_path, profile, budget, replacements):
+        debug_mode = self.debug_mode
+
+        # Protect the exceptions of the file and the never-replace terms first
+        content, never_replacements = self._protect(content, file_path, profile)
+
+        def apply_rule(rule, content):
+            if rule.phase == 'first_mention':
+                # Metadata + title + body first mention logic
+                first_replace, subsequent_replace = rule.outputs
+                old_content = content
+                spans = self._replacement_spans(rule, replacements)
+                content = first_mention_replace_in_body(content, rule.term, first_replace, subsequent_replace, debug_mode,
+                                                        mentioned_before(content, rule.term, scope), self.formerly_keywords,
+                                                        spans)
+                content = self._replaced(rule, old_content, content, spans, replacements)
+                if debug_mode and content != old_content:
+                    print(f"  Applied first mention rule for '{rule.term}' in {file_path}")
+            elif rule.phase == 'always':
+                # Compound phrases don't count as "first occurrence" - they get their specific replacements
+                old_content = content
+                spans = self._replacement_spans(rule, replacements)
+                content = safe_replace(content, rule.term, rule.outputs[0], debug_mode=debug_mode,
+                                       formerly_keywords=self.formerly_keywords, spans=spans)
+                content = self._replaced(rule, old_content, content, spans, replacements)
+                if debug_mode and content != old_content:
+                    count = old_content.count(rule.term)
+                    print(f"  Modified {file_path}: {count} occurrence(s) '{rule.term}' → '{rule.outputs[0]}'")
+            else:
+                # Always use word boundary replace to avoid partial word matches
+                content = self._cleanup(content, rule, file_path, replacements)
+            return content
+
+        content = self._run(content, PHASES, apply_rule, profile, budget)
+
+        # Restore never-replace terms
+        return _timed(profile, 'never', self._restore, content, never_replacements, replacements)
+
+    def rebrand_yaml(self, content, file_path=None, profile=None, replacements=None):
+        """Rebrand YAML text with uniform replacement (every occurrence gets first_replace).
+
+        Args:
+            content: The decoded YAML text
+            file_path: Path of the file, for debug output
+            profile: profiling.FileProfile to add the time per phase and the rule hits to (optional)
+            replacements: changelog.Replacements to record each replacement in (optional)
+
+        Returns:
+            str: The rebranded text
+        """
+        return self._within_budget(lambda budget: self._rebrand_yaml(content, file_path, profile, budget, replacements),
+                                   content, 'yaml', file_path, profile, replacements=replacements)
+
+    def _rebrand_yaml(self, content, file_path, profile, budget, replacements):
+        debug_mode = self.debug_mode
+
+        # Protect the exceptions of the file and the never-replace terms first
+        content, never_replacements = self._protect(content, file_path, profile)
+
+        def apply_rule(rule, content):
+            old_content = content
+            replace_term = rule.outputs[0]
+            spans = self._replacement_spans(rule, replacements)
+            if rule.phase == 'first_mention':
+                content = safe_replace(content, rule.term, replace_term, debug_mode=debug_mode,
+                                       formerly_keywords=self.formerly_keywords, spans=spans)
+            elif rule.phase == 'always':
+                content = replace_all(content, rule.term, replace_term, spans)
+            elif ' ' not in rule.term and '[' not in rule.term and '#' not in rule.term:
+                # Use word boundary matching for single-word replacements (like 'an' -> 'a')
+                return self._cleanup(content, rule, file_path, replacements)
+            else:
+                # Use simple string replacement (in any case) for multi-word or special patterns
+                content, _ = self._cleanup_sub(self._plain_patterns[rule.term], rule, content, replacements)
+            if rule.phase != 'cleanup':
+                content = self._replaced(rule, old_content, content, spans, replacements)
+            if debug_mode and content != old_content:
+                label = "Cleanup" if rule.phase == 'cleanup' else "Modified"
+                count = old_content.count(rule.term)
+                print(f"  {label} {file_path}: {count} occurrence(s) '{rule.term}' → '{replace_term}'")
+            return content
+
+        content = self._run(content, PHASES, apply_rule, profile, budget)
+
+        # Restore never-replace terms
+        return _timed(profile, 'never', self._restore, content, never_replacements, replacements)
+
+    def cleanup_markdown(self, content, file_path=None, profile=None, replacements=None):
+        """Apply only the cleanup rules (typically bookmark fixes) to markdown text.
+
+        Args:
+            content: The decoded markdown text
+            file_path: Path of the file, for debug output
+            profile: profiling.FileProfile to add the time per phase and the rule hits to (optional)
+            replacements: changelog.Replacements to record each replacement in (optional)
+
+        Returns:
+            str: The cleaned up text
+        """
+        def run(budget):
+            protected, never_replacements = self._protect(content, file_path, profile)
+            protected = self._run(protected, ('cleanup',), lambda rule, text: self._cleanup(text, rule, file_path, replacements),
+                                  profile, budget)
+            return _timed(profile, 'never', self._restore, protected, never_replacements, replacements)
+
+        return self._within_budget(run, content, 'markdown', file_path, profile, phases=('cleanup',),
+                                   replacements=replacements)
+
+    def _cleanup_sub(self, pattern, rule, content, replacements):
+        """Replace the matches of a cleanup rule's regex, recording the replacements that change the text.
+
+        Returns:
+            tuple: (new_content, number_of_matches)
+        """
+        if replacements is None:
+            return pattern.subn(partial(self._cleanup_output, rule), content)
+        edits = []
+
+        def output(match):
+            replacement = self._cleanup_output(rule, match)
+            if replacement != match.group(0):
+                edits.append((match.start(), match.end(), replacement, rule.term))
+            return replacement
+
+        result, count = pattern.subn(output, content)
+        replacements.update(content, edits)
+        return result, count
+
+    def _cleanup(self, content, rule, file_path, replacements=None):
+        """Apply a cleanup rule with its precompiled word boundary pattern."""
+        replace_term = rule.outputs[0]
+        result, count = self._cleanup_sub(self._cleanup_patterns[rule.term], rule, content, replacements)
+        if self.debug_mode and count > 0:
+            print(f"    Replaced {count} occurrence(s) of '{rule.term}' → '{replace_term}' (word boundary)")
+            if result != content:
+                print(f"  Cleanup {file_path}: {content.count(rule.term)} occurrence(s) '{rule.term}' → '{replace_term}'")
+        return result
+
+
+def _timed(profile, phase, function, *args):
+    """Call function(*args), adding its time to the phase of a profiling.FileProfile if there is one."""
+    if profile is None:
+        return function(*args)
+    start = time.perf_counter()
+    result = function(*args)
+    profile.add_time(phase, time.perf_counter() - start)
+    return result
+
+
+def load_rule_engine(patterns_dir='patterns', debug_mode=False, time_budget=None, change_log=None):
+    """Load all pattern files from a directory and compile them into a RuleEngine.
+
+    Args:
+        patterns_dir: Directory containing the pattern CSV files
+        debug_mode: Whether to print debug information
+        time_budget: Seconds each file may take (default: the TIME_BUDGET environment variable, else 30; 0 for no limit)
+        change_log: changelog.ChangeLog to record the changes of rewritten files in (optional)
+
+    Returns:
+        RuleEngine: The compiled rules
+    """
+    def pattern_file(name):
+        return os.path.join(patterns_dir, name)
+
+    return RuleEngine(
+        load_first_mention_csv(pattern_file('first_mention.csv'), debug_mode=debug_mode),
+        load_csv_replacements(pattern_file('always.csv'), 'compound replacements', debug_mode=debug_mode),
+        load_csv_replacements(pattern_file('cleanup.csv'), 'cleanup replacements', debug_mode=debug_mode),
+        never_terms=load_never_terms(pattern_file('never.csv'), debug_mode=debug_mode),
+        formerly_keywords=load_formerly_keywords(pattern_file('formerly.csv'), debug_mode=debug_mode),
+        debug_mode=debug_mode,
+        time_budget=time_budget_from_env(time_budget),
+        exceptions=load_exceptions(pattern_file('exceptions.csv'), debug_mode=debug_mode),
+        change_log=change_log
+    )
@@ -0,0 +1,157 @@
+"""
+Exceptions: places in specific files that the rules must leave alone.
+
+patterns/exceptions.csv has one row per exception, with the columns:
+
+- path: The file, relative to the docs tree (matched against the end of the
+  processed file's path, like articles/ai-studio/faq.yml)
+- line: A 1-based line number of the file itself, or empty
+- anchor: Text in the file, or empty; every place it occurs is covered
+- term: Only leave this term alone (empty for every rule term in the line or anchor)
+- note: Why the exception exists (not used by the scripts)
+
+Replacements in markdown and YAML files never add or remove line breaks, so line
+numbers stay valid from run to run. JSON files and notebooks are rebranded one
+extracted string value or markdown cell at a time, whose lines aren't the lines
+of the file: there a line exception leaves alone every value or cell that the
+line overlaps (with a term, only those that contain the term), and anchors are
+matched in each value or cell. The index is keyed by file name, so looking up the exceptions of a
+file is one hash lookup, and files without exceptions cost nothing more.
+"""
+import os
+from collections import namedtuple
+
+# line is an int or None, anchor and term are strings or None
+ExceptionEntry = namedtuple('ExceptionEntry', 'path line anchor term note')
+
+
+class ExceptionIndex:
+    """The exceptions of all files, indexed by file name."""
+
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self._by_name = {}
+        for entry in self.entries:
+            self._by_name.setdefault(entry.path.rsplit('/', 1)[-1], []).append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def merged(self, other):
+        """Return an index with the entries of both indexes."""
+        return ExceptionIndex(self.entries + other.entries)
+
+    def for_file(self, file_path):
+        """Return the exceptions of a file (an empty list for most files)."""
+        if not file_path or not self._by_name:
+            return []
+        normalized = file_path.replace(os.sep, '/')
+        candidates = self._by_name.get(normalized.rsplit('/', 1)[-1], ())
+        return [entry for entry in candidates if normalized == entry.path or normalized.endswith('/' + entry.path)]
+
+    def without_lines(self):
+        """Return an index with only the anchors, for text extracted from a file (where its line numbers don't apply)."""
+        return ExceptionIndex(entry._replace(line=None) for entry in self.entries if entry.anchor)
+
+    def line_regions(self, text, file_path):
+        """Find the lines of a text that the line exceptions of its file cover.
+
+        Args:
+            text: The text of the file
+            file_path: Path of the file
+
+        Returns:
+            list: (start, end, term) tuples in line order, where term is None for every rule term in the line
+        """
+        lines = {}
+        for entry in self.for_file(file_path):
+            if entry.line is not None:
+                lines.setdefault(entry.line, []).append(entry.term)
+        if not lines:
+            return []
+        regions = []
+        line_number = 1
+        line_start = 0
+        last_line = max(lines)
+        while line_number <= last_line:
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(text)
+            for term in lines.get(line_number, ()):
+                regions.append((line_start, line_end, term))
+            if line_end == len(text):
+                break
+            line_number += 1
+            line_start = line_end + 1
+        return regions
+
+    def regions(self, text, file_path):
+        """Find the parts of a text that the exceptions of its file cover.
+
+        Args:
+            text: The text of the file
+            file_path: Path of the file
+
+        Returns:
+            list: (start, end, term) tuples, where term is None for every rule term in the region
+        """
+        entries = self.for_file(file_path)
+        if not entries:
+            return []
+        regions = self.line_regions(text, file_path)
+        for entry in entries:
+            if entry.anchor:
+                start = text.find(entry.anchor)
+                while start != -1:
+                    regions.append((start, start + len(entry.anchor), entry.term))
+                    start = text.find(entry.anchor, start + 1)
+        return sorted(regions, key=lambda region: region[:2])
+
+
+def covered_by_lines(line_regions, text, spans):
+    """Return True if a line region overlaps one of the spans of an extracted value or cell.
+
+    Args:
+        line_regions: (start, end, term) tuples from ExceptionIndex.line_regions
+        text: The decoded value or cell, to check for the term of a region
+        spans: (start, end) spans of the value or cell in the file
+
+    Returns:
+        bool: Whether the exceptions leave the value or cell alone
+    """
+    return any(start < line_end and line_start < end and (term is None or term in text)
+               for line_start, line_end, term in line_regions for start, end in spans)
+
+def load_exceptions(csv_file, debug_mode=False):
+    """Load the exceptions from a CSV file with path,line,anchor,term,note columns.
+
+    Args:
+        csv_file: Path to the CSV file
+        debug_mode: Whether to print debug information
+
+    Returns:
+        ExceptionIndex: The exceptions (empty if the file is not found)
+    """
+    import pandas as pd
+    if not os.path.exists(csv_file):
+        if debug_mode:
+            print(f"No {csv_file} found, no exceptions will be applied")
+        return ExceptionIndex()
+
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+    entries = []
+    for row_number, row in enumerate(df.to_dict('records'), start=2):
+        path = row.get('path', '').strip().replace('\\', '/')
+        if path.startswith('./'):
+            path = path[2:]
+        line = row.get('line', '').strip()
+        anchor = row.get('anchor', '')
+        if not path or not (line or anchor):
+            raise ValueError(f"{csv_file} row {row_number}: needs a path and a line or an anchor")
+        if line and not line.isdigit():
+            raise ValueError(f"{csv_file} row {row_number}: line '{line}' is not a line number")
+        entries.append(ExceptionEntry(path, int(line) if line else None, anchor or None,
+                                      row.get('term', '') or None, row.get('note', '') or None))
+    if debug_mode:
+        print(f"Loaded {len(entries)} exceptions from {csv_file}")
+    return ExceptionIndex(entries)
@@ -10,112 +10,94 @@
 # Environment variables:
 # - DIRECTORY_PATH: Directory to process (required)
 # - DEBUG: Set to 'true' to enable debug output (optional)  
+# - WORKERS: Number of worker processes, 0 for one per CPU (optional, default 1)
+# - CHANGE_LOG: Folder of the change log that revert.py replays, 'off' to turn it off (optional, default .rebrand-cache/changes under DIRECTORY_PATH)
+#
+# Profiling flags (optional): --profile [FILE], --trace-memory [FILE], --slow-log FILE, --slow-seconds N
 
 import os
-import codecs
 from dotenv import load_dotenv
-from tqdm import tqdm
-from utils import load_csv_replacements, protect_never_terms, restore_never_terms, word_boundary_replace
+from changelog import change_log_from_env
+from dedup import DedupRun, format_savings
+from engine import load_rule_engine
+from handlers import cleanup_task, find_handler_files, get_handler
+from overlays import RuleResolver
+from profiling import parse_profiling_args, profile_run
+from reports import progress
+from scheduler import workers_from_env, format_worker_stats
+from textio import format_quarantine
+
+def fix_bookmarks(path=None, debug_mode=None, workers=None, slow_log=None):
+    """
+    Apply the cleanup replacements (typically bookmark fixes) to Markdown files.
+    
+    Args:
+        path: Directory to process. If None, uses DIRECTORY_PATH environment variable.
+        debug_mode: Enable debug output. If None, uses DEBUG environment variable.
+        workers: Number of worker processes. If None, uses WORKERS environment variable (default 1).
+        slow_log: profiling.SlowLog to record the files that take longer than its threshold in (optional).
+    
+    Returns:
+        Number of files processed
+    """
+    # Load environment variables from .env file if not provided
+    if path is None or debug_mode is None:
+        load_dotenv()
 
-# Load environment variables from .env file
-load_dotenv()
+    if path is None:
+        path = os.getenv('DIRECTORY_PATH')
 
-# Get configuration from environment variables
-path = os.getenv('DIRECTORY_PATH')
-debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    if debug_mode is None:
+        debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
 
-if not path:
-    print("Error: DIRECTORY_PATH not found in .env file")
-    exit(1)
+    if not path:
+        print("Error: DIRECTORY_PATH not found in .env file")
+        return 0
 
-# Check if the path exists
-if not os.path.exists(path):
-    print(f"Error: Path does not exist: {path}")
-    exit(1)
-else:
-    print(f"Processing directory for bookmark cleanup: {path}")
+    # Check if the path exists
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        return 0
+    else:
+        print(f"Processing directory for bookmark cleanup: {path}")
 
-# Load cleanup replacements from CSV file
-cleanup_replacements = load_csv_replacements('patterns/cleanup.csv', 'cleanup replacements', debug_mode=debug_mode)
+    # Load and compile the cleanup replacements and never-replace terms from the CSV files
+    engine = load_rule_engine(debug_mode=debug_mode, change_log=change_log_from_env(path))
 
-# Load never-replace terms from never.csv
-never_df = None
-never_terms = []
-if os.path.exists('patterns/never.csv'):
-    import pandas as pd
-    never_df = pd.read_csv('patterns/never.csv')
-    never_terms = never_df['search'].tolist()
-    if debug_mode:
-        print(f"Loaded {len(never_terms)} never-replace terms from patterns/never.csv")
-elif debug_mode:
-    print("No patterns/never.csv found, no terms will be protected")
+    # Build list of files to process first (NO FOLDER SKIPPING)
+    print("Scanning directory (processing ALL folders)...")
+    # special case: skip the new-name file which announces the change.
+    files_to_process = find_handler_files(path, get_handler('markdown'), skip_names=('new-name.md',))
 
-# Build list of files to process first (NO FOLDER SKIPPING)
-print("Scanning directory (processing ALL folders)...")
-files_to_process = []
-for root, dirs, files in os.walk(path):
-    # NO folder skipping - process everything
-    for file in files:
-        if "new-name.md" in file: # special case: skip the new-name file which announces the change.
-            continue
-        if file.endswith('.md'):
-            files_to_process.append(os.path.join(root, file))
+    print(f"Found {len(files_to_process)} files to process")
 
-print(f"Found {len(files_to_process)} files to process")
+    # Rules per folder, with the .rebrand/ overlays applied
+    rules = RuleResolver(engine, path, debug_mode)
 
-# Process files with progress bar
-file_count = 0
-total_changes = 0
-with tqdm(files_to_process, desc="Processing files for cleanup", unit="file") as pbar:
-    for file_path in pbar:
+    # Process files with progress bar, largest first, spread over the worker processes.
+    # Identical files are processed once and get a copy of the result.
+    run = DedupRun(cleanup_task, files_to_process, rules, workers_from_env(workers),
+                   slow_seconds=slow_log.threshold if slow_log else None)
+    file_count = 0
+    total_changes = 0
+    for file_path, changed in progress(run, "Processing files for cleanup"):
         file_count += 1
-        
-        # Read the file in binary mode to make the following steps possible:
-        # - Detect a byte-order mark (BOM) if one is present.
-        # - Preserve the original line-ending characters.
-        with open(file_path, 'rb') as f:
-            raw = f.read()
-        
-        # Check for a BOM.
-        has_utf8_bom = raw.startswith(codecs.BOM_UTF8)
-        
-        # Decode the file to text.
-        content = raw.decode('utf-8-sig')
-        
-        # Protect never-replace terms first
-        content, never_replacements = protect_never_terms(content, never_terms, debug_mode)
-        
-        original_content = content
-        
-        # Apply cleanup replacements (typically bookmark fixes)
-        cleanup_changes = 0
-        for search_term, replace_term in cleanup_replacements.items():
-            if search_term in content:
-                old_content = content
-                # Use word-boundary replace to avoid partial word matches.
-                content = word_boundary_replace(content, search_term, replace_term, debug_mode)
-                if content != old_content:
-                    cleanup_changes += 1
-                    if debug_mode:
-                        count = old_content.count(search_term)
-                        print(f"  Cleanup {file_path}: {count} occurrence(s) '{search_term}' → '{replace_term}'")
-        
-        # Restore never-replace terms
-        content = restore_never_terms(content, never_replacements)
-        
-        # Only write if there were changes
-        if content != original_content:
-            total_changes += 1
-            # Encode the file back to UTF-8 bytes.
-            outContentWithBOMPreserved = content.encode('utf-8')
-            
-            # If the file originally had a BOM, add one back in.
-            if has_utf8_bom:
-                outContentWithBOMPreserved = codecs.BOM_UTF8 + outContentWithBOMPreserved
-            
-            # Write the modified content to the file.
-            with open(file_path, 'wb') as f:
-                f.write(outContentWithBOMPreserved)
+        total_changes += bool(changed)
+
+    if run.workers > 1 or debug_mode:
+        print(format_worker_stats(run.stats))
+    if run.savings['duplicates']:
+        print(format_savings(run.savings))
+    if run.quarantined:
+        print(format_quarantine(run.quarantined))
+    if slow_log is not None:
+        slow_log.add_run('fix-bookmarks', run.slow)
+    print(f'✓ Completed! Total files processed: {file_count}')
+    print(f'✓ Files modified: {total_changes}')
+    return file_count
+
 
-print(f'✓ Completed! Total files processed: {file_count}')
-print(f'✓ Files modified: {total_changes}')
\ No newline at end of file
+if __name__ == '__main__':
+    args = parse_profiling_args("Apply the cleanup replacements to the .md files under DIRECTORY_PATH")
+    with profile_run(args) as slow_log:
+        fix_bookmarks(slow_log=slow_log)
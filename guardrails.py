@@ -0,0 +1,178 @@
+"""
+Guardrails against runaway rules: a super-linear regex check and a per-file time budget.
+
+Every regex the rule engine derives from the pattern files is checked with
+superlinear_reason when the engine is compiled. A pattern with nested quantifiers,
+or with two unbounded runs that can match the same text, can backtrack for a very
+long time on an unlucky line, so the engine refuses to load it.
+
+Each file also gets a time budget (TIME_BUDGET seconds, 30 by default, 0 for none).
+The engine checks it after every rule; a file that goes over it is rebranded again
+with the engine's single-pass, linear-time path and reported, instead of holding up
+the whole run.
+"""
+import os
+import string
+import time
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+DEFAULT_TIME_BUDGET = 30.0
+
+# Characters tried when checking whether two character sets overlap
+_SAMPLE_CHARS = string.printable + ' é’'
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_ASSERTIONS = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+
+class TimeBudgetExceeded(Exception):
+    """Raised by TimeBudget.check when a file took longer than its budget."""
+
+
+class TimeBudget:
+    """The time one file may take."""
+
+    def __init__(self, seconds):
+        """Start the clock.
+
+        Args:
+            seconds: Seconds the file may take (None or 0 for no limit)
+        """
+        self.seconds = seconds
+        self.deadline = time.perf_counter() + seconds if seconds else None
+
+    def check(self):
+        """Raise TimeBudgetExceeded if the budget is used up."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeBudgetExceeded(f"over the {self.seconds:g}s time budget")
+
+
+def time_budget_from_env(seconds=None):
+    """Return the per-file time budget: the argument, else the TIME_BUDGET environment variable, else 30 seconds.
+
+    0 means no budget (returned as None).
+    """
+    if seconds is None:
+        seconds = float(os.getenv('TIME_BUDGET', DEFAULT_TIME_BUDGET) or 0)
+    return seconds if seconds > 0 else None
+
+
+def superlinear_reason(pattern, flags=0):
+    """Check a regex for constructs that can make matching take super-linear time.
+
+    The check is conservative: it flags a quantifier inside an unbounded quantifier,
+    and two unbounded runs in a row that can match the same characters with nothing
+    in between that only the second can match, like r'\\([^)]*formerly[^)]*\\)'.
+
+    Args:
+        pattern: The regex source
+        flags: re flags the pattern is compiled with
+
+    Returns:
+        str: Why the pattern can backtrack super-linearly, or None if it can't
+    """
+    return _check_sequence(list(sre_parse.parse(pattern, flags)))
+
+
+def _is_unbounded(item):
+    op, av = item
+    return op in _REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _check_sequence(items):
+    pending = None  # the last unbounded run, and whether everything after it could be absorbed by it
+    for item in items:
+        op, av = item
+        reason = _check_nested(item)
+        if reason:
+            return reason
+        if _is_unbounded(item):
+            if pending is not None and _overlaps(pending, _first_chars(av[2])):
+                return "two unbounded runs can match the same text"
+            pending = av[2]
+        elif pending is not None and op not in _ASSERTIONS and not _can_absorb(pending, item):
+            pending = None
+    return None
+
+
+def _check_nested(item):
+    op, av = item
+    if op in _REPEATS:
+        body = list(av[2])
+        if av[1] == sre_constants.MAXREPEAT and any(_contains_repeat(inner) for inner in body):
+            return "nested quantifiers"
+        return _check_sequence(body)
+    if op == sre_constants.SUBPATTERN:
+        return _check_sequence(list(av[-1]))
+    if op == sre_constants.BRANCH:
+        for branch in av[1]:
+            reason = _check_sequence(list(branch))
+            if reason:
+                return reason
+    return None
+
+
+def _contains_repeat(item):
+    op, av = item
+    if op in _REPEATS:
+        return av[1] > 1
+    if op == sre_constants.SUBPATTERN:
+        return any(_contains_repeat(inner) for inner in av[-1])
+    if op == sre_constants.BRANCH:
+        return any(_contains_repeat(inner) for branch in av[1] for inner in branch)
+    return False
+
+
+def _matches(items, char):
+    """Return True if the first element of a parsed sequence can match char (conservative)."""
+    if not items:
+        return True
+    op, av = items[0]
+    if op == sre_constants.LITERAL:
+        return chr(av) == char
+    if op == sre_constants.NOT_LITERAL:
+        return chr(av) != char
+    if op == sre_constants.IN:
+        return _in_set(av, char)
+    if op == sre_constants.SUBPATTERN:
+        return _matches(list(av[-1]), char)
+    if op == sre_constants.BRANCH:
+        return any(_matches(list(branch), char) for branch in av[1])
+    if op in _REPEATS:
+        return _matches(list(av[2]), char) or (av[0] == 0 and _matches(list(items[1:]), char))
+    return True
+
+
+def _in_set(members, char):
+    negate = False
+    found = False
+    for op, av in members:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            found |= chr(av) == char
+        elif op == sre_constants.RANGE:
+            found |= av[0] <= ord(char) <= av[1]
+        else:
+            # Categories like \w: assume they can match
+            found = True
+    return found != negate
+
+
+def _first_chars(body):
+    return {char for char in _SAMPLE_CHARS if _matches(list(body), char)}
+
+
+def _overlaps(body, chars):
+    return any(_matches(list(body), char) for char in chars)
+
+
+def _can_absorb(body, item):
+    """Return True if an unbounded run of body can match some of the text that item matches."""
+    return _overlaps(body, _first_chars([item]))
@@ -0,0 +1,447 @@
+"""
+File handlers: how each file type is rebranded.
+
+Each handler names the files it applies to and rebrands the replaceable regions
+of its format with the compiled RuleEngine. Handlers are registered by name, and
+a handler instance is itself the task function the scripts hand to
+scheduler.run_tasks, so every file type runs on the same engine and worker pool.
+
+To add a file type, subclass FileHandler in an importable module, implement
+rebrand, and call register_handler with an instance.
+"""
+import bisect
+import json
+import os
+import time
+from changelog import Replacement, Replacements, Rewritten
+from exceptions import covered_by_lines
+from json_regions import encode_string, MalformedJson, replace_spans, rewrite_strings, string_values
+from scheduler import list_files
+from textio import decode_text, encode_text, Quarantined, UndecodableFile
+
+
+def _rewrite_file(file_path, transform, profile=None, engine=None):
+    """Apply transform to the text of a file and write it back if it changed.
+
+    The file is decoded and encoded with textio, so its encoding, byte-order mark
+    and line endings are kept.
+
+    Args:
+        file_path: Path of the file
+        transform: Function from the text of the file to the new text; with an engine, it also gets
+                   the changelog.Replacements to record the replacements in
+        profile: profiling.FileProfile to add the file size and the read and write times to (optional)
+        engine: RuleEngine of the file; the replacements are counted per rule, and recorded in its
+                change_log if it has one
+
+    Returns:
+        A changelog.Rewritten result (or True without an engine) if the file was changed, False if
+        not, or a textio.Quarantined result if it can't be read or written as text, or is a JSON
+        file that isn't valid JSON (the file is left as it is)
+    """
+    start = time.perf_counter()
+
+    # Read the file in binary mode so the encoding, BOM and line endings can be detected and kept
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        text_file = decode_text(raw)
+    except UndecodableFile as error:
+        return Quarantined(str(error))
+
+    if profile is not None:
+        profile.size = len(raw)
+        profile.add_time('read', time.perf_counter() - start)
+
+    try:
+        if engine is None:
+            content = transform(text_file.text)
+        else:
+            # Only keep where each replacement is if the change log needs it
+            replacements = Replacements(positions=engine.change_log is not None)
+            content = transform(text_file.text, replacements)
+    except (MalformedJson, json.JSONDecodeError) as error:
+        # A JSON file or notebook whose structure or strings can't be read
+        return Quarantined(f"not valid JSON: {error}")
+
+    # Leave unchanged files alone so their modification time (and the include cache) stays valid
+    if content == text_file.text:
+        return False
+
+    start = time.perf_counter()
+    try:
+        data = encode_text(content, text_file)
+    except UndecodableFile as error:
+        return Quarantined(str(error))
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    result = True
+    if engine is not None:
+        changes = ()
+        if engine.change_log is not None:
+            changes = replacements.changes(content)
+            engine.change_log.record(file_path, changes)
+        result = Rewritten(replacements.counts, changes)
+    if profile is not None:
+        profile.add_time('write', time.perf_counter() - start)
+    return result
+
+
+class FileHandler:
+    """Base class of the file handlers.
+
+    Attributes:
+        name: Registry name, like 'markdown'
+        extensions: File name endings the handler applies to
+        file_names: Exact file names the handler applies to (checked before extensions)
+        uses_scope: Whether the handler uses the first mention scope from the include graph
+    """
+    name = None
+    extensions = ()
+    file_names = ()
+    uses_scope = False
+
+    def matches(self, file_path):
+        """Return True if the handler applies to a file."""
+        file_name = os.path.basename(file_path)
+        return file_name in self.file_names or (bool(self.extensions) and file_name.endswith(self.extensions))
+
+    def rebrand(self, engine, content, file_path, scope=None, profile=None, replacements=None):
+        """Return the rebranded text of a file.
+
+        Args:
+            engine: Compiled RuleEngine
+            content: Text of the file
+            file_path: Path of the file, for debug output
+            scope: First mention scope from IncludeGraph.scope (only for handlers with uses_scope)
+            profile: profiling.FileProfile to pass on to the engine (optional)
+            replacements: changelog.Replacements to record each replacement in, in the coordinates
+                          of the returned text (optional)
+        """
+        raise NotImplementedError
+
+    def rebrand_file(self, file_path, engine, scope=None, profile=None):
+        """Rebrand one file in place.
+
+        Returns:
+            A true changelog.Rewritten result if the file was changed (a textio.Quarantined result
+            if it can't be read or written as text)
+        """
+        engine = engine.engine_for(file_path)
+        return _rewrite_file(file_path,
+                             lambda content, replacements: self.rebrand(engine, content, file_path, scope, profile,
+                                                                        replacements),
+                             profile, engine)
+
+    def __call__(self, engine, item, profile=None):
+        """Task function for scheduler.run_tasks; item is a file path or a (file_path, scope) tuple."""
+        file_path, scope = item if isinstance(item, tuple) else (item, None)
+        return self.rebrand_file(file_path, engine, scope, profile)
+
+
+class MarkdownHandler(FileHandler):
+    """Markdown files, with first mention logic over metadata, title and body."""
+    name = 'markdown'
+    extensions = ('.md',)
+    uses_scope = True
+
+    def rebrand(self, engine, content, file_path, scope=None, profile=None, replacements=None):
+        # Apply never, first mention, compound and cleanup rules in the compiled order
+        return engine.rebrand_markdown(content, scope, file_path, profile, replacements)
+
+
+class YamlHandler(FileHandler):
+    """YAML files (TOCs, landing pages), with uniform replacement."""
+    name = 'yaml'
+    extensions = ('.yml', '.yaml')
+
+    def rebrand(self, engine, content, file_path, scope=None, profile=None, replacements=None):
+        # Apply never, first mention (uniform), compound and cleanup rules in the compiled order
+        return engine.rebrand_yaml(content, file_path, profile, replacements)
+
+
+class JsonStringsHandler(FileHandler):
+    """JSON files where only some string values are text to rebrand.
+
+    Subclasses implement is_region to pick the values by their key path. The values
+    get uniform replacement like YAML files, and everything else is left byte for byte.
+    Values that a line exception of patterns/exceptions.csv covers are left alone.
+    """
+
+    def is_region(self, path):
+        """Return True if the string value at this key path should be rebranded."""
+        raise NotImplementedError
+
+    def rebrand(self, engine, content, file_path, scope=None, profile=None, replacements=None):
+        # Values on the lines of line exceptions are left alone, and the rest only get the anchors
+        line_regions = engine.exceptions.line_regions(content, file_path)
+        spans = [(start, end) for path, start, end in string_values(content) if self.is_region(path)
+                 and not (line_regions and covered_by_lines(line_regions, json.loads(content[start:end]), [(start, end)]))]
+        engine = engine.region_engine()
+        if replacements is None:
+            return rewrite_strings(content, spans, lambda value: engine.rebrand_yaml(value, file_path, profile))
+
+        # Rebrand each value with its own tracker, and move its replacements into the new literal
+        new_literals = []
+        delta = 0
+        for start, end in spans:
+            literal = content[start:end]
+            value = json.loads(literal)
+            value_replacements = Replacements(replacements.positions)
+            new_value = engine.rebrand_yaml(value, file_path, profile, value_replacements)
+            if new_value != value:
+                new_literals.append((start, end, encode_string(new_value, literal)))
+                replacements.merge(value_replacements, lambda entry: _in_literal(entry, start + delta, new_value, literal))
+                delta += len(new_literals[-1][2]) - (end - start)
+        return replace_spans(content, new_literals)
+
+
+class JsonTocHandler(JsonStringsHandler):
+    """JSON tables of contents: the display names of the entries."""
+    name = 'json-toc'
+    file_names = ('toc.json',)
+    keys = ('name', 'displayName')
+
+    def is_region(self, path):
+        return bool(path) and path[-1] in self.keys
+
+
+class DocfxHandler(JsonStringsHandler):
+    """docfx.json: the site title and the titleSuffix values (global, or per file glob)."""
+    name = 'docfx'
+    file_names = ('docfx.json',)
+    keys = ('titleSuffix', '_appTitle')
+
+    def is_region(self, path):
+        return any(key in self.keys for key in path[-2:])
+
+
+class NotebookHandler(FileHandler):
+    """Jupyter notebooks: the markdown cells, rebranded in cell order as one page.
+
+    The first markdown cell that starts with a # heading gives the title, and first
+    mention logic runs across the cells, so a term introduced in one cell gets the
+    subsequent replacement in later cells. Code cells, outputs and attachments are
+    left alone: the lexer skips over their strings without decoding them, so large
+    embedded images cost one regex pass. Only the changed source lines are rewritten.
+    Cells that a line exception of patterns/exceptions.csv covers are left out of the page.
+    """
+    name = 'notebook'
+    extensions = ('.ipynb',)
+    # Joins the markdown cells into one page; if a cell contains it, the cells are rebranded one by one
+    CELL_SEPARATOR = '\n\x00\n'
+
+    def markdown_cells(self, content):
+        """Find the source of each markdown cell.
+
+        Returns:
+            list: Per markdown cell, in order, a (spans, is_list) tuple with the spans of its
+                  source string literals and whether the source is a list of lines
+        """
+        cell_types = {}
+        sources = {}
+        for path, start, end in string_values(content):
+            if len(path) < 3 or path[0] != 'cells':
+                continue
+            if path[2] == 'cell_type' and len(path) == 3:
+                cell_types[path[1]] = json.loads(content[start:end])
+            elif path[2] == 'source' and len(path) <= 4:
+                sources.setdefault(path[1], ([], len(path) == 4))[0].append((start, end))
+        return [sources.get(index, ([], True)) for index in sorted(cell_types) if cell_types[index] == 'markdown']
+
+    def rebrand(self, engine, content, file_path, scope=None, profile=None, replacements=None):
+        cells = self.markdown_cells(content)
+        lines = [[json.loads(content[start:end]) for start, end in spans] for spans, _ in cells]
+        texts = [''.join(cell_lines) for cell_lines in lines]
+
+        # Cells on the lines of line exceptions are left alone, and the rest only get the anchors
+        line_regions = engine.exceptions.line_regions(content, file_path)
+        if line_regions:
+            kept = [i for i, ((spans, _), text) in enumerate(zip(cells, texts))
+                    if not covered_by_lines(line_regions, text, spans)]
+            cells, lines, texts = [cells[i] for i in kept], [lines[i] for i in kept], [texts[i] for i in kept]
+        engine = engine.region_engine()
+        if not any(texts):
+            return content
+
+        # The replacements in the page of the joined new cell texts
+        page = None if replacements is None else Replacements(replacements.positions)
+        new_texts = []
+        if not any(self.CELL_SEPARATOR in text for text in texts):
+            new_texts = engine.rebrand_markdown(self.CELL_SEPARATOR.join(texts), None, file_path,
+                                                profile, page).split(self.CELL_SEPARATOR)
+        if len(new_texts) != len(texts):
+            new_texts = []
+            if page is not None:
+                page.clear()
+            for text in texts:
+                cell = None if page is None else Replacements(page.positions)
+                new_texts.append(engine.rebrand_markdown(text, None, file_path, profile, cell))
+                if cell is not None:
+                    offset = sum(len(new_text) + len(self.CELL_SEPARATOR) for new_text in new_texts[:-1])
+                    page.merge(cell, lambda entry: entry._replace(start=entry.start + offset, end=entry.end + offset))
+
+        new_literals = []
+        # Per line of the page: its start, and where its new literal starts in the new file (None if unchanged)
+        line_starts, line_literals = [], []
+        offset = delta = 0
+        for (spans, is_list), cell_lines, text, new_text in zip(cells, lines, texts, new_texts):
+            new_lines = new_text.splitlines(keepends=True) if is_list else [new_text]
+            line_offset = offset
+            offset += len(new_text) + len(self.CELL_SEPARATOR)
+            if new_text == text:
+                continue
+            if len(new_lines) == len(spans):
+                # Same lines: re-encode only the lines that changed
+                for (start, end), line, new_line in zip(spans, cell_lines, new_lines):
+                    if new_line != line:
+                        new_literals.append((start, end, encode_string(new_line, content[start:end])))
+                        line_starts.append(line_offset)
+                        line_literals.append((start + delta, new_line, content[start:end]))
+                        delta += len(new_literals[-1][2]) - (end - start)
+                    line_offset += len(new_line)
+            else:
+                # The lines moved: rewrite the list, keeping the layout between its items
+                between = content[spans[0][1]:spans[1][0]] if len(spans) > 1 else ', '
+                original = content[spans[0][0]:spans[0][1]]
+                position = spans[0][0] + delta
+                for new_line in new_lines:
+                    line_starts.append(line_offset)
+                    line_literals.append((position, new_line, original))
+                    line_offset += len(new_line)
+                    position += len(encode_string(new_line, original)) + len(between)
+                new_literals.append((spans[0][0], spans[-1][1],
+                                     between.join(encode_string(line, original) for line in new_lines)))
+                delta += len(new_literals[-1][2]) - (spans[-1][1] - spans[0][0])
+
+        if page is not None:
+            def in_file(offset, search=bisect.bisect_right):
+                # Where an offset of the page is in the new file, or None if its line wasn't rewritten;
+                # bisect_left puts an offset between two lines at the end of the first
+                index = search(line_starts, offset) - 1
+                if index < 0 or offset > line_starts[index] + len(line_literals[index][1]):
+                    return None
+                position, new_line, original = line_literals[index]
+                return position + len(encode_string(new_line[:offset - line_starts[index]], original)) - 1
+
+            def place(entry):
+                start = in_file(entry.start)
+                end = start if entry.end == entry.start else in_file(entry.end, bisect.bisect_left)
+                if start is None or end is None:
+                    return None
+                original = line_literals[bisect.bisect_right(line_starts, entry.start) - 1][2]
+                return Replacement(start, end, encode_string(entry.old, original)[1:-1], entry.rules)
+            replacements.merge(page, place)
+        return replace_spans(content, new_literals)
+
+
+def _in_literal(entry, position, value, original):
+    """Move a Replacement in a string value to the JSON literal of the value, which starts at position.
+
+    The old text is escaped like the literal, so the change can be reverted in the JSON text.
+    """
+    return Replacement(position + len(encode_string(value[:entry.start], original)) - 1,
+                       position + len(encode_string(value[:entry.end], original)) - 1,
+                       encode_string(entry.old, original)[1:-1], entry.rules)
+
+
+_handlers = {}
+
+
+def register_handler(handler):
+    """Register a handler instance under its name (replacing a handler with the same name)."""
+    _handlers[handler.name] = handler
+    return handler
+
+
+def get_handler(name):
+    """Return the registered handler with this name."""
+    if name not in _handlers:
+        raise KeyError(f"No file handler named '{name}' (registered: {', '.join(_handlers)})")
+    return _handlers[name]
+
+
+def registered_handlers():
+    """Return the registered handlers, in registration order."""
+    return list(_handlers.values())
+
+
+def handler_for(file_path):
+    """Return the first registered handler that applies to a file, or None."""
+    for handler in _handlers.values():
+        if handler.matches(file_path):
+            return handler
+    return None
+
+
+def find_handler_files(path, handler, skip_folders=(), skip_names=(), show_skipped=True):
+    """List the files a handler applies to under a directory, largest first.
+
+    Args:
+        path: Directory to scan
+        handler: FileHandler
+        skip_folders: path_rules.PathRules, or folder names to skip during directory traversal
+        skip_names: Files whose name contains one of these strings are left out
+        show_skipped: Whether to print how many folders were skipped
+
+    Returns:
+        List of file paths
+    """
+    files = list_files(path, handler.extensions + handler.file_names, skip_folders, skip_names, show_skipped)
+    return [file_path for file_path in files if handler.matches(file_path)]
+
+
+for _handler in (MarkdownHandler(), YamlHandler(), JsonTocHandler(), DocfxHandler(), NotebookHandler()):
+    register_handler(_handler)
+
+
+def rebrand_markdown_file(file_path, engine, scope=None):
+    """
+    Rebrand one Markdown file in place.
+
+    Args:
+        file_path: Path of the file
+        engine: Compiled RuleEngine
+        scope: First mention scope of the file from IncludeGraph.scope (optional)
+
+    Returns:
+        True if the file was changed (a textio.Quarantined result if it can't be read or written as text)
+    """
+    return get_handler('markdown').rebrand_file(file_path, engine, scope)
+
+
+def rebrand_yaml_file(file_path, engine):
+    """
+    Rebrand one YAML file in place.
+
+    Args:
+        file_path: Path of the file
+        engine: Compiled RuleEngine
+
+    Returns:
+        True if the file was changed (a textio.Quarantined result if it can't be read or written as text)
+    """
+    return get_handler('yaml').rebrand_file(file_path, engine)
+
+
+def cleanup_markdown_file(file_path, engine, profile=None):
+    """
+    Apply the cleanup replacements (typically bookmark fixes) to one Markdown file in place.
+
+    Args:
+        file_path: Path of the file
+        engine: Compiled RuleEngine, or an overlays.RuleResolver
+        profile: profiling.FileProfile to add the time per phase and the rule hits to (optional)
+
+    Returns:
+        True if the file was changed (a textio.Quarantined result if it can't be read or written as text)
+    """
+    engine = engine.engine_for(file_path)
+    return _rewrite_file(file_path,
+                         lambda content, replacements: engine.cleanup_markdown(content, file_path, profile, replacements),
+                         profile, engine)
+
+
+def cleanup_task(engine, file_path, profile=None):
+    """Task function for scheduler.run_tasks: apply the cleanup replacements to a Markdown file."""
+    return cleanup_markdown_file(file_path, engine, profile)
@@ -0,0 +1,369 @@
+"""
+Include-graph resolver for first mention scoping.
+
+Docs pages pull shared content in with `[!INCLUDE [title](path)]` directives, so the
+page a reader sees is a composition of several .md files. These helpers index the
+include references across the tree once, cache the index between runs, and work out
+which first mention terms are already introduced before each file is rendered.
+
+Each docs tree has its own cache, in .rebrand-cache/include-graph.json under its root
+(see cache_file_for). A save keeps only the files that were indexed, and replaces the
+cache file in one step, so runs that share a tree never read a half-written cache.
+"""
+import json
+import os
+import re
+import tempfile
+from textio import read_text_lenient
+from utils import split_markdown_sections, find_safe_matches
+
+# Matches [!INCLUDE [title](path)] and the [!include[title](path)] variants
+INCLUDE_PATTERN = re.compile(r'\[!INCLUDE\s*\[[^\]]*\]\(\s*<?([^)>\s]+)>?\s*\)\s*\]', re.IGNORECASE)
+
+CACHE_DIR = '.rebrand-cache'
+CACHE_NAME = 'include-graph.json'
+
+CACHE_VERSION = 2
+
+
+def cache_file_for(root):
+    """Return the path of the include cache of the docs tree under root."""
+    return os.path.join(os.path.abspath(root), CACHE_DIR, CACHE_NAME)
+
+
+def find_includes(text):
+    """Find all include directives in a markdown text.
+
+    Args:
+        text: The markdown text to search in
+
+    Returns:
+        list: List of (offset, raw_target) tuples in document order
+    """
+    return [(match.start(), match.group(1)) for match in INCLUDE_PATTERN.finditer(text)]
+
+
+def resolve_include_target(parent_path, raw_target):
+    """Resolve the target of an include directive to an absolute file path.
+
+    Args:
+        parent_path: Absolute path of the file containing the directive
+        raw_target: The path as written in the directive
+
+    Returns:
+        str: Absolute, normalized path of the included file
+    """
+    target = raw_target.split('#', 1)[0].split('?', 1)[0]
+    return os.path.normpath(os.path.join(os.path.dirname(parent_path), target))
+
+
+def read_markdown(file_path):
+    """Read a markdown file the same way the rebrand scripts do (see textio; BOM stripped)."""
+    return read_text_lenient(file_path)
+
+
+def term_mentions(text, first_mention_replacements, never_terms=(), formerly_keywords=None):
+    """Find where each first mention term is first mentioned in the body of a text.
+
+    Terms are masked in rule order, so a term that only appears as part of a longer,
+    earlier rule (like "Azure AI Foundry" inside "Azure AI Foundry Agent Service")
+    does not count as a mention. Never-replace terms and 'formerly' contexts don't count.
+
+    The first replacement of a term counts as a mention too, so an include that was
+    already rebranded (by an earlier run or the watcher) still introduces the term.
+    The subsequent replacement doesn't: short names like "Speech" also occur in other
+    names.
+
+    Args:
+        text: The markdown text
+        first_mention_replacements: List of (term, first_replace, subsequent_replace) tuples
+        never_terms: Terms that are protected from replacement
+        formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+
+    Returns:
+        dict: Mapping of term -> offset of its first mention in text
+    """
+    metadata, title_section, body = split_markdown_sections(text)
+    body_start = len(metadata) + len(title_section)
+
+    # Mask with same-length filler so offsets stay valid
+    masked = body
+    for never_term in never_terms:
+        if never_term in masked:
+            masked = masked.replace(never_term, '\0' * len(never_term))
+
+    mentions = {}
+    for term, first_replace, _ in first_mention_replacements:
+        offsets = []
+        for mention in (term, first_replace):
+            if mention and mention in masked:
+                safe_matches, _ = find_safe_matches(masked, mention, formerly_keywords)
+                offsets.extend(match[0] for match in safe_matches[:1])
+        if offsets:
+            mentions[term] = body_start + min(offsets)
+        if term in masked:
+            masked = masked.replace(term, '\0' * len(term))
+
+    return mentions
+
+
+class IncludeGraph:
+    """Index of include directives across a set of markdown files.
+
+    The index is cached on disk keyed by file modification time and size, so a rerun
+    only reads files that changed since the previous run.
+    """
+
+    def __init__(self, files, first_mention_replacements, never_terms=(), formerly_keywords=None,
+                 cache_file=None, debug_mode=False):
+        """Index the include directives of all files in one pass.
+
+        Args:
+            files: List of markdown file paths to index
+            first_mention_replacements: List of (term, first_replace, subsequent_replace) tuples
+            never_terms: Terms that are protected from replacement
+            formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+            cache_file: Path of the JSON cache file, usually cache_file_for(root) (None to disable caching)
+            debug_mode: Whether to print debug information
+        """
+        self.first_mention_replacements = list(first_mention_replacements)
+        self.never_terms = list(never_terms)
+        self.formerly_keywords = formerly_keywords
+        self.cache_file = cache_file
+        self.debug_mode = debug_mode
+        self.rules_key = json.dumps([self.first_mention_replacements, self.never_terms, formerly_keywords], default=str)
+
+        self._entries = self._load_cache()
+        self.refresh(files)
+
+    def refresh(self, files):
+        """Rebuild the include edges for a set of files, reading only the files that changed.
+
+        Args:
+            files: List of markdown file paths to index
+        """
+        self._rendered = {}
+        self._prior = {}
+
+        # Forward edges: parent -> [(offset, child, raw_target)]
+        self.includes = {}
+        # Reverse edges: child -> [(parent, offset)]
+        self.parents = {}
+        # The indexed files, whose entries are saved
+        self.indexed = set()
+
+        reused = 0
+        for file_path in files:
+            file_path = os.path.abspath(file_path)
+            self.indexed.add(file_path)
+            entry, cached = self._entry(file_path)
+            reused += cached
+            if not entry or not entry['includes']:
+                continue
+            edges = []
+            for offset, raw_target in entry['includes']:
+                child = resolve_include_target(file_path, raw_target)
+                edges.append((offset, child, raw_target))
+                self.parents.setdefault(child, []).append((file_path, offset))
+            self.includes[file_path] = edges
+
+        if self.debug_mode:
+            edge_count = sum(len(edges) for edges in self.includes.values())
+            print(f"Indexed {edge_count} include references in {len(self.includes)} files ({reused} files from cache)")
+
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != CACHE_VERSION:
+            return {}
+        entries = cache.get('files', {})
+        # Mentions depend on the rules, so drop them when the rules changed
+        if cache.get('rules') != self.rules_key:
+            for entry in entries.values():
+                entry.pop('mentions', None)
+        return entries
+
+    def save(self):
+        """Write the index of the indexed files back to the cache file.
+
+        Entries of files that are no longer indexed (deleted, moved or skipped) are dropped.
+        The cache is written to a temporary file next to it and then replaces it, so a
+        concurrent run reads either the old or the new cache.
+        """
+        if not self.cache_file:
+            return
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_file))
+        os.makedirs(cache_dir, exist_ok=True)
+        entries = {file_path: entry for file_path, entry in self._entries.items() if file_path in self.indexed}
+        fd, temp_file = tempfile.mkstemp(prefix=CACHE_NAME + '.', suffix='.tmp', dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'rules': self.rules_key, 'files': entries}, f)
+            os.replace(temp_file, self.cache_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
+
+    def _entry(self, file_path, need_mentions=False):
+        """Return (entry, from_cache) for a file, reading it only when the cache is stale."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None, False
+
+        entry = self._entries.get(file_path)
+        fresh = entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+        if fresh and (not need_mentions or 'mentions' in entry):
+            return entry, True
+
+        text = read_markdown(file_path)
+        if not fresh:
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'includes': find_includes(text)}
+        if need_mentions:
+            entry['mentions'] = term_mentions(text, self.first_mention_replacements, self.never_terms, self.formerly_keywords)
+        self._entries[file_path] = entry
+        return entry, False
+
+    def mentions(self, file_path):
+        """Return the term -> first mention offset mapping for a file."""
+        entry, _ = self._entry(file_path, need_mentions=True)
+        return entry['mentions'] if entry else {}
+
+    def rendered_terms(self, file_path, _stack=()):
+        """Return the set of terms mentioned anywhere in the rendered composition of a file."""
+        if file_path in self._rendered:
+            return self._rendered[file_path]
+        if file_path in _stack:
+            # Include cycle: the file is already being rendered further up
+            return set()
+
+        terms = set(self.mentions(file_path))
+        for _, child, _ in self.includes.get(file_path, []):
+            terms |= self.rendered_terms(child, _stack + (file_path,))
+
+        self._rendered[file_path] = terms
+        return terms
+
+    def prior_terms(self, file_path, _stack=()):
+        """Return the terms already mentioned before a file starts rendering.
+
+        An included file can only assume a term was introduced if that is true for
+        every place it is included from.
+        """
+        if file_path in self._prior:
+            return self._prior[file_path]
+        if file_path in _stack:
+            return set()
+
+        prior = None
+        for parent, offset in self.parents.get(file_path, []):
+            seen = set(self.prior_terms(parent, _stack + (file_path,)))
+            seen |= {term for term, mention in self.mentions(parent).items() if mention < offset}
+            for child_offset, child, _ in self.includes.get(parent, []):
+                if child_offset < offset:
+                    seen |= self.rendered_terms(child)
+            prior = seen if prior is None else prior & seen
+
+        prior = prior or set()
+        self._prior[file_path] = prior
+        return prior
+
+    def scope(self, file_path):
+        """Return the first mention scope of a file.
+
+        Returns:
+            dict: Mapping of term -> None if the term is introduced before the file starts,
+                  or the raw target of the first include directive that introduces it
+        """
+        file_path = os.path.abspath(file_path)
+        if file_path not in self.includes and file_path not in self.parents:
+            return {}
+
+        scope = {term: None for term in self.prior_terms(file_path)}
+        for _, child, raw_target in sorted(self.includes.get(file_path, [])):
+            for term in self.rendered_terms(child):
+                scope.setdefault(term, raw_target)
+        return scope
+
+
+class IncludeScopes:
+    """First mention scopes of markdown files, each with the rules of its own folder.
+
+    A .rebrand/ overlay can add, remove or retarget first mention rules, which changes
+    which terms a page and its includes mention. The scopes of a page are resolved over
+    an IncludeGraph built for the first mention rules of the page's folder; folders with
+    the same first mention rules share one graph, so without overlays there is only the
+    graph of the rules in patterns/, which is also the one cached on disk.
+    """
+
+    def __init__(self, files, engine, rules=None, cache_file=None, debug_mode=False):
+        """Index the include directives of all files for the rules of patterns/.
+
+        Args:
+            files: List of markdown file paths to index
+            engine: RuleEngine with the rules of patterns/
+            rules: overlays.RuleResolver that picks the engine of each file (None for engine everywhere)
+            cache_file: Path of the JSON cache file, usually cache_file_for(root) (None to disable caching)
+            debug_mode: Whether to print debug information
+        """
+        self.files = list(files)
+        self.rules = rules if rules is not None else engine
+        self.cache_file = cache_file
+        self.debug_mode = debug_mode
+        self._graphs = {}
+        self._base = self._graph(engine)
+
+    @staticmethod
+    def _key(engine):
+        return (tuple(engine.first_mention_order), tuple(engine.never_terms + engine.hoisted_terms),
+                tuple(engine.formerly_keywords))
+
+    def _graph(self, engine):
+        key = self._key(engine)
+        if key not in self._graphs:
+            self._graphs[key] = IncludeGraph(self.files, engine.first_mention_order,
+                                             engine.never_terms + engine.hoisted_terms,
+                                             formerly_keywords=engine.formerly_keywords, cache_file=self.cache_file,
+                                             debug_mode=self.debug_mode)
+        return self._graphs[key]
+
+    def refresh(self, files):
+        """Rebuild the include edges of every graph for a set of files (see IncludeGraph.refresh)."""
+        self.files = list(files)
+        for graph in self._graphs.values():
+            graph.refresh(self.files)
+
+    def scope(self, file_path):
+        """Return the first mention scope of a file, with the first mention rules of its folder."""
+        return self._graph(self.rules.engine_for(file_path)).scope(file_path)
+
+    def save(self):
+        """Write the index of the rules of patterns/ back to the cache file."""
+        self._base.save()
+
+
+def mentioned_before(content, term, scope):
+    """Find the offset from which a term counts as already mentioned in a file.
+
+    Args:
+        content: Current text of the file
+        term: The first mention term
+        scope: Scope of the file as returned by IncludeGraph.scope
+
+    Returns:
+        int: Offset in content, or None if the file introduces the term itself
+    """
+    if term not in scope:
+        return None
+    raw_target = scope[term]
+    if raw_target is None:
+        return 0
+    for offset, target in find_includes(content):
+        if target == raw_target:
+            return offset
+    return None
@@ -0,0 +1,113 @@
+"""
+Find and rewrite string values in JSON text without parsing the whole document.
+
+The lexer walks the raw text once and reports where each string value is and
+which key path leads to it. Only the strings a handler asks for are decoded, so
+large values (like the base64 images of notebook outputs) are skipped over by the
+regex and never turned into Python objects. Strings that don't change keep their
+original bytes, so rewritten files have minimal diffs. Text whose brackets don't
+balance raises MalformedJson, and the handlers quarantine the file.
+"""
+import json
+import re
+
+# A string literal (unrolled so long strings are matched by one tight loop), a structural character, or a scalar
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+')
+
+
+class MalformedJson(ValueError):
+    """The text is not a JSON document the lexer can walk."""
+
+
+def string_values(text):
+    """Yield every string value of a JSON document with its key path.
+
+    Args:
+        text: JSON text
+
+    Yields:
+        tuple: (path, start, end) where path is a tuple of object keys and array indices
+               leading to the value, and text[start:end] is the string literal with its quotes
+
+    Raises:
+        MalformedJson: If a bracket or a comma is out of place, or a container isn't closed
+    """
+    path = []       # key or index of each open container
+    in_object = []  # whether each open container is an object
+    expect_key = False
+    for match in _TOKEN.finditer(text):
+        first = text[match.start()]
+        if first == '"':
+            if expect_key:
+                path[-1] = json.loads(match.group())
+                expect_key = False
+            else:
+                yield tuple(path), match.start(), match.end()
+        elif first == '{':
+            path.append(None)
+            in_object.append(True)
+            expect_key = True
+        elif first == '[':
+            path.append(0)
+            in_object.append(False)
+        elif first in '}]':
+            if not in_object or in_object[-1] != (first == '}'):
+                raise MalformedJson(f"unexpected '{first}' at offset {match.start()}")
+            path.pop()
+            in_object.pop()
+            expect_key = False
+        elif first == ',':
+            if not in_object:
+                raise MalformedJson(f"unexpected ',' at offset {match.start()}")
+            if in_object[-1]:
+                expect_key = True
+            else:
+                path[-1] += 1
+    if in_object:
+        raise MalformedJson(f"{len(in_object)} unclosed bracket(s) at the end of the text")
+
+
+def encode_string(value, original):
+    """Encode a string value as a JSON literal, escaping non-ASCII only if the original literal did."""
+    return json.dumps(value, ensure_ascii='\\u' in original)
+
+
+def replace_spans(text, replacements):
+    """Replace spans of text.
+
+    Args:
+        text: JSON text
+        replacements: List of (start, end, new_text), in order and not overlapping
+
+    Returns:
+        str: The text with the spans replaced
+    """
+    parts = []
+    last = 0
+    for start, end, new_text in replacements:
+        parts.append(text[last:start])
+        parts.append(new_text)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def rewrite_strings(text, spans, transform):
+    """Apply transform to the string values at the given spans.
+
+    Args:
+        text: JSON text
+        spans: List of (start, end) spans of string literals, from string_values
+        transform: Function from the decoded string to the new string
+
+    Returns:
+        str: The JSON text with only the changed literals re-encoded
+    """
+    replacements = []
+    for start, end in spans:
+        literal = text[start:end]
+        value = json.loads(literal)
+        new_value = transform(value)
+        if new_value != value:
+            replacements.append((start, end, encode_string(new_value, literal)))
+    return replace_spans(text, replacements)
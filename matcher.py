@@ -0,0 +1,183 @@
+"""
+Multi-pattern term matcher for the rebrand rules.
+
+All search terms are stored in a trie, and the trie is compiled into a single regular
+expression so a document is scanned once for every term instead of once per term.
+
+A matcher can also fold case, and match variant spellings of a term (like the
+"an [X" link form of "an X"), so one logical rule covers all of its variants at
+the cost of a single match. match_case then carries the case of the matched text
+over to the replacement.
+"""
+import re
+
+# Marks a trie node where a term ends
+_END = ''
+
+# Articles that article_variants recognizes at the start of a term
+ARTICLES = ('a', 'an')
+
+
+def _fold(text):
+    """Lower-case text without changing its length (characters that would grow are kept)."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+def split_article(term):
+    """Split a leading article off a term.
+
+    Returns:
+        tuple: (article, rest), or (None, term) if the term doesn't start with 'a ' or 'an '
+    """
+    article, space, rest = term.partition(' ')
+    if space and rest and article.lower() in ARTICLES:
+        return article, rest
+    return None, term
+
+
+def article_variants(term):
+    """Return the other spellings of a term that starts with an article: "an X" also matches "an [X"."""
+    article, rest = split_article(term)
+    if article is None or rest.startswith('['):
+        return []
+    return [f"{article} [{rest}"]
+
+
+def match_case(matched, term, replacement):
+    """Carry the case of matched text over to a replacement.
+
+    Args:
+        matched: The text that matched (in any case)
+        term: The search term as written in the rule
+        replacement: The replacement as written in the rule
+
+    Returns:
+        str: The replacement in ALL CAPS if the match was in all caps, otherwise with the
+             first letter upper- or lower-cased to follow the match
+    """
+    if matched == term:
+        return replacement
+    if matched.isupper() and any(char.islower() for char in term[1:]):
+        return replacement.upper()
+    if matched[:1].isupper() and term[:1].islower():
+        return replacement[:1].upper() + replacement[1:]
+    if matched[:1].islower() and term[:1].isupper():
+        return replacement[:1].lower() + replacement[1:]
+    return replacement
+
+
+class TermMatcher:
+    """Find every occurrence of a set of terms in one scan of the text."""
+
+    def __init__(self, terms, ignore_case=False, variants=None):
+        """Build the trie and compile it into a regex.
+
+        Args:
+            terms: Iterable of search terms (empty terms are ignored)
+            ignore_case: Match the terms in any case
+            variants: Optional function from a term to a list of other spellings of it;
+                      a match of a variant is reported as the term
+        """
+        self.terms = []
+        self.trie = {}
+        self.ignore_case = ignore_case
+        for term in terms:
+            if term and term not in self.terms:
+                self.terms.append(term)
+                self._insert(term, term)
+                for variant in (variants(term) if variants else ()):
+                    self._insert(variant, term)
+
+        # A lookahead finds the longest term starting at every position, even when
+        # matches overlap; shorter terms at the same position are its trie prefixes.
+        if self.terms:
+            self.regex = re.compile('(?=(' + _node_regex(self.trie) + '))', re.IGNORECASE if ignore_case else 0)
+        else:
+            self.regex = None
+
+    def _insert(self, key, term):
+        node = self.trie
+        for char in (_fold(key) if self.ignore_case else key):
+            node = node.setdefault(char, {})
+        terms = node.setdefault(_END, [])
+        if term not in terms:
+            terms.append(term)
+
+    def _prefix_matches(self, text):
+        """Yield (length, term) for the terms (or variants) that are prefixes of text, shortest first."""
+        node = self.trie
+        for length, char in enumerate(_fold(text) if self.ignore_case else text, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            for term in node.get(_END, ()):
+                yield length, term
+
+    def prefix_terms(self, text):
+        """Return the terms that are prefixes of text, shortest first."""
+        return [term for _, term in self._prefix_matches(text)]
+
+    def terms_with_prefix(self, prefix):
+        """Return the terms that start with prefix (including prefix itself if it is a term)."""
+        node = self.trie
+        for char in (_fold(prefix) if self.ignore_case else prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+        terms = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == _END:
+                    terms.extend(term for term in child if term not in terms)
+                else:
+                    stack.append(child)
+        return terms
+
+    def find_all(self, text):
+        """Yield (start, end, term) for every occurrence of every term, in text order.
+
+        Occurrences may overlap, for example "Azure AI Foundry" is reported inside
+        "Azure AI Foundry Agent Service" as well. For a variant spelling, the span is
+        the variant's and the term is the one it belongs to.
+        """
+        if self.regex is None:
+            return
+        for match in self.regex.finditer(text):
+            start = match.start()
+            for length, term in self._prefix_matches(match.group(1)):
+                yield start, start + length, term
+
+    def present_terms(self, text):
+        """Return the set of terms that occur in text."""
+        present = set()
+        if self.regex is None:
+            return present
+        for match in self.regex.finditer(text):
+            present.update(self.prefix_terms(match.group(1)))
+        return present
+
+
+def _node_regex(node):
+    """Compile a trie node into a regex that prefers the longest term."""
+    alternatives = []
+    for char in sorted(key for key in node if key != _END):
+        child = node[char]
+        # Collapse single-child chains into a literal run
+        run = char
+        while len(child) == 1 and _END not in child:
+            (next_char, child), = child.items()
+            run += next_char
+        alternatives.append(re.escape(run) + _node_regex(child))
+
+    if not alternatives:
+        return ''
+    body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    if _END in node:
+        # Greedy optional group: try the longer terms first, fall back to this one
+        return '(?:' + body + ')?'
+    return body
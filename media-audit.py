@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+## Run this script to find the images on the pages that the rebrand changed
+# This script reads all .md, .yml and .yaml files in sub-directories from the specified
+# directory in one parallel pass and indexes every image they reference. It never
+# changes a file and works offline on the local tree.
+# The images used on changed pages are listed once (byte-identical copies are merged),
+# most used on changed pages first, as the screenshots to check for the old branding.
+#
+# Changed pages come from the --report files of a rebrand run. Without a report, the
+# changed pages are the ones the rules would still change (run it before the rebrand).
+#
+# Files used:
+# - patterns/*.csv and .rebrand/ overlays: The rules, to find the pages they would change
+# - patterns/skip_folders.csv: Folder names, name globs or path globs to skip during directory traversal (optional)
+# - patterns/include_paths.csv: Path globs of the only files to process (optional)
+#
+# Environment variables:
+# - DIRECTORY_PATH: Directory to audit (used when no directory is given)
+# - DEBUG: Set to 'true' to enable debug output (optional)
+# - WORKERS: Number of worker processes, 0 for one per CPU (optional, default 1)
+#
+# Usage:
+#   python media-audit.py                                  # images on the pages the rules would change
+#   python media-audit.py --report run.json                # images on the pages a rebrand run changed
+#   python media-audit.py --csv images.csv                 # export the full prioritized list
+#   python media-audit.py --known ai-studio-rebrand/images-to-update.csv  # compare with a hand-kept list
+#   python media-audit.py --all                            # also list the images no changed page uses
+
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from engine import load_rule_engine
+from media_audit import audit_page, changed_pages_from_reports, load_known_images, MediaAudit
+from overlays import RuleResolver
+from path_rules import load_path_rules
+from profiling import add_profiling_arguments, profile_run
+from scheduler import run_tasks, workers_from_env
+from term_scan import find_scan_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the images used on the pages the rebrand changed (read-only)")
+    parser.add_argument('path', nargs='?', help="Directory to audit (defaults to DIRECTORY_PATH)")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    parser.add_argument('--report', action='append', default=[],
+                        help="JSON report of a rebrand run (repeat for the shards of a run)")
+    parser.add_argument('--known', help="CSV file with a url column of the images already listed")
+    parser.add_argument('--csv', help="Export the prioritized image list to this CSV file")
+    parser.add_argument('--all', action='store_true', help="Also list the images that no changed page uses")
+    parser.add_argument('--top', type=int, default=30, help="Number of images to print (default 30)")
+    add_profiling_arguments(parser, slow_log=False)
+    args = parser.parse_args()
+
+    load_dotenv()
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    path = args.path or os.getenv('DIRECTORY_PATH')
+    if not path:
+        print("Error: no directory given and DIRECTORY_PATH not found in .env file")
+        return
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        return
+    print(f"Auditing images in: {path}")
+
+    start = time.perf_counter()
+    with profile_run(args):
+        path_rules = load_path_rules(args.patterns, debug_mode=debug_mode)
+        files = find_scan_files(path, path_rules, debug_mode)
+        rules = None
+        changed = None
+        if args.report:
+            changed = changed_pages_from_reports(args.report)
+        else:
+            rules = RuleResolver(load_rule_engine(args.patterns, debug_mode=debug_mode), path, debug_mode)
+            # Resolve the rules of every folder before they're sent to the workers
+            for file_path in files:
+                rules.engine_for(file_path)
+
+        audit = MediaAudit(path)
+        for file_path, media in run_tasks(audit_page, files, rules, workers_from_env()):
+            if changed is not None:
+                media = media._replace(changed=os.path.abspath(file_path) in changed)
+            audit.add_page(file_path, media)
+        known = load_known_images(args.known) if args.known else None
+        usage = audit.image_usage(known, changed_only=not args.all)
+    elapsed = time.perf_counter() - start
+
+    changed_pages = sum(1 for media in audit.pages.values() if media.changed)
+    references = sum(len(media.images) for media in audit.pages.values())
+    print(f"Indexed {references} image reference(s) in {len(files)} files in {elapsed:.1f}s; "
+          f"{changed_pages} changed page(s) use images")
+    print("=" * 60)
+
+    print(f"\n{'#':>4} {'changed':>7} {'pages':>6} {'uses':>5}  image")
+    print("-" * 60)
+    for rank, entry in enumerate(usage[:args.top], start=1):
+        flags = ''.join((' [missing]' if entry.exists is False else '',
+                         ' [listed]' if entry.listed else '',
+                         f" (+{len(entry.copies)} identical)" if entry.copies else ''))
+        print(f"{rank:4} {entry.changed_pages:7} {entry.pages:6} {entry.uses:5}  {entry.image}{flags}")
+    if len(usage) > args.top:
+        print(f"  ... {len(usage) - args.top} more (use --csv for the full list)")
+
+    if known is not None:
+        unlisted = [entry for entry in usage if entry.changed_pages and not entry.listed]
+        print(f"\n{len(unlisted)} image(s) on changed pages are not in {args.known}")
+
+    if args.csv:
+        audit.write_csv(args.csv, usage)
+        print(f"\n✓ Wrote {len(usage)} image(s) to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Read-only audit of the images that the rebranded pages use.
+
+Every .md and .yml file is read once, in parallel, and each image reference in it
+(markdown links, :::image::: sources and lightboxes, <img> tags, YAML values) is
+resolved against the page's folder into one link index. Pages the rebrand changed
+come from the JSON reports of a run, or, without a report, are the pages the rules
+would still change. The images used on those pages are the screenshots that may
+show the old branding: byte-identical copies are merged into one entry, and the
+list is ordered by the number of changed pages that show the image.
+"""
+import os
+import re
+from collections import namedtuple
+from urllib.parse import unquote
+from dedup import group_duplicates
+from handlers import handler_for
+from reports import load_report
+from sharding import relative_path
+from textio import read_text_lenient
+
+# A path or URL ending in an image extension (a query or fragment after it is left out).
+# Quotes, brackets, parentheses and spaces end it, which covers ![alt](path),
+# source="path", <img src='path'> and YAML values.
+IMAGE_REFERENCE = re.compile(r'''[^\s"'()<>\[\]|,=]+\.(?:png|jpe?g|gif|svg|webp|bmp)(?=[?#\s"'()<>\[\]|,]|$)''',
+                             re.IGNORECASE)
+
+# images: resolve_reference tuples, changed: True or False, or None when the page
+# wasn't checked against the rules
+PageMedia = namedtuple('PageMedia', 'images changed')
+
+# image: path relative to the audited root (or the URL), copies: byte-identical images merged into it,
+# changed_pages / pages: number of pages that use it, uses: number of references,
+# exists: whether the local file is there (None for URLs and site paths), listed: whether the --known list has it
+ImageUsage = namedtuple('ImageUsage', 'image copies changed_pages pages uses exists listed')
+
+
+def find_image_references(text):
+    """Return the image references of a page, in document order (repeats included)."""
+    return [match.group(0) for match in IMAGE_REFERENCE.finditer(text)]
+
+
+def resolve_reference(reference, page_path):
+    """Resolve an image reference of a page.
+
+    Args:
+        reference: The reference as written, like media/overview/hub.png
+        page_path: Path of the page that has it
+
+    Returns:
+        tuple: (target, local) where target is the normalized absolute path of a relative
+               reference, or the reference as written for URLs and site-rooted paths (/azure/...)
+    """
+    if '://' in reference or reference.startswith('/'):
+        return reference, False
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(page_path)), unquote(reference))), True
+
+
+def audit_page(engine, file_path):
+    """Task function for scheduler.run_tasks: index the images of one page.
+
+    Args:
+        engine: RuleEngine or overlays.RuleResolver to check whether the rules would change
+                the page, or None to leave that to a run report
+        file_path: Path of the page
+
+    Returns:
+        PageMedia: The resolved image references, and whether the rules would change the page
+    """
+    text = read_text_lenient(file_path)
+    images = [resolve_reference(reference, file_path) for reference in find_image_references(text)]
+    changed = None
+    if engine is not None and images:
+        handler = handler_for(file_path)
+        changed = handler.rebrand(engine.engine_for(file_path), text, file_path) != text
+    return PageMedia(images, changed)
+
+
+def changed_pages_from_reports(report_files):
+    """Return the absolute paths of the files that the runs of some JSON reports rewrote."""
+    changed = set()
+    for report_file in report_files:
+        report = load_report(report_file)
+        changed.update(os.path.normpath(os.path.join(report['root'], entry['path']))
+                       for entry in report['files'] if entry['changed'])
+    return changed
+
+
+def load_known_images(csv_file):
+    """Index a hand-maintained image list (a url column, like images-to-update.csv).
+
+    Every trailing part of each URL path is indexed, so an image is listed when its
+    path relative to the audited root is the end of one of the URLs.
+
+    Returns:
+        set: The URL path suffixes
+    """
+    import pandas as pd
+    suffixes = set()
+    for url in pd.read_csv(csv_file)['url'].dropna():
+        parts = str(url).strip().split('/')
+        suffixes.update('/'.join(parts[i:]) for i in range(len(parts)))
+    return suffixes
+
+
+class MediaAudit:
+    """The image link index of a docs tree."""
+
+    def __init__(self, root):
+        """Create an empty index.
+
+        Args:
+            root: The audited directory; local images are named relative to it
+        """
+        self.root = root
+        self.pages = {}
+
+    def add_page(self, page_path, media):
+        """Record the images of one page (a PageMedia)."""
+        self.pages[page_path] = media
+
+    def image_usage(self, known=None, changed_only=True):
+        """Count the pages that use each image.
+
+        Args:
+            known: Set from load_known_images, to mark the listed images (optional)
+            changed_only: Leave out the images that no changed page uses
+
+        Returns:
+            list: ImageUsage tuples, most used on changed pages first, then most used overall
+        """
+        pages = {}
+        changed = {}
+        uses = {}
+        for page_path, media in self.pages.items():
+            for image in media.images:
+                pages.setdefault(image, set()).add(page_path)
+                uses[image] = uses.get(image, 0) + 1
+                if media.changed:
+                    changed.setdefault(image, set()).add(page_path)
+
+        # Byte-identical copies of an image are one entry
+        existing = sorted(target for target, local in pages if local and os.path.isfile(target))
+        groups = [[(target, True) for target in group] for group in group_duplicates(existing)]
+        grouped = set(existing)
+        groups += [[image] for image in sorted(pages) if image[0] not in grouped]
+        usage = []
+        for group in groups:
+            changed_pages = set().union(*(changed.get(image, ()) for image in group))
+            if changed_only and not changed_pages:
+                continue
+            names = [self.image_name(image) for image in group]
+            usage.append(ImageUsage(
+                image=names[0],
+                copies=names[1:],
+                changed_pages=len(changed_pages),
+                pages=len(set().union(*(pages[image] for image in group))),
+                uses=sum(uses[image] for image in group),
+                exists=os.path.isfile(group[0][0]) if group[0][1] else None,
+                listed=bool(known) and any(name in known for name in names),
+            ))
+        return sorted(usage, key=lambda entry: (-entry.changed_pages, -entry.uses, entry.image))
+
+    def image_name(self, image):
+        """Return the name of a resolve_reference tuple: the path relative to the root, or the URL."""
+        target, local = image
+        return relative_path(target, self.root) if local else target
+
+    def write_csv(self, csv_file, usage):
+        """Export an image_usage list to a CSV file, with its priority rank."""
+        import pandas as pd
+        df = pd.DataFrame([{**entry._asdict(), 'copies': ';'.join(entry.copies)} for entry in usage],
+                          columns=ImageUsage._fields)
+        df.insert(0, 'priority', range(1, len(df) + 1))
+        df.to_csv(csv_file, index=False)
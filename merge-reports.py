@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+## Run this script to combine the JSON reports of a sharded rebrand run into one summary
+# Each shard of `rebrand-all.py --shard i/N --report FILE` writes a partial report.
+# This script merges them, prints the totals per script and per shard, and warns about
+# missing shards, repeated shards and files that were processed by more than one shard.
+# The exit code is 1 if there was any such problem.
+#
+# Usage:
+#   python merge-reports.py reports/shard-*.json
+#   python merge-reports.py reports/shard-*.json --output reports/merged.json
+#   python merge-reports.py reports/shard-*.json --summary summary.md   # changes per rule and folder
+
+import argparse
+import json
+import sys
+from reports import format_rule_totals, format_summary, load_report, merge_reports, rule_summary, SUMMARY_DEPTH, SUMMARY_FORMATS, write_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Combine the JSON reports of a sharded rebrand run")
+    parser.add_argument('reports', nargs='+', help="Shard report files written with rebrand-all.py --report")
+    parser.add_argument('--output', help="Write the merged report to this JSON file")
+    parser.add_argument('--summary', action='append', default=[],
+                        help="Write the changes per rule and per folder to this .csv, .json or .md file (repeatable)")
+    parser.add_argument('--summary-depth', type=int, default=SUMMARY_DEPTH,
+                        help=f"Folder levels the summary groups the files by (default: {SUMMARY_DEPTH})")
+    args = parser.parse_args()
+    for summary_file in args.summary:
+        if not summary_file.lower().endswith(SUMMARY_FORMATS):
+            parser.error(f"--summary {summary_file}: use a .csv, .json or .md file")
+
+    try:
+        reports = [load_report(report_file) for report_file in args.reports]
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    merged = merge_reports(reports)
+    print(format_summary(merged))
+    summary = rule_summary(merged['files'], args.summary_depth)
+    if summary['rules']:
+        print("Changes per rule:")
+        print(format_rule_totals(summary))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=2)
+        print(f"\n✓ Wrote the merged report to {args.output}")
+    for summary_file in args.summary:
+        write_summary(summary, summary_file)
+        print(f"✓ Wrote the summary to {summary_file}")
+    return 1 if merged['problems'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
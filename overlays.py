@@ -0,0 +1,134 @@
+"""
+Per-folder rule overrides: .rebrand/ overlays resolved once per directory.
+
+Any folder under the processed directory can have a .rebrand/ folder that changes
+the rules for everything below it:
+
+- first_mention.csv, always.csv, cleanup.csv, never.csv: same columns as the files
+  in patterns/; their rows are added to the inherited rules (a row for a term that
+  is already a rule replaces it)
+- formerly.csv: replaces the inherited 'formerly' keywords
+- exceptions.csv: same columns as patterns/exceptions.csv; added to the inherited
+  exceptions
+- remove.csv: a term column; the rules and never-replace entries for these terms
+  are dropped
+- disable.csv: a rules column with first_mention, always, cleanup or all; the
+  inherited rules of these pattern files are dropped (rows of the same overlay
+  still apply)
+
+Overlays stack: a folder gets the rules of its parent folder with its own overlay
+applied. The rules of a directory are resolved once and memoized, directories
+without an overlay share their parent's compiled engine, so looking up the rules
+of a file is one dictionary lookup.
+"""
+import os
+from engine import RuleEngine
+from exceptions import load_exceptions
+from utils import load_csv_replacements, load_first_mention_csv, load_formerly_keywords, load_never_terms
+
+OVERLAY_DIR = '.rebrand'
+RULE_FILES = ('first_mention', 'always', 'cleanup')
+
+
+def load_overlay_terms(csv_file, column, debug_mode=False):
+    """Load one column of an overlay CSV file (empty if the file is not found)."""
+    import pandas as pd
+    if not os.path.exists(csv_file):
+        return []
+    values = [str(value).strip() for value in pd.read_csv(csv_file)[column].dropna()]
+    if debug_mode:
+        print(f"Loaded {len(values)} {column} value(s) from {csv_file}")
+    return values
+
+
+def apply_overlay(engine, overlay_dir, debug_mode=False):
+    """Compile the rules of an engine with an overlay folder applied.
+
+    Args:
+        engine: RuleEngine with the inherited rules
+        overlay_dir: Path of the .rebrand/ folder
+        debug_mode: Whether to print debug information
+
+    Returns:
+        RuleEngine: The rules for the overlay's subtree
+    """
+    def overlay_file(name):
+        return os.path.join(overlay_dir, name)
+
+    disabled = {value.lower() for value in load_overlay_terms(overlay_file('disable.csv'), 'rules', debug_mode)}
+    unknown = disabled - set(RULE_FILES) - {'all'}
+    if unknown:
+        raise ValueError(f"{overlay_file('disable.csv')}: unknown rules {sorted(unknown)} "
+                         f"(use {', '.join(RULE_FILES)} or all)")
+    if 'all' in disabled:
+        disabled = set(RULE_FILES)
+    removed = set(load_overlay_terms(overlay_file('remove.csv'), 'term', debug_mode))
+
+    first_mention = [] if 'first_mention' in disabled else list(engine.first_mention_replacements)
+    compound = {} if 'always' in disabled else dict(engine.compound_replacements)
+    cleanup = {} if 'cleanup' in disabled else dict(engine.cleanup_replacements)
+
+    added_first_mention = load_first_mention_csv(overlay_file('first_mention.csv'), debug_mode)
+    added_terms = {term for term, _, _ in added_first_mention}
+    first_mention = [rule for rule in first_mention if rule[0] not in removed | added_terms] + added_first_mention
+    compound.update(load_csv_replacements(overlay_file('always.csv'), 'compound replacements', debug_mode=debug_mode))
+    cleanup.update(load_csv_replacements(overlay_file('cleanup.csv'), 'cleanup replacements', debug_mode=debug_mode))
+    for rules in (compound, cleanup):
+        for term in removed & set(rules):
+            del rules[term]
+
+    never_terms = [term for term in engine.never_terms if term not in removed]
+    never_terms += [term for term in load_never_terms(overlay_file('never.csv'), debug_mode) if term not in never_terms]
+    formerly_keywords = engine.formerly_keywords
+    if os.path.exists(overlay_file('formerly.csv')):
+        formerly_keywords = load_formerly_keywords(overlay_file('formerly.csv'), debug_mode)
+
+    exceptions = engine.exceptions.merged(load_exceptions(overlay_file('exceptions.csv'), debug_mode))
+
+    if debug_mode:
+        print(f"Rule overlay {overlay_dir}: {len(first_mention)} first mention, {len(compound)} compound, "
+              f"{len(cleanup)} cleanup rules")
+    return RuleEngine(first_mention, compound, cleanup, never_terms, formerly_keywords, debug_mode,
+                      time_budget=engine.time_budget, exceptions=exceptions, change_log=engine.change_log)
+
+
+class RuleResolver:
+    """The compiled rules of every directory under a root, with the .rebrand/ overlays applied.
+
+    A resolver can stand in for a RuleEngine wherever the handlers take one: the
+    handlers call engine_for with the path of the file they rebrand.
+    """
+
+    def __init__(self, engine, root, debug_mode=False):
+        """Start resolving.
+
+        Args:
+            engine: RuleEngine with the rules of patterns/, used where no overlay applies
+            root: The processed directory; overlays in it and below it apply
+            debug_mode: Whether to print debug information
+        """
+        self.engine = engine
+        self.root = os.path.abspath(root)
+        self.debug_mode = debug_mode
+        self._engines = {self.root: apply_overlay(engine, os.path.join(self.root, OVERLAY_DIR), debug_mode)
+                         if os.path.isdir(os.path.join(self.root, OVERLAY_DIR)) else engine}
+
+    def engine_for(self, file_path):
+        """Return the RuleEngine for a file."""
+        return self.engine_for_directory(os.path.dirname(os.path.abspath(file_path)))
+
+    def engine_for_directory(self, directory):
+        """Return the RuleEngine for the files of a directory, resolving it (and its parents) once."""
+        engine = self._engines.get(directory)
+        if engine is not None:
+            return engine
+        parent = os.path.dirname(directory)
+        if parent == directory or not directory.startswith(self.root + os.sep):
+            # Outside the root: no overlays
+            return self.engine
+        engine = self.engine_for_directory(parent)
+        overlay_dir = os.path.join(directory, OVERLAY_DIR)
+        if os.path.isdir(overlay_dir):
+            engine = apply_overlay(engine, overlay_dir, self.debug_mode)
+        self._engines[directory] = engine
+        return engine
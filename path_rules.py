@@ -0,0 +1,202 @@
+"""
+Skip and include rules for the folders and files the scripts process.
+
+patterns/skip_folders.csv lists the folders to skip in its folder_name column:
+
+- a plain name (luis) skips every folder with that name, at any depth
+- a glob without a '/' (*-legacy) is matched against folder names
+- a path or path glob with a '/' (ai-services/luis, */includes/old-*) is matched
+  against the folder's path relative to the processed directory; ** matches any
+  number of folders
+
+patterns/include_paths.csv optionally lists path globs in a path column
+(ai-studio/**, ai-services/openai). When it has rows, only the files in or under
+a matching path are processed.
+
+The rules are compiled once into a set of names and two regexes, and applied
+while the tree is walked: a skipped folder is never entered, and neither is a
+folder that no include glob can reach.
+"""
+import fnmatch
+import os
+import re
+from utils import load_skip_folders
+
+GLOB_CHARACTERS = '*?['
+
+
+def glob_regex(pattern):
+    """Translate a path glob into a regex: * and ? stay within a folder, ** spans folders.
+
+    Returns:
+        str: Regex source matching the path or any path under it
+    """
+    parts = []
+    position = 0
+    while position < len(pattern):
+        if pattern.startswith('**/', position):
+            parts.append('(?:.*/)?')
+            position += 3
+        elif pattern.startswith('**', position):
+            parts.append('.*')
+            position += 2
+        elif pattern[position] == '*':
+            parts.append('[^/]*')
+            position += 1
+        elif pattern[position] == '?':
+            parts.append('[^/]')
+            position += 1
+        elif pattern[position] == '[' and ']' in pattern[position + 2:]:
+            end = pattern.index(']', position + 2)
+            characters = pattern[position + 1:end]
+            if characters.startswith('!'):
+                characters = '^' + characters[1:]
+            parts.append(f"[{characters}]")
+            position = end + 1
+        else:
+            parts.append(re.escape(pattern[position]))
+            position += 1
+    return ''.join(parts) + '(?:/.*)?'
+
+
+def _normalize(pattern):
+    pattern = str(pattern).strip().replace('\\', '/')
+    if pattern.startswith('./'):
+        pattern = pattern[2:]
+    return pattern.strip('/')
+
+
+def _is_glob(text):
+    return any(character in text for character in GLOB_CHARACTERS)
+
+
+class PathRules:
+    """Compiled skip and include rules, matched against paths relative to the processed directory."""
+
+    def __init__(self, skip=(), include=()):
+        """Compile the rules.
+
+        Args:
+            skip: Folder names, name globs and path globs to skip
+            include: Path globs of the files to process (empty for every file)
+        """
+        skip = [_normalize(pattern) for pattern in skip if isinstance(pattern, str) and _normalize(pattern)]
+        self.skip = skip
+        self.include = [_normalize(pattern) for pattern in include if isinstance(pattern, str) and _normalize(pattern)]
+        self.skip_names = {pattern for pattern in skip if '/' not in pattern and not _is_glob(pattern)}
+        self._name_globs = [pattern for pattern in skip if '/' not in pattern and _is_glob(pattern)]
+        self._path_globs = [pattern for pattern in skip if '/' in pattern]
+        self._name_regex = _compile([fnmatch.translate(pattern) for pattern in self._name_globs])
+        self._path_regex = _compile([glob_regex(pattern) + r'\Z' for pattern in self._path_globs])
+        self._include_regex = _compile([glob_regex(pattern) + r'\Z' for pattern in self.include])
+        # The folders before the first wildcard of each include glob
+        self._include_prefixes = []
+        for pattern in self.include:
+            prefix = []
+            for part in pattern.split('/'):
+                if _is_glob(part):
+                    break
+                prefix.append(part)
+            self._include_prefixes.append(prefix)
+
+    def __bool__(self):
+        return bool(self.skip or self.include)
+
+    def skip_rule(self, relative_dir):
+        """Return the skip rule that matches a folder, or None.
+
+        Args:
+            relative_dir: Path of the folder relative to the processed directory, with '/' separators
+        """
+        name = relative_dir.rsplit('/', 1)[-1]
+        if name in self.skip_names:
+            return name
+        if self._name_regex is not None and self._name_regex.match(name):
+            return next(pattern for pattern in self._name_globs if fnmatch.fnmatchcase(name, pattern))
+        if self._path_regex is not None and self._path_regex.match(relative_dir):
+            return next(pattern for pattern in self._path_globs if re.match(glob_regex(pattern) + r'\Z', relative_dir))
+        return None
+
+    def may_include(self, relative_dir):
+        """Return True if an include glob can match files in or under a folder."""
+        if not self.include:
+            return True
+        parts = relative_dir.split('/')
+        return any(parts[:len(prefix)] == prefix[:len(parts)] for prefix in self._include_prefixes)
+
+    def includes_file(self, relative_path):
+        """Return True if a file is processed: no folder above it is skipped, and an include glob matches it."""
+        relative_path = relative_path.replace(os.sep, '/')
+        parts = relative_path.split('/')
+        for depth in range(1, len(parts)):
+            if self.skip_rule('/'.join(parts[:depth])):
+                return False
+        return self._include_regex is None or bool(self._include_regex.match(relative_path))
+
+    def walk(self, path, skipped=None):
+        """Walk a directory like os.walk, without entering the skipped and unreachable folders.
+
+        Args:
+            path: Directory to walk
+            skipped: Counter to add one to per skipped folder, by the rule that skipped it (optional)
+
+        Yields:
+            tuple: (root, relative_root, names) where relative_root uses '/' separators ('' for path)
+                   and names are the files in root
+        """
+        for root, dirs, names in os.walk(path):
+            relative_root = os.path.relpath(root, path).replace(os.sep, '/')
+            relative_root = '' if relative_root == '.' else relative_root
+            kept = []
+            for name in dirs:
+                relative_dir = f"{relative_root}/{name}" if relative_root else name
+                rule = self.skip_rule(relative_dir)
+                if rule is not None:
+                    if skipped is not None:
+                        skipped[rule] += 1
+                elif self.may_include(relative_dir):
+                    kept.append(name)
+            dirs[:] = kept
+            yield root, relative_root, names
+
+    def matches_file(self, relative_root, name):
+        """Return True if a file found by walk matches the include globs."""
+        if self._include_regex is None:
+            return True
+        return bool(self._include_regex.match(f"{relative_root}/{name}" if relative_root else name))
+
+
+def _compile(sources):
+    return re.compile('|'.join(f"(?:{source})" for source in sources)) if sources else None
+
+
+def as_path_rules(skip_folders):
+    """Return a PathRules for a list of skip entries, or the PathRules itself."""
+    return skip_folders if isinstance(skip_folders, PathRules) else PathRules(skip_folders or ())
+
+
+def format_skipped(skipped):
+    """Format the Counter of skipped folders from PathRules.walk as one line."""
+    return (f"Skipped {sum(skipped.values())} folder(s): "
+            + ', '.join(f"{rule} ({count})" for rule, count in sorted(skipped.items(), key=lambda item: (-item[1], item[0]))))
+
+
+def load_path_rules(patterns_dir='patterns', debug_mode=False):
+    """Load skip_folders.csv and include_paths.csv from a patterns directory.
+
+    Args:
+        patterns_dir: Directory containing the pattern CSV files
+        debug_mode: Whether to print debug information
+
+    Returns:
+        PathRules: The compiled rules (empty if neither file is found)
+    """
+    import pandas as pd
+    skip = load_skip_folders(os.path.join(patterns_dir, 'skip_folders.csv'), debug_mode=debug_mode)
+    include = []
+    include_file = os.path.join(patterns_dir, 'include_paths.csv')
+    if os.path.exists(include_file):
+        include = [str(value) for value in pd.read_csv(include_file)['path'].dropna()]
+        if debug_mode:
+            print(f"Loaded {len(include)} include paths from {include_file}")
+    return PathRules(skip, include)
@@ -0,0 +1,184 @@
+"""
+Profiling hooks for the entry points: cProfile, tracemalloc and a slow-file log.
+
+Every entry point that processes files accepts --profile and --trace-memory, which
+wrap the whole run and write their results to files. The rebrand scripts also
+accept --slow-log: every file whose task takes longer than --slow-seconds is listed
+with its size, the rules that changed it and the time spent in each phase (reading,
+never-replace protection, the term scan, each rule phase and writing), so a slow
+run can be traced to one file, one rule or the I/O.
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+DEFAULT_PROFILE_FILE = 'rebrand.prof'
+DEFAULT_MEMORY_FILE = 'rebrand-memory.txt'
+DEFAULT_SLOW_SECONDS = 1.0
+
+# Number of functions and allocation sites listed in the text summaries
+TOP_ENTRIES = 40
+
+
+class FileProfile:
+    """Where the time of one file task went.
+
+    Attributes:
+        size: Size of the file in bytes (0 until the file is read)
+        phases: Seconds per phase, like {'read': 0.01, 'first_mention': 0.4}
+        hits: Number of times each rule term changed the text
+        over_budget: Whether the file went over its time budget and was rebranded in one linear-time pass
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.phases = {}
+        self.hits = {}
+        self.over_budget = False
+
+    def add_time(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def hit(self, term):
+        self.hits[term] = self.hits.get(term, 0) + 1
+
+
+class SlowLog:
+    """The files of a run whose task took longer than a threshold."""
+
+    def __init__(self, threshold=DEFAULT_SLOW_SECONDS):
+        """Start an empty log.
+
+        Args:
+            threshold: Seconds a file task has to take to be logged
+        """
+        self.threshold = threshold
+        self.entries = []
+
+    def add_run(self, script, slow_files):
+        """Record the slow files of one script.
+
+        Args:
+            script: Name of the script, like 'rebrand-md'
+            slow_files: List of (file_path, seconds, FileProfile) from DedupRun.slow
+        """
+        for file_path, seconds, profile in slow_files:
+            self.entries.append((script, file_path, seconds, profile))
+
+    def format(self):
+        """Format the log, slowest file first."""
+        lines = [f"{len(self.entries)} file(s) took longer than {self.threshold:g}s"]
+        for script, file_path, seconds, profile in sorted(self.entries, key=lambda entry: -entry[2]):
+            lines.append(f"{file_path} ({script}): {seconds:.3f}s, {profile.size:,} bytes")
+            phases = sorted(profile.phases.items(), key=lambda phase: -phase[1])
+            lines.append("  phases: " + ', '.join(f"{phase} {phase_seconds:.3f}s" for phase, phase_seconds in phases))
+            if profile.hits:
+                hits = sorted(profile.hits.items(), key=lambda hit: (-hit[1], hit[0]))
+                lines.append("  rule hits: " + ', '.join(f"'{term}' {count}" for term, count in hits))
+            else:
+                lines.append("  rule hits: none")
+            if profile.over_budget:
+                lines.append("  over the time budget: rebranded in one linear-time pass")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, log_file):
+        """Write the log as text."""
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        with open(log_file, 'w', encoding='utf-8') as f:
+            f.write(self.format())
+
+
+def add_profiling_arguments(parser, slow_log=True):
+    """Add the --profile and --trace-memory flags (and --slow-log, --slow-seconds) to a parser.
+
+    Args:
+        parser: argparse.ArgumentParser of an entry point
+        slow_log: Whether the entry point can log slow files
+    """
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_FILE, metavar='FILE',
+                       help=f"Profile the run with cProfile and write the stats to FILE (default {DEFAULT_PROFILE_FILE}) "
+                            "and a summary to FILE.txt; with several workers only the main process is profiled")
+    group.add_argument('--trace-memory', nargs='?', const=DEFAULT_MEMORY_FILE, metavar='FILE',
+                       help=f"Trace memory allocations with tracemalloc and write the top allocation sites to FILE "
+                            f"(default {DEFAULT_MEMORY_FILE})")
+    if slow_log:
+        group.add_argument('--slow-log', metavar='FILE',
+                           help="List every file whose processing takes longer than --slow-seconds in FILE")
+        group.add_argument('--slow-seconds', type=float, default=DEFAULT_SLOW_SECONDS,
+                           help=f"Threshold for --slow-log in seconds (default {DEFAULT_SLOW_SECONDS:g})")
+
+
+def parse_profiling_args(description):
+    """Parse the profiling flags of a script that takes no other arguments."""
+    parser = argparse.ArgumentParser(description=description)
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+
+def write_profile(profiler, profile_file):
+    """Write cProfile stats to profile_file and the top functions by cumulative time to profile_file.txt."""
+    profile_dir = os.path.dirname(profile_file)
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    profiler.dump_stats(profile_file)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(TOP_ENTRIES)
+    with open(profile_file + '.txt', 'w', encoding='utf-8') as f:
+        f.write(summary.getvalue())
+
+
+def write_memory_trace(snapshot, peak, memory_file):
+    """Write the peak traced memory and the top allocation sites of a tracemalloc snapshot."""
+    memory_dir = os.path.dirname(memory_file)
+    if memory_dir:
+        os.makedirs(memory_dir, exist_ok=True)
+    with open(memory_file, 'w', encoding='utf-8') as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+        f.write(f"Top {TOP_ENTRIES} allocation sites still allocated at the end of the run:\n")
+        for stat in snapshot.statistics('lineno')[:TOP_ENTRIES]:
+            f.write(f"{stat}\n")
+
+
+@contextmanager
+def profile_run(args):
+    """Run the body under the profilers requested by the parsed arguments.
+
+    Args:
+        args: argparse.Namespace with the flags of add_profiling_arguments
+
+    Yields:
+        SlowLog: The log to pass to the rebrand functions, or None if --slow-log wasn't given
+    """
+    profile_file = getattr(args, 'profile', None)
+    memory_file = getattr(args, 'trace_memory', None)
+    slow_log_file = getattr(args, 'slow_log', None)
+    slow_log = SlowLog(args.slow_seconds) if slow_log_file else None
+
+    profiler = cProfile.Profile() if profile_file else None
+    if memory_file:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield slow_log
+    finally:
+        if profiler:
+            profiler.disable()
+            write_profile(profiler, profile_file)
+            print(f"Profile written to: {profile_file} (summary in {profile_file}.txt)")
+        if memory_file:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            write_memory_trace(snapshot, peak, memory_file)
+            print(f"Memory trace written to: {memory_file}")
+        if slow_log is not None:
+            slow_log.write(slow_log_file)
+            print(f"Slow log written to: {slow_log_file} ({len(slow_log.entries)} file(s))")
@@ -1,22 +1,42 @@
 #!/usr/bin/env python3
-## Run this script to rebrand both .md and .yml files
-# This script runs both rebrand-md.py and rebrand-yml.py functions
-# to perform a complete rebranding of Markdown and YAML files.
+## Run this script to rebrand .md, .yml, JSON (toc.json, docfx.json) and .ipynb files
+# This script runs the rebrand-md.py, rebrand-yml.py, rebrand-json.py and rebrand-ipynb.py functions
+# to perform a complete rebranding of Markdown, YAML, JSON and notebook files.
 #
 # Environment variables required:
 # - DIRECTORY_PATH: Directory to process (required)
 # - DEBUG: Set to 'true' to enable debug output (optional)
+# - WORKERS: Number of worker processes, 0 for one per CPU (optional, default 1)
+# - CHANGE_LOG: Folder of the change log that revert.py replays, 'off' to turn it off (optional, default .rebrand-cache/changes under DIRECTORY_PATH)
 #
 # Usage:
 #   python rebrand-all.py
 #
 # Or with environment variables:
 #   DIRECTORY_PATH=/path/to/docs DEBUG=true python rebrand-all.py
+#
+# To split a large doc set across several machines or CI jobs, give each job its own
+# checkout and shard, and combine the shard reports afterwards:
+#   python rebrand-all.py --shard 1/4 --report reports/shard-1.json
+#   python merge-reports.py reports/shard-*.json
+#
+# To paste the changes per rule and per folder into a pull request, write a summary
+# (CSV, JSON or Markdown, by the extension; repeat --summary for several formats):
+#   python rebrand-all.py --summary summary.md --summary summary.csv
+#
+# To find out why a run is slow, profile it and list the files that take longer than 2 seconds:
+#   python rebrand-all.py --profile --trace-memory --slow-log slow-files.txt --slow-seconds 2
 
 import sys
 import os
+import argparse
 import importlib.util
 from dotenv import load_dotenv
+from changelog import change_log_from_env
+from engine import load_rule_engine
+from profiling import add_profiling_arguments, profile_run
+from reports import format_rule_totals, rule_summary, RunReport, SUMMARY_DEPTH, SUMMARY_FORMATS, write_summary
+from sharding import parse_shard
 
 # Load modules with hyphens in their names using importlib
 def load_module(module_name, file_path):
@@ -25,44 +45,104 @@ def load_module(module_name, file_path):
     spec.loader.exec_module(module)
     return module
 
-# Load the rebrand modules
-rebrand_md = load_module('rebrand_md', os.path.join(os.path.dirname(__file__), 'rebrand-md.py'))
-rebrand_yml = load_module('rebrand_yml', os.path.join(os.path.dirname(__file__), 'rebrand-yml.py'))
+def main():
+    parser = argparse.ArgumentParser(description="Rebrand the .md, .yml, JSON and .ipynb files under DIRECTORY_PATH")
+    parser.add_argument('--shard', help="Process only shard i of N, for example 1/4 (files are split by a hash of their path, the same way on every machine)")
+    parser.add_argument('--report', help="Write a JSON report of the processed files (combine shard reports with merge-reports.py)")
+    parser.add_argument('--summary', action='append', default=[],
+                        help="Write the changes per rule and per folder to this .csv, .json or .md file (repeatable)")
+    parser.add_argument('--summary-depth', type=int, default=SUMMARY_DEPTH,
+                        help=f"Folder levels the summary groups the files by (default: {SUMMARY_DEPTH})")
+    parser.add_argument('--workers', type=int, help="Number of worker processes, 0 for one per CPU (default: WORKERS environment variable, or 1)")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    for summary_file in args.summary:
+        if not summary_file.lower().endswith(SUMMARY_FORMATS):
+            parser.error(f"--summary {summary_file}: use a .csv, .json or .md file")
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Load environment variables from .env file
+    load_dotenv()
+
+    # Get configuration from environment variables
+    path = os.getenv('DIRECTORY_PATH')
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+
+    if not path:
+        print("Error: DIRECTORY_PATH not found in .env file")
+        sys.exit(1)
+
+    # Check if the path exists
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        sys.exit(1)
+
+    # Load the rebrand modules only now, so --help and argument errors don't wait for them
+    rebrand_markdown_files = load_module('rebrand_md', os.path.join(os.path.dirname(__file__), 'rebrand-md.py')).rebrand_markdown_files
+    rebrand_yaml_files = load_module('rebrand_yml', os.path.join(os.path.dirname(__file__), 'rebrand-yml.py')).rebrand_yaml_files
+    rebrand_json_files = load_module('rebrand_json', os.path.join(os.path.dirname(__file__), 'rebrand-json.py')).rebrand_json_files
+    rebrand_notebook_files = load_module('rebrand_ipynb', os.path.join(os.path.dirname(__file__), 'rebrand-ipynb.py')).rebrand_notebook_files
 
-rebrand_markdown_files = rebrand_md.rebrand_markdown_files
-rebrand_yaml_files = rebrand_yml.rebrand_yaml_files
+    print(f"Starting complete rebranding process for: {path}")
+    if shard:
+        print(f"Shard {shard[0]} of {shard[1]}")
+    print("=" * 60)
 
-# Load environment variables from .env file
-load_dotenv()
+    with profile_run(args) as slow_log:
+        # Load and compile the rules once for both passes
+        engine = load_rule_engine(debug_mode=debug_mode, change_log=change_log_from_env(path))
+        report = RunReport(path, shard)
 
-# Get configuration from environment variables
-path = os.getenv('DIRECTORY_PATH')
-debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+        # Run rebrand markdown files
+        print("\n[1/4] Processing Markdown files (.md)...")
+        print("-" * 60)
+        md_count = rebrand_markdown_files(path=path, debug_mode=debug_mode, engine=engine, shard=shard, report=report,
+                                          workers=args.workers, slow_log=slow_log)
 
-if not path:
-    print("Error: DIRECTORY_PATH not found in .env file")
-    sys.exit(1)
+        # Run rebrand yaml files
+        print("\n[2/4] Processing YAML files (.yml/.yaml)...")
+        print("-" * 60)
+        yml_count = rebrand_yaml_files(path=path, debug_mode=debug_mode, engine=engine, shard=shard, report=report,
+                                       workers=args.workers, slow_log=slow_log)
 
-# Check if the path exists
-if not os.path.exists(path):
-    print(f"Error: Path does not exist: {path}")
-    sys.exit(1)
+        # Run rebrand json files
+        print("\n[3/4] Processing JSON files (toc.json, docfx.json)...")
+        print("-" * 60)
+        json_count = rebrand_json_files(path=path, debug_mode=debug_mode, engine=engine, shard=shard, report=report,
+                                        workers=args.workers, slow_log=slow_log)
 
-print(f"Starting complete rebranding process for: {path}")
-print("=" * 60)
+        # Run rebrand notebook files
+        print("\n[4/4] Processing notebooks (.ipynb)...")
+        print("-" * 60)
+        ipynb_count = rebrand_notebook_files(path=path, debug_mode=debug_mode, engine=engine, shard=shard, report=report,
+                                             workers=args.workers, slow_log=slow_log)
 
-# Run rebrand markdown files
-print("\n[1/2] Processing Markdown files (.md)...")
-print("-" * 60)
-md_count = rebrand_markdown_files(path=path, debug_mode=debug_mode)
+    if args.report:
+        report.write(args.report)
+    summary = rule_summary(report.files, args.summary_depth)
+    for summary_file in args.summary:
+        write_summary(summary, summary_file)
 
-# Run rebrand yaml files
-print("\n[2/2] Processing YAML files (.yml/.yaml)...")
-print("-" * 60)
-yml_count = rebrand_yaml_files(path=path, debug_mode=debug_mode)
+    print("\n" + "=" * 60)
+    print(f"✓ Rebranding process completed successfully!")
+    print(f"  - Markdown files processed: {md_count}")
+    print(f"  - YAML files processed: {yml_count}")
+    print(f"  - JSON files processed: {json_count}")
+    print(f"  - Notebooks processed: {ipynb_count}")
+    if summary['rules']:
+        print("  - Changes per rule:")
+        print(format_rule_totals(summary))
+    if args.report:
+        print(f"  - Report written to: {args.report}")
+    for summary_file in args.summary:
+        print(f"  - Summary written to: {summary_file}")
 
-print("\n" + "=" * 60)
-print(f"✓ Rebranding process completed successfully!")
-print(f"  - Markdown files processed: {md_count}")
-print(f"  - YAML files processed: {yml_count}")
 
+if __name__ == '__main__':
+    main()
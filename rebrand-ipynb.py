@@ -0,0 +1,129 @@
+## Run this script to replace terms in the markdown cells of Jupyter notebooks (.ipynb)
+# This script goes through all .ipynb files in sub-directories from the specified directory.
+# The markdown cells of a notebook are read in order as one page with first mention logic:
+# - A # heading at the start of the first markdown cell is the title (first replacement term)
+# - First occurrence in the cells gets first replacement term
+# - Subsequent occurrences, in the same or later cells, get second replacement term
+# Code cells and outputs are never changed, and only the changed lines of the file are rewritten.
+#
+# Files used:
+# - patterns/first_mention.csv: First mention differentiation (term,first_replace,subsequent_replace)
+# - patterns/always.csv: Compound phrases that always get specific replacements (optional)
+# - patterns/cleanup.csv: Final cleanup replacements applied after all other changes (optional)
+# - patterns/skip_folders.csv: Folder names, name globs or path globs to skip during directory traversal (optional)
+# - patterns/include_paths.csv: Path globs of the only files to process (optional)
+# - patterns/formerly.csv: Keywords that mark historical "(formerly ...)" contexts (optional)
+#
+# Environment variables:
+# - DIRECTORY_PATH: Directory to process (required)
+# - DEBUG: Set to 'true' to enable debug output (optional)
+# - WORKERS: Number of worker processes, 0 for one per CPU (optional, default 1)
+# - CHANGE_LOG: Folder of the change log that revert.py replays, 'off' to turn it off (optional, default .rebrand-cache/changes under DIRECTORY_PATH)
+#
+# Profiling flags (optional): --profile [FILE], --trace-memory [FILE], --slow-log FILE, --slow-seconds N
+import os
+from dotenv import load_dotenv
+from changelog import change_log_from_env
+from dedup import DedupRun, format_savings
+from engine import load_rule_engine
+from handlers import find_handler_files, get_handler
+from overlays import RuleResolver
+from path_rules import load_path_rules
+from profiling import parse_profiling_args, profile_run
+from reports import progress
+from scheduler import workers_from_env, format_worker_stats
+from sharding import shard_files
+from textio import format_quarantine
+
+
+def rebrand_notebook_files(path=None, debug_mode=None, engine=None, shard=None, report=None, workers=None, slow_log=None,
+                           path_rules=None):
+    """
+    Rebrand the markdown cells of Jupyter notebooks using first mention logic.
+
+    Args:
+        path: Directory to process. If None, uses DIRECTORY_PATH environment variable.
+        debug_mode: Enable debug output. If None, uses DEBUG environment variable.
+        engine: Compiled RuleEngine to reuse. If None, loads the rules from patterns/.
+        shard: (index, count) tuple from sharding.parse_shard to process only one shard of the files.
+        report: reports.RunReport to record the processed files in (optional).
+        workers: Number of worker processes. If None, uses WORKERS environment variable (default 1).
+        slow_log: profiling.SlowLog to record the files that take longer than its threshold in (optional).
+        path_rules: path_rules.PathRules to skip and include files by. If None, loads them from patterns/.
+
+    Returns:
+        Number of files processed
+    """
+    # Load environment variables from .env file if not provided
+    if path is None or debug_mode is None:
+        load_dotenv()
+
+    if path is None:
+        path = os.getenv('DIRECTORY_PATH')
+
+    if debug_mode is None:
+        debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+
+    if not path:
+        print("Error: DIRECTORY_PATH not found in .env file")
+        return 0
+
+    # Check if the path exists
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        return 0
+    else:
+        print(f"Processing directory: {path}")
+
+    # Load and compile the replacement patterns from the CSV files
+    if engine is None:
+        engine = load_rule_engine(debug_mode=debug_mode, change_log=change_log_from_env(path))
+
+    # Load the skip and include rules from skip_folders.csv and include_paths.csv
+    if path_rules is None:
+        path_rules = load_path_rules(debug_mode=debug_mode)
+
+    # Build list of notebooks to process
+    print("Scanning directory...")
+    handler = get_handler('notebook')
+    files_to_process = find_handler_files(path, handler, path_rules)
+
+    print(f"Found {len(files_to_process)} notebooks to process")
+
+    if shard is not None:
+        files_to_process = shard_files(files_to_process, path, shard)
+        print(f"Shard {shard[0]}/{shard[1]}: {len(files_to_process)} notebooks")
+
+    # Rules per folder, with the .rebrand/ overlays applied
+    rules = RuleResolver(engine, path, debug_mode)
+
+    # Process files with progress bar, largest first, spread over the worker processes.
+    # Identical files are processed once and get a copy of the result.
+    run = DedupRun(handler, files_to_process, rules, workers_from_env(workers),
+                   slow_seconds=slow_log.threshold if slow_log else None)
+    file_count = 0
+    for file_path, changed in progress(run, "Processing files"):
+        file_count += 1
+        if report is not None:
+            report.add_file(file_path, 'rebrand-ipynb', changed)
+
+    if run.workers > 1 or debug_mode:
+        print(format_worker_stats(run.stats))
+    if run.savings['duplicates']:
+        print(format_savings(run.savings))
+    if run.quarantined:
+        print(format_quarantine(run.quarantined))
+    if slow_log is not None:
+        slow_log.add_run('rebrand-ipynb', run.slow)
+    if report is not None:
+        report.add_worker_stats('rebrand-ipynb', run.stats)
+        report.add_dedup('rebrand-ipynb', run.savings)
+
+    print(f'✓ Completed! Total notebooks processed: {file_count}')
+    return file_count
+
+
+if __name__ == '__main__':
+    args = parse_profiling_args("Rebrand the markdown cells of the notebooks under DIRECTORY_PATH")
+    with profile_run(args) as slow_log:
+        rebrand_notebook_files(slow_log=slow_log)
@@ -9,24 +9,64 @@
 # - patterns/first_mention.csv: First mention differentiation (term,first_replace,subsequent_replace)
 # - patterns/always.csv: Compound phrases that always get specific replacements (optional)
 # - patterns/cleanup.csv: Final cleanup replacements applied after all other changes (optional)
-# - patterns/skip_folders.csv: Folder names to skip during directory traversal (optional)
+# - patterns/skip_folders.csv: Folder names, name globs or path globs to skip during directory traversal (optional)
+# - patterns/include_paths.csv: Path globs of the only files to process (optional)
+# - patterns/formerly.csv: Keywords that mark historical "(formerly ...)" contexts (optional)
+#
+# Pages that pull in shared content with [!INCLUDE] are scoped as the rendered page:
+# a term already introduced by an earlier include (or by every page that includes
+# the file) gets the subsequent replacement term.
 #
 # Environment variables:
 # - DIRECTORY_PATH: Directory to process (required)
 # - DEBUG: Set to 'true' to enable debug output (optional)  
+# - WORKERS: Number of worker processes, 0 for one per CPU (optional, default 1)
+# - CHANGE_LOG: Folder of the change log that revert.py replays, 'off' to turn it off (optional, default .rebrand-cache/changes under DIRECTORY_PATH)
+#
+# Profiling flags (optional): --profile [FILE], --trace-memory [FILE], --slow-log FILE, --slow-seconds N
 import os
-import codecs
 from dotenv import load_dotenv
-from tqdm import tqdm
-from utils import load_csv_replacements, safe_replace, protect_never_terms, restore_never_terms, first_mention_replace_in_body, load_first_mention_csv, word_boundary_replace
+from changelog import change_log_from_env
+from dedup import DedupRun, format_savings
+from engine import load_rule_engine
+from handlers import find_handler_files, get_handler
+from includes import cache_file_for, IncludeScopes
+from overlays import RuleResolver
+from path_rules import load_path_rules
+from profiling import parse_profiling_args, profile_run
+from reports import progress
+from scheduler import workers_from_env, format_worker_stats
+from sharding import shard_files
+from textio import format_quarantine
+
+def find_markdown_files(path, skip_folders=()):
+    """
+    List the Markdown files to rebrand under a directory, largest first.
+    
+    Args:
+        path: Directory to scan
+        skip_folders: path_rules.PathRules, or folder names to skip during directory traversal
+    
+    Returns:
+        List of file paths
+    """
+    # special case: skip the new-name file which announces the change.
+    return find_handler_files(path, get_handler('markdown'), skip_folders, skip_names=('new-name.md',))
 
-def rebrand_markdown_files(path=None, debug_mode=None):
+def rebrand_markdown_files(path=None, debug_mode=None, engine=None, shard=None, report=None, workers=None, slow_log=None,
+                           path_rules=None):
     """
     Rebrand Markdown files using first mention logic.
     
     Args:
         path: Directory to process. If None, uses DIRECTORY_PATH environment variable.
         debug_mode: Enable debug output. If None, uses DEBUG environment variable.
+        engine: Compiled RuleEngine to reuse. If None, loads the rules from patterns/.
+        shard: (index, count) tuple from sharding.parse_shard to process only one shard of the files.
+        report: reports.RunReport to record the processed files in (optional).
+        workers: Number of worker processes. If None, uses WORKERS environment variable (default 1).
+        slow_log: profiling.SlowLog to record the files that take longer than its threshold in (optional).
+        path_rules: path_rules.PathRules to skip and include files by. If None, loads them from patterns/.
     
     Returns:
         Number of files processed
@@ -52,130 +92,60 @@ def rebrand_markdown_files(path=None, debug_mode=None):
     else:
         print(f"Processing directory: {path}")
     
-    # Load replacement patterns from CSV files
-    first_mention_replacements = load_first_mention_csv('patterns/first_mention.csv', debug_mode=debug_mode)
-    compound_replacements = load_csv_replacements('patterns/always.csv', 'compound replacements', debug_mode=debug_mode)
-    cleanup_replacements = load_csv_replacements('patterns/cleanup.csv', 'cleanup replacements', debug_mode=debug_mode)
-    
-    # Load never-replace terms from never.csv
-    never_df = None
-    never_terms = []
-    if os.path.exists('patterns/never.csv'):
-        import pandas as pd
-        never_df = pd.read_csv('patterns/never.csv')
-        never_terms = never_df['search'].tolist()
-        if debug_mode:
-            print(f"Loaded {len(never_terms)} never-replace terms from patterns/never.csv")
-    elif debug_mode:
-        print("No patterns/never.csv found, no terms will be protected")
-    
-    # Load skip folders from skip_folders.csv
-    skip_folders = []
-    if os.path.exists('patterns/skip_folders.csv'):
-        import pandas as pd
-        skip_df = pd.read_csv('patterns/skip_folders.csv')
-        skip_folders = skip_df['folder_name'].tolist()
-        if debug_mode:
-            print(f"Loaded {len(skip_folders)} folders to skip from patterns/skip_folders.csv")
-    elif debug_mode:
-        print("No patterns/skip_folders.csv found, no folders will be skipped")
+    # Load and compile the replacement patterns from the CSV files
+    if engine is None:
+        engine = load_rule_engine(debug_mode=debug_mode, change_log=change_log_from_env(path))
+    
+    # Load the skip and include rules from skip_folders.csv and include_paths.csv
+    if path_rules is None:
+        path_rules = load_path_rules(debug_mode=debug_mode)
     
     # Build list of files to process first
     print("Scanning directory...")
-    files_to_process = []
-    for root, dirs, files in os.walk(path):
-        # Skip directories that are in the skip list
-        original_dirs = dirs[:]  # Make a copy to see what was skipped
-        dirs[:] = [d for d in dirs if d not in skip_folders]
-        
-        # Print skipped directories
-        skipped_dirs = [d for d in original_dirs if d in skip_folders]
-        for skipped_dir in skipped_dirs:
-            full_skipped_path = os.path.join(root, skipped_dir)
-            print(f"Skipped: {full_skipped_path}")
-        
-        for file in files:
-            if "new-name.md" in file: # special case: skip the new-name file which announces the change.
-                continue
-            if file.endswith('.md'):
-                files_to_process.append(os.path.join(root, file))
+    files_to_process = find_markdown_files(path, path_rules)
     
     print(f"Found {len(files_to_process)} files to process")
     
-    # Process files with progress bar
-    file_count = 0
-    with tqdm(files_to_process, desc="Processing files", unit="file") as pbar:
-        for file_path in pbar:
-            file_count += 1
-            
-            # Read the file in binary mode to make the following steps possible:
-            # - Detect a byte-order mark (BOM) if one is present.
-            # - Preserve the original line-ending characters.
-            with open(file_path, 'rb') as f:
-                raw = f.read()
-
-            # Check for a BOM.
-            has_utf8_bom = raw.startswith(codecs.BOM_UTF8)
-
-            # Decode the file to text.
-            content = raw.decode('utf-8-sig')
+    # Rules per folder, with the .rebrand/ overlays applied
+    rules = RuleResolver(engine, path, debug_mode)
+    
+    # Resolve first mention scopes over the include graph before any file is rewritten,
+    # with the first mention rules of each page's folder
+    include_scopes = IncludeScopes(files_to_process, engine, rules, cache_file_for(path), debug_mode)
+    
+    # Keep only this shard's files; the include graph still covers the whole tree
+    if shard is not None:
+        files_to_process = shard_files(files_to_process, path, shard)
+        print(f"Shard {shard[0]}/{shard[1]}: {len(files_to_process)} files")
+    scopes = {file_path: include_scopes.scope(file_path) for file_path in files_to_process}
+    include_scopes.save()
 
-            # Protect never-replace terms first
-            content, never_replacements = protect_never_terms(content, never_terms, debug_mode)
-            
-            original_content = content
-            
-            # Apply first mention replacements (metadata + title + body first mention logic)
-            for term, first_replace, subsequent_replace in first_mention_replacements:
-                if term in content:
-                    old_content = content
-                    content = first_mention_replace_in_body(content, term, first_replace, subsequent_replace, debug_mode)
-                    if debug_mode and content != old_content:
-                        print(f"  Applied first mention rule for '{term}' in {file_path}")
-            
-            # Apply compound phrases from always.csv
-            # These don't count as "first occurrence" - they get their specific replacements
-            compound_changes = 0
-            for search_term, replace_term in compound_replacements.items():
-                if search_term in content:
-                    old_content = content
-                    content = safe_replace(content, search_term, replace_term, debug_mode=debug_mode)
-                    if content != old_content:
-                        compound_changes += 1
-                        if debug_mode:
-                            count = old_content.count(search_term)
-                            print(f"  Modified {file_path}: {count} occurrence(s) '{search_term}' → '{replace_term}'")
-            
-            # Apply cleanup replacements last (after all other changes)
-            cleanup_changes = 0
-            for search_term, replace_term in cleanup_replacements.items():
-                if search_term in content:
-                    old_content = content
-                    # Always use word boundary replace to avoid partial word matches
-                    content = word_boundary_replace(content, search_term, replace_term, debug_mode)
-                    if content != old_content:
-                        cleanup_changes += 1
-                        if debug_mode:
-                            count = old_content.count(search_term)
-                            print(f"  Cleanup {file_path}: {count} occurrence(s) '{search_term}' → '{replace_term}'")
-            
-            # Restore never-replace terms
-            content = restore_never_terms(content, never_replacements)
-            
-            # Encode the file back to UTF-8 bytes.
-            outContentWithBOMPreserved = content.encode('utf-8')
-            
-            # If the file originally had a BOM, add one back in.
-            if has_utf8_bom:
-                outContentWithBOMPreserved = codecs.BOM_UTF8 + outContentWithBOMPreserved
-            
-            # Write the modified content to the file.
-            with open(file_path, 'wb') as f:
-                f.write(outContentWithBOMPreserved)
-            
+    # Process files with progress bar, largest first, spread over the worker processes.
+    # Identical files with the same scope are rebranded once and get a copy of the result.
+    run = DedupRun(get_handler('markdown'), files_to_process, rules, workers_from_env(workers), scopes,
+                   slow_seconds=slow_log.threshold if slow_log else None)
+    file_count = 0
+    for file_path, changed in progress(run, "Processing files"):
+        file_count += 1
+        if report is not None:
+            report.add_file(file_path, 'rebrand-md', changed)
+    
+    if run.workers > 1 or debug_mode:
+        print(format_worker_stats(run.stats))
+    if run.savings['duplicates']:
+        print(format_savings(run.savings))
+    if run.quarantined:
+        print(format_quarantine(run.quarantined))
+    if slow_log is not None:
+        slow_log.add_run('rebrand-md', run.slow)
+    if report is not None:
+        report.add_worker_stats('rebrand-md', run.stats)
+        report.add_dedup('rebrand-md', run.savings)
     print(f'✓ Completed! Total files processed: {file_count}')
     return file_count
 
 
 if __name__ == '__main__':
-    rebrand_markdown_files()
\ No newline at end of file
+    args = parse_profiling_args("Rebrand the .md files under DIRECTORY_PATH with first mention logic")
+    with profile_run(args) as slow_log:
+        rebrand_markdown_files(slow_log=slow_log)
\ No newline at end of file
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+## Run this script to serve the rebrand rules over a local HTTP/JSON API
+# Editor extensions and pre-commit hooks can send documents to this server instead of
+# starting Python (and loading pandas and the pattern files) for every check. The rules
+# are loaded and compiled once when the server starts.
+#
+# Endpoints (POST a JSON body, get JSON back):
+# - /rebrand: rebranded content of each document
+# - /diff:    unified diff between each document and its rebranded content
+# - /scan:    occurrences of every pattern term in each document, by section type
+# - GET /health: server status and number of rules
+#
+# Every POST takes a batch of documents:
+#   {"documents": [{"path": "articles/overview.md", "content": "..."}, ...]}
+# A document is rebranded as YAML if its path ends in .yml or .yaml (or "type" is "yaml"),
+# and as markdown otherwise ("type" can only be "markdown" or "yaml"). Each document is
+# rebranded on its own, so first mention logic doesn't see the [!INCLUDE] files of the page.
+# Requests are handled concurrently, one thread per connection. Bad requests get a 400 and
+# errors in the rules or the engine a 500, both with an {"error": "..."} body.
+#
+# Files used:
+# - patterns/*.csv: Same pattern files as rebrand-md.py and rebrand-yml.py
+#
+# Environment variables:
+# - DEBUG: Set to 'true' to enable debug output (optional)
+#
+# Usage:
+#   python rebrand-server.py                 # serve on http://127.0.0.1:8765
+#   python rebrand-server.py --port 9000
+#   python rebrand-server.py --profile       # write cProfile stats when the server stops
+#   curl -s localhost:8765/diff -d '{"documents": [{"path": "a.md", "content": "# Azure AI Foundry\n"}]}'
+
+import argparse
+import difflib
+import json
+import os
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from engine import load_rule_engine
+from term_scan import load_scan_terms, scan_text, YAML_EXTENSIONS
+from matcher import TermMatcher
+from profiling import add_profiling_arguments, profile_run
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 50 * 1024 * 1024
+
+# Values of the "type" of a document
+DOCUMENT_TYPES = ('markdown', 'yaml')
+
+
+class RebrandService:
+    """The compiled rules and the request handlers that use them."""
+
+    def __init__(self, patterns_dir='patterns', debug_mode=False):
+        """Load and compile the pattern files once.
+
+        Args:
+            patterns_dir: Directory containing the pattern CSV files
+            debug_mode: Whether to print debug information
+        """
+        self.engine = load_rule_engine(patterns_dir, debug_mode=debug_mode)
+        self.scan_terms = load_scan_terms(patterns_dir, debug_mode=debug_mode)
+        self.scan_matcher = TermMatcher(self.scan_terms)
+
+    def _documents(self, payload):
+        if not isinstance(payload, dict) or not isinstance(payload.get('documents'), list):
+            raise ValueError("expected a JSON object with a 'documents' list")
+        documents = []
+        for i, document in enumerate(payload['documents']):
+            if not isinstance(document, dict):
+                raise ValueError(f"document {i} must be a JSON object")
+            if not isinstance(document.get('content'), str):
+                raise ValueError(f"document {i} needs a 'content' string")
+            for key in ('path', 'type'):
+                if document.get(key) is not None and not isinstance(document[key], str):
+                    raise ValueError(f"document {i}: '{key}' must be a string")
+            if document.get('type') is not None and document['type'] not in DOCUMENT_TYPES:
+                raise ValueError(f"document {i}: 'type' must be one of {', '.join(DOCUMENT_TYPES)} (got '{document['type']}')")
+            path = document.get('path') or f"document-{i}.md"
+            is_yaml = (document.get('type') or ('yaml' if path.endswith(YAML_EXTENSIONS) else 'markdown')) == 'yaml'
+            documents.append((path, document['content'], is_yaml))
+        return documents
+
+    def _rebrand(self, path, content, is_yaml):
+        if is_yaml:
+            return self.engine.rebrand_yaml(content, path)
+        return self.engine.rebrand_markdown(content, file_path=path)
+
+    def rebrand(self, payload):
+        results = []
+        for path, content, is_yaml in self._documents(payload):
+            rebranded = self._rebrand(path, content, is_yaml)
+            results.append({'path': path, 'changed': rebranded != content, 'content': rebranded})
+        return {'results': results}
+
+    def diff(self, payload):
+        results = []
+        for path, content, is_yaml in self._documents(payload):
+            rebranded = self._rebrand(path, content, is_yaml)
+            diff = ''.join(difflib.unified_diff(content.splitlines(keepends=True), rebranded.splitlines(keepends=True),
+                                                fromfile=f"a/{path}", tofile=f"b/{path}"))
+            results.append({'path': path, 'changed': rebranded != content, 'diff': diff})
+        return {'results': results}
+
+    def scan(self, payload):
+        results = []
+        for path, content, is_yaml in self._documents(payload):
+            terms = {}
+            for (term, section), count in scan_text(content, self.scan_matcher, 'yaml' if is_yaml else 'markdown').items():
+                terms.setdefault(term, {})[section] = count
+            results.append({'path': path, 'terms': terms})
+        return {'results': results}
+
+    def health(self):
+        return {'status': 'ok', 'rules': len(self.engine.rules)}
+
+
+class RebrandRequestHandler(BaseHTTPRequestHandler):
+    """Route JSON requests to the RebrandService of the server."""
+
+    routes = {'/rebrand': 'rebrand', '/diff': 'diff', '/scan': 'scan'}
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, self.server.service.health())
+        else:
+            self._send(404, {'error': f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        route = self.routes.get(self.path)
+        if route is None:
+            self._send(404, {'error': f"unknown endpoint {self.path}"})
+            return
+        if self.headers.get('Content-Length') is None:
+            self._send(411, {'error': "Content-Length header required"})
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+            if length < 0:
+                raise ValueError(f"invalid Content-Length {length}")
+            if length > MAX_BODY_SIZE:
+                self._send(413, {'error': f"request body larger than {MAX_BODY_SIZE} bytes"})
+                return
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            response = getattr(self.server.service, route)(payload)
+        except ValueError as e:
+            # Also covers malformed JSON (json.JSONDecodeError)
+            self._send(400, {'error': str(e)})
+            return
+        except Exception as e:
+            # A bug in the rules or the engine: answer with JSON instead of dropping the connection
+            traceback.print_exc()
+            self._send(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, response)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.debug_mode:
+            super().log_message(format, *args)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, debug_mode=False):
+    """Create a threaded HTTP server for a RebrandService (port 0 picks a free port).
+
+    Returns:
+        ThreadingHTTPServer: Call serve_forever() to start handling requests
+    """
+    server = ThreadingHTTPServer((host, port), RebrandRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.debug_mode = debug_mode
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the rebrand rules over a local HTTP/JSON API")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Address to listen on (default {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    add_profiling_arguments(parser, slow_log=False)
+    args = parser.parse_args()
+
+    load_dotenv()
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+
+    service = RebrandService(args.patterns, debug_mode=debug_mode)
+    server = make_server(service, args.host, args.port, debug_mode=debug_mode)
+    print(f"Serving {len(service.engine.rules)} rules on http://{args.host}:{server.server_port} (Ctrl+C to stop)")
+    # The profiles are written when the server stops (Ctrl+C); cProfile covers the main thread only
+    with profile_run(args):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped")
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+## Run this script to keep rebranding .md and .yml files while writers add and edit them
+# This script rebrands the directory once (like rebrand-all.py), then keeps the compiled
+# rules in memory and watches the directory. New or modified .md files are rebranded
+# with first mention logic and .yml/.yaml files with uniform replacement, usually within
+# milliseconds of being saved. When a file in patterns/*.csv changes, the rules are
+# reloaded and used for every file that changes after that, and when a file in a .rebrand/
+# overlay folder changes, the per-folder rules are resolved again.
+#
+# Changes are detected with the watchdog package (inotify on Linux, native events on
+# Windows and macOS) when it is installed, and by polling modification times otherwise.
+#
+# Files used:
+# - patterns/*.csv: Same pattern files as rebrand-md.py and rebrand-yml.py (reloaded when they change)
+#
+# Environment variables:
+# - DIRECTORY_PATH: Directory to watch (used when no directory is given)
+# - DEBUG: Set to 'true' to enable debug output (optional)
+# - CHANGE_LOG: Folder of the change log that revert.py replays, 'off' to turn it off (optional, default .rebrand-cache/changes under the watched directory)
+#
+# Usage:
+#   python rebrand-watch.py                  # rebrand DIRECTORY_PATH, then watch it
+#   python rebrand-watch.py --no-initial     # only rebrand files that change from now on
+#   python rebrand-watch.py --poll           # poll for changes even if watchdog is installed
+#   python rebrand-watch.py --trace-memory   # write the top allocation sites when the watcher stops
+# Press Ctrl+C to stop.
+
+import argparse
+import os
+import queue
+import time
+import importlib.util
+from dotenv import load_dotenv
+from changelog import change_log_from_env
+from engine import load_rule_engine
+from handlers import rebrand_markdown_file, rebrand_yaml_file
+from includes import cache_file_for, IncludeScopes
+from overlays import OVERLAY_DIR, RuleResolver
+from path_rules import load_path_rules
+from profiling import add_profiling_arguments, profile_run
+from textio import Quarantined
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+# Load modules with hyphens in their names using importlib
+def load_module(module_name, file_path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+YAML_EXTENSIONS = ('.yml', '.yaml')
+
+
+class RebrandWatcher:
+    """Rebrand the files of a directory as they change, with the rules kept in memory."""
+
+    def __init__(self, path, patterns_dir='patterns', debug_mode=False):
+        """Load the rules and index the directory.
+
+        Args:
+            path: Directory to watch
+            patterns_dir: Directory containing the pattern CSV files
+            debug_mode: Whether to print debug information
+        """
+        self.path = os.path.abspath(path)
+        self.patterns_dir = os.path.abspath(patterns_dir)
+        self.debug_mode = debug_mode
+        # Size and modification time of the files this watcher wrote, to ignore their change events
+        self._written = {}
+        # Loaded here instead of at import, so --help doesn't load the rebrand scripts
+        self.rebrand_md = load_module('rebrand_md', os.path.join(os.path.dirname(__file__), 'rebrand-md.py'))
+        self.rebrand_yml = load_module('rebrand_yml', os.path.join(os.path.dirname(__file__), 'rebrand-yml.py'))
+        self._load_rules()
+
+    def _load_rules(self):
+        # Recorded first, so pattern files that fail to load aren't retried until they change again
+        self._pattern_stamps = self.pattern_stamps()
+        self.engine = load_rule_engine(self.patterns_dir, debug_mode=self.debug_mode,
+                                       change_log=change_log_from_env(self.path))
+        self.rules = RuleResolver(self.engine, self.path, self.debug_mode)
+        self.path_rules = load_path_rules(self.patterns_dir, debug_mode=self.debug_mode)
+        self.markdown_files = {os.path.abspath(file_path) for file_path in self.rebrand_md.find_markdown_files(self.path, self.path_rules)}
+        self.include_scopes = IncludeScopes(self.markdown_files, self.engine, self.rules, cache_file_for(self.path),
+                                            self.debug_mode)
+
+    def rebrand_all(self):
+        """Rebrand every file in the directory once, with the rules already in memory."""
+        self.rebrand_md.rebrand_markdown_files(self.path, self.debug_mode, engine=self.engine, path_rules=self.path_rules)
+        self.rebrand_yml.rebrand_yaml_files(self.path, self.debug_mode, engine=self.engine, path_rules=self.path_rules)
+        self.include_scopes.refresh(self.markdown_files)
+
+    def pattern_stamps(self):
+        """Return the (modification time, size) of every pattern file."""
+        stamps = {}
+        for file in os.listdir(self.patterns_dir):
+            file_path = os.path.join(self.patterns_dir, file)
+            if self.is_pattern_file(file_path):
+                stat = os.stat(file_path)
+                stamps[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def is_pattern_file(self, file_path):
+        return os.path.dirname(file_path) == self.patterns_dir and file_path.endswith('.csv')
+
+    def is_overlay_file(self, file_path):
+        return os.path.basename(os.path.dirname(file_path)) == OVERLAY_DIR and file_path.endswith('.csv')
+
+    def is_markdown_file(self, file_path):
+        if not file_path.endswith('.md') or "new-name.md" in os.path.basename(file_path):
+            return False
+        return self.path_rules.includes_file(os.path.relpath(file_path, self.path))
+
+    def is_yaml_file(self, file_path):
+        return file_path.endswith(YAML_EXTENSIONS) and self.path_rules.includes_file(os.path.relpath(file_path, self.path))
+
+    def _is_own_write(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Deleted or moved away before it could be processed
+            return True
+        return self._written.get(file_path) == (stat.st_mtime_ns, stat.st_size)
+
+    def _record_write(self, file_path):
+        stat = os.stat(file_path)
+        self._written[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+    def reload_rules(self):
+        """Reload the pattern files, keeping the current rules if they can't be loaded.
+
+        Returns:
+            bool: True if the rules were reloaded
+        """
+        try:
+            self._load_rules()
+        except Exception as e:
+            print(f"Error: could not reload {self.patterns_dir}, keeping the current rules: {e}")
+            return False
+        print(f"Reloaded {len(self.engine.rules)} rules from {self.patterns_dir}")
+        return True
+
+    def process(self, paths):
+        """Rebrand a batch of changed files.
+
+        Args:
+            paths: Paths reported as created or modified (other files are ignored)
+
+        Returns:
+            list: The files that were rewritten
+        """
+        paths = {os.path.abspath(file_path) for file_path in paths}
+        if any(self.is_pattern_file(file_path) for file_path in paths) and self.pattern_stamps() != self._pattern_stamps:
+            self.reload_rules()
+        elif any(self.is_overlay_file(file_path) for file_path in paths):
+            try:
+                self.rules = RuleResolver(self.engine, self.path, self.debug_mode)
+                self.include_scopes.rules = self.rules
+                print("Reloaded the .rebrand/ overlays")
+            except Exception as e:
+                print(f"Error: could not reload the .rebrand/ overlays, keeping the current rules: {e}")
+
+        markdown_paths = sorted(file_path for file_path in paths
+                                if file_path.startswith(self.path + os.sep) and self.is_markdown_file(file_path)
+                                and not self._is_own_write(file_path))
+        yaml_paths = sorted(file_path for file_path in paths
+                            if file_path.startswith(self.path + os.sep) and self.is_yaml_file(file_path)
+                            and not self._is_own_write(file_path))
+
+        changed = []
+        if markdown_paths:
+            # New files join the include graph; changed ones are re-indexed from their new content
+            self.markdown_files = {file_path for file_path in self.markdown_files | set(markdown_paths) if os.path.exists(file_path)}
+            self.include_scopes.refresh(self.markdown_files)
+        for file_path in markdown_paths + yaml_paths:
+            start = time.perf_counter()
+            if file_path in markdown_paths:
+                rewritten = rebrand_markdown_file(file_path, self.rules, self.include_scopes.scope(file_path))
+            else:
+                rewritten = rebrand_yaml_file(file_path, self.rules)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if rewritten:
+                self._record_write(file_path)
+                changed.append(file_path)
+                print(f"Rebranded {os.path.relpath(file_path, self.path)} ({elapsed_ms:.0f} ms)")
+            elif isinstance(rewritten, Quarantined):
+                print(f"Quarantined {os.path.relpath(file_path, self.path)}: {rewritten.reason}")
+            elif self.debug_mode:
+                print(f"No changes needed in {os.path.relpath(file_path, self.path)}")
+        return changed
+
+    def snapshot(self):
+        """Return the (modification time, size) of every watched file and pattern file, for polling."""
+        stamps = {}
+        # The skipped folders aren't entered; the overlays of the folders that are entered are watched too
+        folders = [(self.patterns_dir, os.listdir(self.patterns_dir))]
+        for root, _, files in self.path_rules.walk(self.path):
+            folders.append((root, files))
+            overlay_dir = os.path.join(root, OVERLAY_DIR)
+            if os.path.isdir(overlay_dir):
+                folders.append((overlay_dir, os.listdir(overlay_dir)))
+        for root, files in folders:
+            for file in files:
+                file_path = os.path.join(root, file)
+                if (self.is_pattern_file(file_path) or self.is_overlay_file(file_path) or self.is_markdown_file(file_path)
+                        or self.is_yaml_file(file_path)):
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    stamps[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def watch(self, poll=False, interval=1.0, debounce=0.05):
+        """Watch the directory until interrupted with Ctrl+C.
+
+        Args:
+            poll: Poll for changes even if watchdog is installed
+            interval: Seconds between polls
+            debounce: Seconds to wait for more events before processing a batch
+        """
+        try:
+            if Observer is not None and not poll:
+                self._watch_events(debounce)
+            else:
+                self._watch_polling(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+        finally:
+            self.include_scopes.save()
+
+    def _watch_polling(self, interval):
+        print(f"Watching {self.path} (polling every {interval:g}s)...")
+        stamps = self.snapshot()
+        while True:
+            time.sleep(interval)
+            new_stamps = self.snapshot()
+            changed = [file_path for file_path, stamp in new_stamps.items() if stamps.get(file_path) != stamp]
+            if changed:
+                # The files rewritten here show up as changed in the next poll and are skipped then
+                self.process(changed)
+            stamps = new_stamps
+
+    def _watch_events(self, debounce):
+        events = queue.Queue()
+
+        class QueueHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Reading a file also reports events (opened, closed without writing)
+                if event.is_directory or event.event_type not in ('created', 'modified', 'moved', 'closed'):
+                    return
+                events.put(event.src_path)
+                if getattr(event, 'dest_path', None):
+                    events.put(event.dest_path)
+
+        observer = Observer()
+        observer.schedule(QueueHandler(), self.path, recursive=True)
+        observer.schedule(QueueHandler(), self.patterns_dir, recursive=False)
+        observer.start()
+        print(f"Watching {self.path}...")
+        try:
+            while True:
+                try:
+                    batch = {events.get(timeout=1)}
+                except queue.Empty:
+                    continue
+                # Editors often save in several steps, so collect the events of one save
+                deadline = time.monotonic() + debounce
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.add(events.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self.process(batch)
+        finally:
+            observer.stop()
+            observer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebrand .md and .yml files as they change, with the rules kept in memory")
+    parser.add_argument('path', nargs='?', help="Directory to watch (defaults to DIRECTORY_PATH)")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    parser.add_argument('--no-initial', action='store_true', help="Don't rebrand the whole directory before watching")
+    parser.add_argument('--poll', action='store_true', help="Poll for changes even if watchdog is installed")
+    parser.add_argument('--interval', type=float, default=1.0, help="Seconds between polls (default 1)")
+    add_profiling_arguments(parser, slow_log=False)
+    args = parser.parse_args()
+
+    load_dotenv()
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    path = args.path or os.getenv('DIRECTORY_PATH')
+    if not path:
+        print("Error: no directory given and DIRECTORY_PATH not found in .env file")
+        return
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        return
+
+    # The profiles are written when the watcher stops (Ctrl+C)
+    with profile_run(args):
+        watcher = RebrandWatcher(path, args.patterns, debug_mode=debug_mode)
+        if not args.no_initial:
+            watcher.rebrand_all()
+        watcher.watch(poll=args.poll, interval=args.interval)
+
+
+if __name__ == '__main__':
+    main()
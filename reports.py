@@ -0,0 +1,320 @@
+"""
+JSON run reports, written per run or per shard and merged into one summary.
+
+The worker processes send each file's result back through the pool's result
+queue; the result of a rewritten file (changelog.Rewritten) carries the number
+of changes per rule, so the report can total them per rule and per folder
+without any state shared between the workers. The summary is written as CSV,
+JSON or a Markdown table for the pull request description.
+"""
+import csv
+import json
+import os
+import time
+from sharding import relative_path
+from textio import Quarantined
+
+# Folder levels (below the processed directory) that the rule summary groups files by
+SUMMARY_DEPTH = 2
+SUMMARY_FORMATS = ('.csv', '.json', '.md')
+
+REPORT_VERSION = 1
+
+
+class RunReport:
+    """Record of the files one run (or one shard of a run) processed."""
+
+    def __init__(self, root, shard=None):
+        """Start a report.
+
+        Args:
+            root: Directory the run processed (file paths are recorded relative to it)
+            shard: (index, count) tuple from sharding.parse_shard, or None
+        """
+        self.root = root
+        self.shard = shard
+        self.files = []
+        self.workers = {}
+        self.dedup = {}
+        self._start = time.perf_counter()
+
+    def add_file(self, file_path, script, changed):
+        """Record one processed file.
+
+        Args:
+            file_path: Path of the file
+            script: Name of the script that processed it, like 'rebrand-md'
+            changed: Whether the file was rewritten, or the textio.Quarantined result of a file
+                     that was left alone
+        """
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        entry = {'path': relative_path(file_path, self.root), 'script': script, 'changed': bool(changed), 'size': size}
+        if isinstance(changed, Quarantined):
+            entry['quarantined'] = changed.reason
+        rules = getattr(changed, 'rules', None)
+        if rules:
+            entry['rules'] = dict(rules)
+        self.files.append(entry)
+
+    def add_worker_stats(self, script, stats):
+        """Record the per-worker utilization of one script.
+
+        Args:
+            script: Name of the script, like 'rebrand-md'
+            stats: List of scheduler.WorkerStats
+        """
+        self.workers[script] = [{'worker': stat.worker, 'files': stat.files, 'busy_seconds': round(stat.busy, 3),
+                                 'utilization': round(stat.utilization, 3)} for stat in stats]
+
+    def add_dedup(self, script, savings):
+        """Record how many files of one script reused the result of an identical file.
+
+        Args:
+            script: Name of the script, like 'rebrand-md'
+            savings: Dictionary from dedup.dedup_savings
+        """
+        self.dedup[script] = dict(savings)
+
+    def to_dict(self):
+        return {
+            'version': REPORT_VERSION,
+            'root': os.path.abspath(self.root),
+            'shard': f"{self.shard[0]}/{self.shard[1]}" if self.shard else None,
+            'elapsed_seconds': round(time.perf_counter() - self._start, 3),
+            'totals': totals(self.files),
+            'workers': self.workers,
+            'dedup': self.dedup,
+            'quarantined': quarantined(self.files),
+            'files': self.files,
+        }
+
+    def write(self, report_file):
+        """Write the report as JSON."""
+        report_dir = os.path.dirname(report_file)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def totals(files):
+    """Count processed, changed and quarantined files and bytes per script."""
+    result = {}
+    for entry in files:
+        script_totals = result.setdefault(entry['script'], {'processed': 0, 'changed': 0, 'quarantined': 0, 'bytes': 0})
+        script_totals['processed'] += 1
+        script_totals['changed'] += entry['changed']
+        script_totals['quarantined'] += 'quarantined' in entry
+        script_totals['bytes'] += entry['size']
+    return result
+
+
+def quarantined(files):
+    """List the files that were left alone because they can't be read or written as text."""
+    return [{'path': entry['path'], 'script': entry['script'], 'reason': entry['quarantined']}
+            for entry in files if 'quarantined' in entry]
+
+
+def progress(run, desc="Processing files"):
+    """Show a progress bar for a run and yield its results.
+
+    The bar counts bytes rather than files: the files are processed largest first,
+    so a count of files would start slow and make the ETA far too long.
+
+    Args:
+        run: dedup.DedupRun (or another iterable of (file_path, result) tuples with a files list)
+        desc: Label of the bar
+
+    Yields:
+        tuple: (file_path, result) as the run yields them
+    """
+    from tqdm import tqdm
+    sizes = {}
+    for file_path in run.files:
+        try:
+            sizes[file_path] = os.path.getsize(file_path)
+        except OSError:
+            sizes[file_path] = 0
+    done = changed_count = 0
+    with tqdm(total=sum(sizes.values()), desc=desc, unit='B', unit_scale=True, unit_divisor=1024) as pbar:
+        for file_path, changed in run:
+            done += 1
+            changed_count += bool(changed)
+            pbar.set_postfix_str(f"{done}/{len(sizes)} files, {changed_count} changed", refresh=False)
+            pbar.update(sizes.get(file_path, 0))
+            yield file_path, changed
+
+
+def _folder(path, depth):
+    folder = os.path.dirname(path).replace(os.sep, '/')
+    return '/'.join(folder.split('/')[:depth]) if folder else '.'
+
+
+def rule_summary(files, depth=SUMMARY_DEPTH):
+    """Total the changes of each rule per folder.
+
+    Each replacement is counted for the one rule that made it, as the engine counted it.
+
+    Args:
+        files: The 'files' entries of a report (RunReport.to_dict or merge_reports)
+        depth: Number of folder levels to group the files by
+
+    Returns:
+        dict: 'rules' lists each rule with its files and changes, most changes first, and
+              'folders' each (rule, folder) pair the same way
+    """
+    rules = {}
+    folders = {}
+    for entry in files:
+        folder = _folder(entry['path'], depth)
+        for rule, count in entry.get('rules', {}).items():
+            rule_totals = rules.setdefault(rule, {'rule': rule, 'files': 0, 'changes': 0})
+            folder_totals = folders.setdefault((rule, folder), {'rule': rule, 'folder': folder, 'files': 0, 'changes': 0})
+            for row in (rule_totals, folder_totals):
+                row['files'] += 1
+                row['changes'] += count
+    def order(row):
+        return -row['changes'], row['rule'], row.get('folder', '')
+    return {'rules': sorted(rules.values(), key=order), 'folders': sorted(folders.values(), key=order)}
+
+
+def write_summary(summary, summary_file):
+    """Write a rule_summary as CSV, JSON or Markdown, by the extension of the file name.
+
+    The CSV has a row per rule and folder; the JSON and Markdown also have the totals per rule.
+    """
+    summary_dir = os.path.dirname(summary_file)
+    if summary_dir:
+        os.makedirs(summary_dir, exist_ok=True)
+    extension = os.path.splitext(summary_file)[1].lower()
+    with open(summary_file, 'w', encoding='utf-8', newline='') as f:
+        if extension == '.json':
+            json.dump(summary, f, indent=2)
+        elif extension == '.csv':
+            writer = csv.DictWriter(f, fieldnames=['rule', 'folder', 'files', 'changes'])
+            writer.writeheader()
+            writer.writerows(summary['folders'])
+        elif extension == '.md':
+            f.write(format_summary_markdown(summary))
+        else:
+            raise ValueError(f"{summary_file}: the summary is written as .csv, .json or .md")
+
+
+def _markdown_cell(text):
+    return str(text).replace('|', '\\|')
+
+
+def format_summary_markdown(summary):
+    """Format a rule_summary as Markdown tables for a pull request description."""
+    lines = ["| Rule | Files | Changes |", "|------|------:|--------:|"]
+    lines.extend(f"| {_markdown_cell(row['rule'])} | {row['files']} | {row['changes']} |" for row in summary['rules'])
+    lines.extend(["", "| Rule | Folder | Files | Changes |", "|------|--------|------:|--------:|"])
+    lines.extend(f"| {_markdown_cell(row['rule'])} | {_markdown_cell(row['folder'])} | {row['files']} | {row['changes']} |"
+                 for row in summary['folders'])
+    return '\n'.join(lines) + '\n'
+
+
+def format_rule_totals(summary, top=10):
+    """Format the rules with the most changes as readable lines."""
+    rows = summary['rules']
+    lines = [f"  {row['rule']}: {row['changes']} change(s) in {row['files']} file(s)" for row in rows[:top]]
+    if len(rows) > top:
+        lines.append(f"  ... and {len(rows) - top} more rule(s)")
+    return '\n'.join(lines)
+
+
+def load_report(report_file):
+    """Read a report written by RunReport.write."""
+    with open(report_file, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"{report_file} is not a version {REPORT_VERSION} run report")
+    return report
+
+
+def merge_reports(reports):
+    """Combine the reports of the shards of one run.
+
+    Args:
+        reports: List of report dictionaries (from load_report)
+
+    Returns:
+        dict: Merged report with the combined files, totals and dedup savings, per-shard statistics,
+              and a 'problems' list (missing or repeated shards, files processed twice)
+    """
+    problems = []
+    counts = {int(report['shard'].split('/')[1]) for report in reports if report['shard']}
+    if len(counts) > 1:
+        problems.append(f"reports come from runs with different shard counts: {sorted(counts)}")
+
+    seen_shards = {}
+    for report in reports:
+        if report['shard']:
+            seen_shards[report['shard']] = seen_shards.get(report['shard'], 0) + 1
+    for shard, times in sorted(seen_shards.items()):
+        if times > 1:
+            problems.append(f"shard {shard} appears in {times} reports")
+    if len(counts) == 1:
+        count = counts.pop()
+        missing = [f"{index}/{count}" for index in range(1, count + 1) if f"{index}/{count}" not in seen_shards]
+        if missing:
+            problems.append(f"missing shard report(s): {', '.join(missing)}")
+
+    files = []
+    owners = {}
+    for report in reports:
+        for entry in report['files']:
+            key = (entry['script'], entry['path'])
+            if key in owners:
+                problems.append(f"{entry['path']} was processed by {entry['script']} in shards {owners[key]} and {report['shard']}")
+                continue
+            owners[key] = report['shard']
+            files.append(entry)
+
+    dedup = {}
+    for report in reports:
+        for script, savings in report.get('dedup', {}).items():
+            script_dedup = dedup.setdefault(script, {'unique': 0, 'duplicates': 0, 'bytes_saved': 0})
+            for key in script_dedup:
+                script_dedup[key] += savings[key]
+
+    shards = [{'shard': report['shard'], 'elapsed_seconds': report['elapsed_seconds'],
+               'files': len(report['files']), 'bytes': sum(entry['size'] for entry in report['files'])}
+              for report in sorted(reports, key=lambda report: report['shard'] or '')]
+    return {
+        'version': REPORT_VERSION,
+        'root': reports[0]['root'] if reports else None,
+        'shards': shards,
+        'elapsed_seconds': max((shard['elapsed_seconds'] for shard in shards), default=0),
+        'totals': totals(files),
+        'dedup': dedup,
+        'problems': problems,
+        'quarantined': quarantined(files),
+        'files': files,
+    }
+
+
+def format_summary(merged):
+    """Format a merged report as readable text."""
+    lines = [f"Merged {len(merged['shards'])} report(s) for {merged['root']}"]
+    lines.append("=" * 60)
+    for shard in merged['shards']:
+        lines.append(f"  shard {shard['shard'] or '-':>6}: {shard['files']:6} files {shard['bytes']:12,} bytes "
+                     f"{shard['elapsed_seconds']:8.1f}s")
+    lines.append("-" * 60)
+    for script, script_totals in sorted(merged['totals'].items()):
+        lines.append(f"  {script}: {script_totals['processed']} files processed, {script_totals['changed']} changed")
+        if script_totals.get('quarantined'):
+            lines.append(f"    {script_totals['quarantined']} file(s) quarantined (can't be read or written as text)")
+        savings = merged.get('dedup', {}).get(script)
+        if savings and savings['duplicates']:
+            lines.append(f"    {savings['duplicates']} duplicate file(s) reused a result ({savings['bytes_saved']:,} bytes not processed)")
+    lines.append(f"  Wall time (slowest shard): {merged['elapsed_seconds']:.1f}s")
+    for entry in merged.get('quarantined', []):
+        lines.append(f"Quarantined: {entry['path']} ({entry['script']}): {entry['reason']}")
+    for problem in merged['problems']:
+        lines.append(f"Warning: {problem}")
+    return '\n'.join(lines)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+## Run this script to undo part of a rebrand without rerunning it or discarding other edits
+# The rebrand scripts record every change they make to a file in a binary change log
+# (see changelog.py). This script replays the log newest change first and puts back the
+# old text of the changes made by one rule, or in the files that match a glob, or both.
+# Changes whose new text is no longer in the file (it was edited by hand) are skipped
+# and listed. Reverted changes are removed from the log.
+#
+# Environment variables:
+# - DIRECTORY_PATH: Folder the rebrand ran on; --path globs are relative to it (optional, default the current folder)
+# - CHANGE_LOG: Folder of the change log (optional, default .rebrand-cache/changes under DIRECTORY_PATH)
+#
+# Usage:
+#   python revert.py --rule "Azure AI Services"           # undo the replacements of one rule
+#   python revert.py --path "articles/ai-studio/*"        # undo every change in some files
+#   python revert.py --rule "Azure AI Services" --path "articles/ai-studio/*"
+#   python revert.py --rule "Azure AI Services" --dry-run # only list what would be reverted
+
+import argparse
+import os
+import sys
+from collections import Counter
+from dotenv import load_dotenv
+from changelog import change_log_from_env, drop_changes, read_change_log, revert_changes, select_changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revert recorded rebrand changes by rule or path")
+    parser.add_argument('--rule', help="Revert the changes of the rule with this term")
+    parser.add_argument('--path', help="Revert the changes in the files that match this glob")
+    parser.add_argument('--log', help="Change log folder (defaults to CHANGE_LOG, else .rebrand-cache/changes under DIRECTORY_PATH)")
+    parser.add_argument('--dry-run', action='store_true', help="List the changes without reverting them")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.rule is None and args.path is None:
+        parser.error("give --rule, --path or both")
+    root = os.getenv('DIRECTORY_PATH') or '.'
+    change_log = change_log_from_env(root, args.log)
+    if change_log is None:
+        print("Error: CHANGE_LOG is off, so there is no change log to revert", file=sys.stderr)
+        return 2
+    log_dir = change_log.directory
+
+    try:
+        records = read_change_log(log_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {log_dir}: {e}", file=sys.stderr)
+        return 2
+    selected = select_changes(records, args.rule, args.path, root)
+    if not selected:
+        print(f"No recorded changes match in {log_dir}")
+        return 0
+
+    reverted, missing = revert_changes(records, selected, dry_run=args.dry_run)
+    per_file = Counter(records[record_index].path for record_index, _ in reverted)
+    for path, count in sorted(per_file.items()):
+        print(f"  {'Would revert' if args.dry_run else 'Reverted'} {count} change(s) in {path}")
+    for record_index, change_index in missing:
+        record = records[record_index]
+        change = record.changes[change_index]
+        print(f"  Skipped {record.path}:{change.line}: '{change.new}' is no longer there")
+
+    if not args.dry_run:
+        drop_changes(records, reverted)
+    print(f"{'Would revert' if args.dry_run else 'Reverted'} {len(reverted)} change(s) in {len(per_file)} file(s)"
+          + (f", skipped {len(missing)}" if missing else ""))
+    return 1 if missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Conflict and overlap analysis for the replacement rules in patterns/*.csv.
+
+The scripts apply first_mention.csv, then always.csv, then cleanup.csv, each in CSV
+row order, so the result depends on how overlapping terms happen to be ordered.
+These helpers find the rules that interact, report the ones that are shadowed,
+overlapping, cyclic or dead, and compute the longest-match-first order that the
+rule engine runs them in.
+"""
+from collections import namedtuple
+from matcher import TermMatcher
+
+PHASES = ('first_mention', 'always', 'cleanup')
+
+# phase: one of PHASES, index: row in its CSV file (0-based), term: search term,
+# outputs: replacement terms (first and subsequent for first mention rules)
+Rule = namedtuple('Rule', 'phase index term outputs')
+
+
+def build_rules(first_mention_replacements, compound_replacements, cleanup_replacements):
+    """Combine the loaded pattern files into one list of rules in CSV order.
+
+    Args:
+        first_mention_replacements: List of (term, first_replace, subsequent_replace) tuples
+        compound_replacements: Dictionary of always.csv search->replace mappings
+        cleanup_replacements: Dictionary of cleanup.csv search->replace mappings
+
+    Returns:
+        list: List of Rule tuples, phase by phase
+    """
+    rules = []
+    for i, (term, first_replace, subsequent_replace) in enumerate(first_mention_replacements):
+        rules.append(Rule('first_mention', i, term, (first_replace, subsequent_replace)))
+    for i, (search_term, replace_term) in enumerate(compound_replacements.items()):
+        rules.append(Rule('always', i, search_term, (replace_term,)))
+    for i, (search_term, replace_term) in enumerate(cleanup_replacements.items()):
+        rules.append(Rule('cleanup', i, search_term, (replace_term,)))
+    return rules
+
+
+def describe(rule):
+    """Return a short human-readable label for a rule, like always.csv:12 'AI Services'."""
+    # +2 for the header row and 1-based line numbers
+    return f"{rule.phase}.csv:{rule.index + 2} '{rule.term}'"
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def overlap_terms(output, matcher, reverse_matcher, word_aligned=False):
+    """Find the terms that a replacement output can create together with its surrounding text.
+
+    A term can newly appear after a replacement when it overlaps the inserted text:
+    the term sits inside the output, the output sits inside the term, or the term
+    starts inside the output and runs past its end (or the other way around).
+
+    Args:
+        output: The replacement text
+        matcher: TermMatcher over all terms
+        reverse_matcher: TermMatcher over all terms reversed
+        word_aligned: Only count overlaps that start and end on word boundaries
+
+    Returns:
+        set: Terms that can be created
+    """
+    if not output:
+        # Deleting text can join anything around it
+        return set(matcher.terms)
+
+    created = set()
+    for start, end, term in matcher.find_all(output):
+        if not word_aligned or _on_word_boundaries(output, start, end):
+            created.add(term)
+    created.update(term for term in matcher.terms if output in term and len(term) > len(output))
+
+    # The term starts inside the output and continues past its end
+    for i in range(1, len(output)):
+        if word_aligned and not (output[i - 1] == ' ' and _is_word_char(output[i])):
+            continue
+        for term in matcher.terms_with_prefix(output[i:]):
+            if len(term) > len(output) - i and (not word_aligned or not _is_word_char(term[len(output) - i])):
+                created.add(term)
+
+    # The term ends inside the output and starts before it
+    reversed_output = output[::-1]
+    for i in range(1, len(output)):
+        if word_aligned and not (output[len(output) - i] == ' ' and _is_word_char(output[len(output) - i - 1])):
+            continue
+        for reversed_term in reverse_matcher.terms_with_prefix(reversed_output[i:]):
+            term = reversed_term[::-1]
+            if len(term) > len(output) - i and (not word_aligned or not _is_word_char(term[-(len(output) - i) - 1])):
+                created.add(term)
+
+    return created
+
+
+def _on_word_boundaries(text, start, end):
+    before_ok = start == 0 or not (_is_word_char(text[start - 1]) and _is_word_char(text[start]))
+    after_ok = end == len(text) or not (_is_word_char(text[end - 1]) and _is_word_char(text[end]))
+    return before_ok and after_ok
+
+
+def _term_overlaps(first, second):
+    """Return True if a suffix of first is a proper prefix of second (neither contains the other)."""
+    for k in range(1, min(len(first), len(second))):
+        if first.endswith(second[:k]):
+            return True
+    return False
+
+
+def compile_order(rules):
+    """Compute the longest-match-first order the engine runs the rules in.
+
+    Starting from the CSV order, a rule is moved up just far enough to run before:
+    - any rule whose term it contains (so "Azure AI Foundry Agent Service" runs
+      before "Azure AI Foundry", even when it lives in a later pattern file)
+    - any overlapping rule in the same file with a shorter term
+    - any rule whose term appears in its replacement (so chains finish in one run)
+    Everything else keeps its position.
+
+    Args:
+        rules: List of Rule tuples in CSV order
+
+    Returns:
+        tuple: (plan, cycles) where plan is the list of rules in execution order and
+               cycles lists (rule, other) pairs whose constraints could not both hold
+    """
+    before = {rule: [] for rule in rules}
+    by_term = {}
+    for rule in rules:
+        by_term.setdefault(rule.term, []).append(rule)
+    matcher = TermMatcher(by_term)
+
+    for rule in rules:
+        # Contained terms run after the longer rule
+        for _, _, term in matcher.find_all(rule.term):
+            if term != rule.term:
+                for shorter in by_term[term]:
+                    before[shorter].append(rule)
+        # Terms produced by the replacement run after it
+        for output in set(rule.outputs):
+            for _, _, term in matcher.find_all(output):
+                for created in by_term[term]:
+                    if created is not rule and created.term != rule.term:
+                        before[created].append(rule)
+
+    for i, rule in enumerate(rules):
+        for other in rules[i + 1:]:
+            if other.phase != rule.phase or rule.term in other.term or other.term in rule.term:
+                continue
+            if _term_overlaps(rule.term, other.term) or _term_overlaps(other.term, rule.term):
+                longer, shorter = (other, rule) if len(other.term) > len(rule.term) else (rule, other)
+                before[shorter].append(longer)
+
+    position = {rule: i for i, rule in enumerate(rules)}
+    plan = []
+    placed = set()
+    cycles = []
+
+    def place(rule, stack):
+        if rule in placed:
+            return
+        for predecessor in sorted(set(before[rule]), key=position.get):
+            if predecessor in stack:
+                cycles.append((predecessor, rule))
+                continue
+            place(predecessor, stack + (rule,))
+        if rule not in placed:
+            placed.add(rule)
+            plan.append(rule)
+
+    for rule in rules:
+        place(rule, ())
+
+    return plan, cycles
+
+
+def analyze_rules(rules, never_terms=()):
+    """Report shadowed, overlapping, cyclic and dead rules.
+
+    Args:
+        rules: List of Rule tuples in CSV order
+        never_terms: Terms that are protected from replacement
+
+    Returns:
+        list: List of finding dictionaries with kind, rule, other and message keys.
+              kind is one of 'shadowed', 'overlapping', 'cyclic', 'dead' or 'chain'.
+    """
+    findings = []
+    matcher = TermMatcher(rule.term for rule in rules)
+    reverse_matcher = TermMatcher(rule.term[::-1] for rule in rules)
+    never_matcher = TermMatcher(never_terms)
+    plan, _ = compile_order(rules)
+    plan_position = {rule: i for i, rule in enumerate(plan)}
+    csv_position = {rule: i for i, rule in enumerate(rules)}
+    by_term = {}
+    for rule in rules:
+        by_term.setdefault(rule.term, []).append(rule)
+
+    def add(kind, rule, other, message):
+        findings.append({'kind': kind, 'rule': rule, 'other': other, 'message': message})
+
+    for rule in rules:
+        # Dead: the rule can never change anything
+        if all(output == rule.term for output in rule.outputs):
+            add('dead', rule, None, "replacement is the same as the search term")
+        protected = never_matcher.present_terms(rule.term)
+        if protected:
+            add('dead', rule, None, f"term contains never-replace term '{sorted(protected)[0]}'")
+
+        for _, _, term in matcher.find_all(rule.term):
+            if term == rule.term:
+                continue
+            for shorter in by_term[term]:
+                if csv_position[shorter] > csv_position[rule]:
+                    if shorter.phase == rule.phase:
+                        add('overlapping', rule, shorter, f"contains the shorter term of {describe(shorter)}, which already runs later")
+                    continue
+                fixed = plan_position[rule] < plan_position[shorter]
+                note = " - the compiled order runs it first" if fixed else ""
+                if shorter.phase == rule.phase:
+                    add('shadowed', rule, shorter, f"earlier rule {describe(shorter)} rewrites every occurrence first{note}")
+                else:
+                    add('dead', rule, shorter, f"{describe(shorter)} in an earlier phase rewrites every occurrence first{note}")
+
+        for other in rules[csv_position[rule] + 1:]:
+            if other.phase != rule.phase or rule.term in other.term or other.term in rule.term:
+                continue
+            if _term_overlaps(rule.term, other.term) or _term_overlaps(other.term, rule.term):
+                add('overlapping', rule, other, f"overlaps {describe(other)}, so the compiled order matches the longer term first")
+
+    # Chains and cycles: a replacement that contains or forms another rule's term
+    edges = {rule: set() for rule in rules}
+    for rule in rules:
+        for output in set(rule.outputs):
+            contained = {term for _, _, term in matcher.find_all(output)}
+            for term in overlap_terms(output, matcher, reverse_matcher, word_aligned=True):
+                for created in by_term[term]:
+                    if created.term == rule.term:
+                        if term in contained and output != rule.term:
+                            add('cyclic', rule, rule, f"replacement '{output}' contains the term again, so every rerun rewrites it")
+                        continue
+                    if term in contained:
+                        edges[rule].add(created)
+                    if plan_position[created] > plan_position[rule]:
+                        how = "contains" if term in contained else "can form, with the surrounding text,"
+                        add('chain', rule, created, f"replacement '{output}' {how} the term of {describe(created)}")
+                    elif term in contained:
+                        add('cyclic', rule, created, f"replacement '{output}' contains the term of {describe(created)}, which runs earlier, so a rerun rewrites it again")
+
+    for cycle in _find_cycles(edges):
+        labels = ' -> '.join(describe(rule) for rule in cycle + [cycle[0]])
+        add('cyclic', cycle[0], cycle[1] if len(cycle) > 1 else cycle[0], f"rewrite cycle: {labels}")
+
+    return findings
+
+
+def _find_cycles(edges):
+    """Return the strongly connected components with more than one rule (Tarjan)."""
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    cycles = []
+    counter = [0]
+
+    def visit(node):
+        index[node] = lowlink[node] = counter[0]
+        counter[0] += 1
+        stack.append(node)
+        on_stack.add(node)
+        for successor in edges[node]:
+            if successor not in index:
+                visit(successor)
+                lowlink[node] = min(lowlink[node], lowlink[successor])
+            elif successor in on_stack:
+                lowlink[node] = min(lowlink[node], index[successor])
+        if lowlink[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member is node:
+                    break
+            if len(component) > 1:
+                cycles.append(component[::-1])
+
+    for node in edges:
+        if node not in index:
+            visit(node)
+    return cycles
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+## Run this script to see how often each pattern term occurs before a rebrand wave
+# This script goes through all .md, .yml and .yaml files in sub-directories from the
+# specified directory and counts every search term of first_mention.csv, always.csv,
+# cleanup.csv and never.csv. It never changes a file.
+# Counts are reported per term by section type (metadata, title, body, yaml), and terms
+# that never occur are listed as candidates to prune.
+#
+# Files used:
+# - patterns/first_mention.csv, patterns/always.csv, patterns/cleanup.csv, patterns/never.csv: Terms to count
+# - patterns/skip_folders.csv: Folder names, name globs or path globs to skip during directory traversal (optional)
+# - patterns/include_paths.csv: Path globs of the only files to process (optional)
+#
+# Environment variables:
+# - DIRECTORY_PATH: Directory to scan (used when no directory is given)
+# - DEBUG: Set to 'true' to enable debug output (optional)
+#
+# Usage:
+#   python scan-terms.py                              # scan DIRECTORY_PATH
+#   python scan-terms.py path/to/docs                 # scan another directory
+#   python scan-terms.py --csv term-folders.csv       # also export the term x folder matrix
+#   python scan-terms.py --csv out.csv --depth 1      # group folders by their top level
+#   python scan-terms.py --term "Azure AI Foundry"    # list the files that contain one term
+#   python scan-terms.py --profile scan.prof          # also write cProfile stats to scan.prof and scan.prof.txt
+
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from path_rules import load_path_rules
+from profiling import add_profiling_arguments, profile_run
+from term_scan import load_scan_terms, scan_directory, SECTIONS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count pattern terms by file, folder and section type (read-only)")
+    parser.add_argument('path', nargs='?', help="Directory to scan (defaults to DIRECTORY_PATH)")
+    parser.add_argument('--patterns', default='patterns', help="Directory containing the pattern CSV files")
+    parser.add_argument('--csv', help="Export the term x folder matrix to this CSV file")
+    parser.add_argument('--depth', type=int, help="Group folders by their first DEPTH levels in the matrix")
+    parser.add_argument('--term', help="List the files that contain this term")
+    parser.add_argument('--top', type=int, default=20, help="Number of files to list with --term (default 20)")
+    add_profiling_arguments(parser, slow_log=False)
+    args = parser.parse_args()
+
+    load_dotenv()
+    debug_mode = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    path = args.path or os.getenv('DIRECTORY_PATH')
+    if not path:
+        print("Error: no directory given and DIRECTORY_PATH not found in .env file")
+        return
+    if not os.path.exists(path):
+        print(f"Error: Path does not exist: {path}")
+        return
+    print(f"Scanning directory: {path}")
+
+    start = time.perf_counter()
+    with profile_run(args):
+        terms = load_scan_terms(args.patterns, debug_mode=debug_mode)
+        path_rules = load_path_rules(args.patterns, debug_mode=debug_mode)
+        scan = scan_directory(path, terms, path_rules, debug_mode=debug_mode)
+    elapsed = time.perf_counter() - start
+
+    counts = scan.term_counts()
+    print(f"Scanned {len(scan.files)} files for {len(terms)} terms in {elapsed:.1f}s")
+    print("=" * 60)
+
+    found = counts[counts['total'] > 0]
+    print(f"\n{'term':40} {'total':>7} {'files':>6} " + ' '.join(f"{section:>8}" for section in SECTIONS))
+    print("-" * 60)
+    for term, row in found.iterrows():
+        print(f"{term[:40]:40} {row['total']:7} {row['files']:6} " + ' '.join(f"{row[section]:8}" for section in SECTIONS))
+
+    missing = counts[counts['total'] == 0]
+    if len(missing):
+        print(f"\nNOT FOUND ({len(missing)}) - candidates to prune")
+        print("-" * 60)
+        for term, row in missing.iterrows():
+            print(f"  {term} ({row['pattern_files']})")
+
+    if args.term:
+        if args.term not in terms:
+            print(f"\nWarning: '{args.term}' is not a term in {args.patterns}")
+        file_counts = scan.file_counts(args.term)
+        print(f"\nFILES WITH '{args.term}' ({len(file_counts)})")
+        print("-" * 60)
+        for file_path, count in file_counts.most_common(args.top):
+            print(f"  {count:5}  {file_path}")
+
+    if args.csv:
+        scan.write_folder_matrix(args.csv, args.depth)
+        print(f"\n✓ Wrote the term x folder matrix to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+File listing and size-aware scheduling of per-file work.
+
+Every entry point builds its file list with list_files, which returns the files
+largest first. The parallel runner hands the files out one at a time from that
+list to whichever worker process is free, so the large files start early and the
+small ones fill the gaps at the end instead of one worker finishing a giant file
+while the others sit idle.
+"""
+import multiprocessing
+import os
+import time
+from collections import Counter, namedtuple
+from path_rules import as_path_rules, format_skipped
+from profiling import FileProfile
+
+# files: number of files processed, busy: seconds spent in tasks, utilization: busy / wall time
+WorkerStats = namedtuple('WorkerStats', 'worker files busy utilization')
+
+
+def list_files(path, extensions, skip_folders=(), skip_names=(), show_skipped=True):
+    """List the files to process under a directory, largest first.
+
+    Skipped folders (and, with include globs, folders that can't hold an included
+    file) are pruned from the walk, so they are never entered.
+
+    Args:
+        path: Directory to walk
+        extensions: Tuple of file extensions to include, like ('.md',)
+        skip_folders: A path_rules.PathRules, or folder names and globs to skip
+        skip_names: Files whose name contains one of these strings are left out
+        show_skipped: Whether to print how many folders were skipped, per rule
+
+    Returns:
+        list: File paths sorted by size, largest first (ties in path order)
+    """
+    rules = as_path_rules(skip_folders)
+    skipped = Counter()
+    files = []
+    for root, relative_root, names in rules.walk(path, skipped):
+        for name in names:
+            if (name.endswith(extensions) and not any(skip_name in name for skip_name in skip_names)
+                    and rules.matches_file(relative_root, name)):
+                files.append(os.path.join(root, name))
+    if show_skipped and skipped:
+        print(format_skipped(skipped))
+    return schedule_by_size(files)
+
+
+def schedule_by_size(files):
+    """Sort files largest first, so the biggest pieces of work start first."""
+    def size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+    return sorted(files, key=lambda file_path: (-size(file_path), file_path))
+
+
+def workers_from_env(workers=None):
+    """Return the number of worker processes: the argument, else the WORKERS environment variable, else 1.
+
+    0 means one worker per CPU.
+    """
+    if workers is None:
+        workers = int(os.getenv('WORKERS', '1') or 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+# Set in each worker process by _init_worker
+_worker_engine = None
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _timed_call(function, engine, item, slow_seconds):
+    """Run one task and time it.
+
+    Returns:
+        tuple: (seconds, result, profile) where profile is the profiling.FileProfile of a
+               task that took at least slow_seconds, else None
+    """
+    start = time.perf_counter()
+    if slow_seconds is None:
+        result = function(engine, item)
+        return time.perf_counter() - start, result, None
+    profile = FileProfile()
+    result = function(engine, item, profile)
+    elapsed = time.perf_counter() - start
+    return elapsed, result, profile if elapsed >= slow_seconds else None
+
+
+def _run_task(call):
+    function, item, slow_seconds = call
+    elapsed, result, profile = _timed_call(function, _worker_engine, item, slow_seconds)
+    return os.getpid(), elapsed, item, result, profile
+
+
+def run_tasks(function, items, engine, workers=1, slow_seconds=None):
+    """Run function(engine, item) for every item.
+
+    With more than one worker, the engine is sent to each worker process once, and
+    each worker takes the next item from the list as soon as it is free, so results
+    arrive in completion order. The function must be defined at module level in an
+    importable module so worker processes can load it.
+
+    Args:
+        function: Task function taking (engine, item), and (engine, item, profile) when
+                  slow_seconds is given
+        items: Work items, largest first
+        engine: Compiled RuleEngine, shared by all tasks
+        workers: Number of worker processes (1 runs everything in this process)
+        slow_seconds: Keep the profiling.FileProfile of the tasks that take at least this long
+
+    Returns:
+        TaskRun: Iterate over it for (item, result) tuples. Once the iteration is
+                 finished, its `stats` attribute holds a WorkerStats per worker, and
+                 its `slow` attribute an (item, seconds, FileProfile) tuple per slow task.
+    """
+    return TaskRun(function, items, engine, workers, slow_seconds)
+
+
+class TaskRun:
+    """The results of run_tasks, with per-worker statistics once they are all in."""
+
+    def __init__(self, function, items, engine, workers, slow_seconds=None):
+        self.function = function
+        self.items = list(items)
+        self.engine = engine
+        self.workers = max(1, min(workers, len(self.items))) if self.items else 1
+        self.slow_seconds = slow_seconds
+        self.stats = []
+        self.slow = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        start = time.perf_counter()
+        busy = {}
+        counts = {}
+
+        if self.workers == 1:
+            for item in self.items:
+                elapsed, result, profile = _timed_call(self.function, self.engine, item, self.slow_seconds)
+                busy[0] = busy.get(0, 0.0) + elapsed
+                counts[0] = counts.get(0, 0) + 1
+                if profile is not None:
+                    self.slow.append((item, elapsed, profile))
+                yield item, result
+        else:
+            with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.engine,)) as pool:
+                calls = [(self.function, item, self.slow_seconds) for item in self.items]
+                # chunksize=1: every free worker takes the next largest item from the shared queue
+                for pid, elapsed, item, result, profile in pool.imap_unordered(_run_task, calls, chunksize=1):
+                    busy[pid] = busy.get(pid, 0.0) + elapsed
+                    counts[pid] = counts.get(pid, 0) + 1
+                    if profile is not None:
+                        self.slow.append((item, elapsed, profile))
+                    yield item, result
+
+        wall = max(time.perf_counter() - start, 1e-9)
+        self.stats = [WorkerStats(i + 1, counts[worker], busy[worker], min(busy[worker] / wall, 1.0))
+                      for i, worker in enumerate(sorted(busy, key=lambda worker: -busy[worker]))]
+
+
+def format_worker_stats(stats):
+    """Format per-worker utilization as readable lines."""
+    return '\n'.join(f"  Worker {stat.worker}: {stat.files} files, {stat.busy:.2f}s busy ({stat.utilization:.0%} utilization)"
+                     for stat in stats)
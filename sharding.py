@@ -0,0 +1,76 @@
+"""
+Deterministic sharding of a file list across machines or CI jobs.
+
+Every shard computes the same assignment without any coordination: the shard of
+a file is a stable hash of its path relative to the root, modulo the number of
+shards. It depends on nothing else (not the directory listing order, which
+differs between file systems, and not the file sizes, which differ between
+checkouts with other line endings), so every machine gets the same split, and
+a file can't be skipped or processed by two shards. With many files the hash
+spreads them, and their bytes, evenly over the shards.
+"""
+import hashlib
+import os
+
+
+def parse_shard(spec):
+    """Parse a shard specification like '2/4'.
+
+    Args:
+        spec: 'i/N' with 1 <= i <= N
+
+    Returns:
+        tuple: (index, count) with a 1-based index
+
+    Raises:
+        ValueError: If the specification is not valid
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, for example 1/4 (got '{spec}')")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count} (got '{spec}')")
+    return index, count
+
+
+def stable_hash(relative_path):
+    """Hash a '/' separated relative path the same way on every machine and Python run."""
+    return int.from_bytes(hashlib.blake2b(relative_path.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def relative_path(file_path, root):
+    """Return the path of a file relative to root with '/' separators."""
+    return os.path.relpath(file_path, root).replace(os.sep, '/')
+
+
+def assign_shards(files, root, count):
+    """Assign every file to one of count shards by the hash of its relative path.
+
+    Args:
+        files: List of file paths
+        root: Directory the paths are made relative to before hashing
+        count: Number of shards
+
+    Returns:
+        dict: File path -> 1-based shard index
+    """
+    return {file_path: stable_hash(relative_path(file_path, root)) % count + 1 for file_path in files}
+
+
+def shard_files(files, root, shard):
+    """Keep the files that belong to a shard, in their original order.
+
+    Args:
+        files: List of file paths (the full list, identical on every shard)
+        root: Directory the paths are made relative to before hashing
+        shard: (index, count) tuple from parse_shard, or None for all files
+
+    Returns:
+        list: The files of the shard
+    """
+    if shard is None:
+        return list(files)
+    index, count = shard
+    assignment = assign_shards(files, root, count)
+    return [file_path for file_path in files if assignment[file_path] == index]
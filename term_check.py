@@ -0,0 +1,177 @@
+"""
+Lint-style check for terms that still need to be rebranded.
+
+Instead of rewriting files, the check reports every occurrence that the rebrand
+scripts would change: terms of first_mention.csv and always.csv outside 'formerly'
+contexts, and cleanup.csv terms (such as old bookmarks) on word boundaries, in
+any case and in their article variants, the same way the rule engine matches them.
+Never-replace terms and the places patterns/exceptions.csv covers are skipped,
+using the same logic as the rebrand scripts.
+"""
+import bisect
+import json
+import re
+from collections import namedtuple
+from includes import mentioned_before
+from matcher import TermMatcher
+from rule_analysis import describe
+from term_scan import YAML_EXTENSIONS
+from textio import read_text_lenient
+from utils import find_safe_matches, split_markdown_sections
+
+# line and col are 1-based; replacement is the text the rebrand scripts would write
+Diagnostic = namedtuple('Diagnostic', 'path line col term replacement rule')
+
+# start and end are offsets in the text; term is the text as written there
+Edit = namedtuple('Edit', 'start end term replacement rule')
+
+FORMATS = ('gcc', 'github', 'json')
+
+
+class TermChecker:
+    """Find the occurrences that the rebrand rules would change, without changing them."""
+
+    def __init__(self, engine):
+        """Index the rules of a compiled engine.
+
+        Args:
+            engine: Compiled RuleEngine
+        """
+        self.engine = engine
+        self.never_matcher = TermMatcher(engine.never_terms)
+        # The first rule in the compiled order decides the replacement of a term
+        self.rules = {}
+        for rule in engine.plan:
+            if any(output != rule.term for output in rule.outputs):
+                self.rules.setdefault(rule.term, rule)
+        self.matcher = TermMatcher(term for term, rule in self.rules.items() if rule.phase != 'cleanup')
+
+    def check_text(self, text, path='', file_type='markdown', scope=None):
+        """Report the occurrences in one document that still need to be rebranded.
+
+        Overlapping terms are reported once, for the leftmost and then longest term,
+        so "Azure AI Foundry Agent Service" isn't also reported as "Azure AI Foundry".
+
+        Args:
+            text: The decoded document text
+            path: Path to report in the diagnostics
+            file_type: 'markdown' or 'yaml'
+            scope: First mention scope of the file from includes.IncludeGraph.scope (optional)
+
+        Returns:
+            list: Diagnostic tuples in document order
+        """
+        edits = self.find_edits(text, file_type, scope, file_path=path)
+        line_starts = [0] + [match.end() for match in re.finditer('\n', text)]
+        diagnostics = []
+        for edit in edits:
+            line = bisect.bisect_right(line_starts, edit.start)
+            col = edit.start - line_starts[line - 1] + 1
+            diagnostics.append(Diagnostic(path, line, col, edit.term, edit.replacement, describe(edit.rule)))
+        return diagnostics
+
+    def find_edits(self, text, file_type='markdown', scope=None, file_path=None):
+        """Find the replacements the rules would make in one document, in a single pass.
+
+        Every occurrence is replaced by the rule of its term as the text reads now,
+        so replacements don't feed into later rules. The rule engine uses this as
+        its linear-time path for files that go over their time budget.
+
+        Args:
+            text: The decoded document text
+            file_type: 'markdown' or 'yaml'
+            scope: First mention scope of the file from includes.IncludeGraph.scope (optional)
+            file_path: Path of the file, to skip the places its exceptions cover (optional)
+
+        Returns:
+            list: Edit tuples in document order, not overlapping
+        """
+        occurrences = list(self.matcher.find_all(text))
+        occurrences += [found for found in self.engine.cleanup_matcher.find_all(text)
+                        if found[2] in self.rules and self.rules[found[2]].phase == 'cleanup']
+        occurrences.sort(key=lambda found: (found[0], -found[1]))
+        if not occurrences:
+            return []
+
+        # Never-replace terms and the exceptions of the file merged into disjoint spans
+        never_starts, never_ends = [], []
+        protected = [(start, end) for start, end, _ in self.never_matcher.find_all(text)]
+        protected += self.engine.exception_spans(text, file_path)
+        for start, end in sorted(protected):
+            if never_ends and start < never_ends[-1]:
+                never_ends[-1] = max(never_ends[-1], end)
+            else:
+                never_starts.append(start)
+                never_ends.append(end)
+        safe_starts = {}
+        body_start = 0
+        if file_type != 'yaml':
+            metadata, title_section, _ = split_markdown_sections(text)
+            body_start = len(metadata) + len(title_section)
+        mentioned_offsets = {}
+
+        edits = []
+        mentioned = set()
+        covered_until = 0
+        for start, end, term in occurrences:
+            if start < covered_until:
+                continue
+            rule = self.rules[term]
+            # Inside a never-replace term
+            i = bisect.bisect_right(never_starts, end - 1) - 1
+            if i >= 0 and never_ends[i] > start:
+                continue
+            replacement = rule.outputs[0]
+            if rule.phase == 'cleanup':
+                match = self.engine._cleanup_patterns[term].match(text, start)
+                if not match or self.engine._cleanup_output(rule, match) == match.group(0):
+                    continue
+                # Report the text as written, which may differ from the term in case or article form
+                end = match.end()
+                replacement = self.engine._cleanup_output(rule, match)
+                term = match.group(0)
+            else:
+                if term not in safe_starts:
+                    safe_starts[term] = {match_start for match_start, _ in find_safe_matches(text, term, self.engine.formerly_keywords)[0]}
+                if start not in safe_starts[term]:
+                    continue
+
+            if rule.phase == 'first_mention' and file_type != 'yaml' and start >= body_start:
+                # Only the first mention in the body keeps the first replacement
+                if term not in mentioned_offsets:
+                    mentioned_offsets[term] = mentioned_before(text, term, scope) if scope else None
+                if term in mentioned or (mentioned_offsets[term] is not None and start >= mentioned_offsets[term]):
+                    replacement = rule.outputs[1]
+                mentioned.add(term)
+
+            edits.append(Edit(start, end, term, replacement, rule))
+            covered_until = end
+        return edits
+
+    def check_file(self, file_path, scope=None):
+        """Check one .md, .yml or .yaml file, with the first mention scope of a markdown file (optional)."""
+        text = read_text_lenient(file_path)
+        return self.check_text(text, file_path, 'yaml' if file_path.endswith(YAML_EXTENSIONS) else 'markdown', scope)
+
+
+def format_diagnostics(diagnostics, output_format='gcc'):
+    """Format diagnostics for a linter output format.
+
+    Args:
+        diagnostics: List of Diagnostic tuples
+        output_format: 'gcc' (path:line:col: warning: ...), 'github' (workflow annotations) or 'json'
+
+    Returns:
+        str: The formatted diagnostics
+    """
+    if output_format == 'json':
+        return json.dumps([diagnostic._asdict() for diagnostic in diagnostics], indent=2)
+
+    lines = []
+    for diagnostic in diagnostics:
+        message = f"'{diagnostic.term}' should be '{diagnostic.replacement}' ({diagnostic.rule})"
+        if output_format == 'github':
+            lines.append(f"::warning file={diagnostic.path},line={diagnostic.line},col={diagnostic.col},title=rebrand::{message}")
+        else:
+            lines.append(f"{diagnostic.path}:{diagnostic.line}:{diagnostic.col}: warning: {message}")
+    return '\n'.join(lines)
@@ -0,0 +1,211 @@
+"""
+Read-only term frequency scan of a docs tree.
+
+Every search term of the pattern files is found in one pass per file with the
+multi-pattern matcher, and each occurrence is counted by file, folder and section
+type (metadata, title or body of a markdown file, or a YAML file). The counts show
+which rules matter before a rebrand wave and which ones never match.
+"""
+import os
+from collections import Counter
+from matcher import TermMatcher
+from scheduler import list_files
+from textio import read_text_lenient
+from utils import (
+    load_csv_replacements,
+    load_first_mention_csv,
+    load_never_terms,
+    split_markdown_sections
+)
+
+SECTIONS = ('metadata', 'title', 'body', 'yaml')
+MARKDOWN_EXTENSIONS = ('.md',)
+YAML_EXTENSIONS = ('.yml', '.yaml')
+
+
+def load_scan_terms(patterns_dir='patterns', debug_mode=False):
+    """Load the search terms of all four pattern files.
+
+    Args:
+        patterns_dir: Directory containing the pattern CSV files
+        debug_mode: Whether to print debug information
+
+    Returns:
+        dict: Term -> list of the pattern files it appears in, in pattern file order
+    """
+    def pattern_file(name):
+        return os.path.join(patterns_dir, name)
+
+    sources = {
+        'first_mention.csv': [term for term, _, _ in load_first_mention_csv(pattern_file('first_mention.csv'), debug_mode=debug_mode)],
+        'always.csv': list(load_csv_replacements(pattern_file('always.csv'), 'compound replacements', debug_mode=debug_mode)),
+        'cleanup.csv': list(load_csv_replacements(pattern_file('cleanup.csv'), 'cleanup replacements', debug_mode=debug_mode)),
+        'never.csv': load_never_terms(pattern_file('never.csv'), debug_mode=debug_mode),
+    }
+    terms = {}
+    for source, source_terms in sources.items():
+        for term in source_terms:
+            if isinstance(term, str) and term:
+                terms.setdefault(term, [])
+                if source not in terms[term]:
+                    terms[term].append(source)
+    return terms
+
+
+def scan_text(text, matcher, file_type='markdown'):
+    """Count the term occurrences in one document by section type.
+
+    Nested terms are counted separately, so "Azure AI Foundry Agent Service" also
+    counts as an occurrence of "Azure AI Foundry".
+
+    Args:
+        text: The decoded document text
+        matcher: TermMatcher over the terms to count
+        file_type: 'markdown' or 'yaml'
+
+    Returns:
+        Counter: (term, section) -> number of occurrences
+    """
+    counts = Counter()
+    if file_type == 'yaml':
+        for _, _, term in matcher.find_all(text):
+            counts[(term, 'yaml')] += 1
+        return counts
+
+    metadata, title_section, _ = split_markdown_sections(text)
+    title_start = len(metadata)
+    body_start = title_start + len(title_section)
+    for start, _, term in matcher.find_all(text):
+        if start < title_start:
+            section = 'metadata'
+        elif start < body_start:
+            section = 'title'
+        else:
+            section = 'body'
+        counts[(term, section)] += 1
+    return counts
+
+
+def find_scan_files(path, skip_folders=(), debug_mode=False):
+    """List the markdown and YAML files under a directory.
+
+    Args:
+        path: Directory to scan
+        skip_folders: path_rules.PathRules, or folder names to skip during directory traversal
+        debug_mode: Whether to print debug information
+
+    Returns:
+        list: File paths, largest first
+    """
+    return list_files(path, MARKDOWN_EXTENSIONS + YAML_EXTENSIONS, skip_folders, show_skipped=debug_mode)
+
+
+def folder_of(file_path, root, depth=None):
+    """Return the folder of a file relative to the scan root, using '/' separators.
+
+    Args:
+        file_path: Path of the file
+        root: The scan root
+        depth: Keep only the first depth folder levels (None for the full folder)
+
+    Returns:
+        str: The relative folder, or '.' for files directly in the root
+    """
+    folder = os.path.relpath(os.path.dirname(file_path), root).replace(os.sep, '/')
+    if depth is not None and folder != '.':
+        folder = '/'.join(folder.split('/')[:depth])
+    return folder
+
+
+class TermScan:
+    """Term occurrence counts of a scanned tree, by file and section type."""
+
+    def __init__(self, terms, root):
+        """Create an empty scan.
+
+        Args:
+            terms: Dictionary of term -> list of pattern files (from load_scan_terms)
+            root: The scanned directory, used for folder names
+        """
+        self.terms = terms
+        self.root = root
+        self.matcher = TermMatcher(terms)
+        self.files = {}
+
+    def add_file(self, file_path, text):
+        """Count the terms of one file (markdown unless it has a YAML extension)."""
+        file_type = 'yaml' if file_path.endswith(YAML_EXTENSIONS) else 'markdown'
+        self.files[file_path] = scan_text(text, self.matcher, file_type)
+
+    def term_counts(self):
+        """Return one row per term with its pattern files, total, file count and section counts.
+
+        Returns:
+            DataFrame: Sorted by total, most frequent first; terms that never match have a total of 0
+        """
+        import pandas as pd
+        rows = {term: dict.fromkeys(('total', 'files') + SECTIONS, 0) for term in self.terms}
+        for counts in self.files.values():
+            for term in {term for term, _ in counts}:
+                rows[term]['files'] += 1
+            for (term, section), count in counts.items():
+                rows[term][section] += count
+                rows[term]['total'] += count
+        df = pd.DataFrame.from_dict(rows, orient='index', columns=('total', 'files') + SECTIONS)
+        df.insert(0, 'pattern_files', [';'.join(self.terms[term]) for term in df.index])
+        df.index.name = 'term'
+        return df.sort_values('total', ascending=False, kind='stable')
+
+    def file_counts(self, term=None):
+        """Return the total number of occurrences per file, for one term or for all terms.
+
+        Returns:
+            Counter: File path -> number of occurrences (files without any are left out)
+        """
+        totals = Counter()
+        for file_path, counts in self.files.items():
+            total = sum(count for (found, _), count in counts.items() if term is None or found == term)
+            if total:
+                totals[file_path] = total
+        return totals
+
+    def folder_matrix(self, depth=None):
+        """Return the term x folder matrix of occurrence counts.
+
+        Args:
+            depth: Group folders by their first depth levels (None for the full folder)
+
+        Returns:
+            DataFrame: One row per term (in pattern file order), one column per folder
+        """
+        import pandas as pd
+        matrix = {}
+        for file_path, counts in self.files.items():
+            column = matrix.setdefault(folder_of(file_path, self.root, depth), Counter())
+            for (term, _), count in counts.items():
+                column[term] += count
+        df = pd.DataFrame({folder: [matrix[folder][term] for term in self.terms] for folder in sorted(matrix)},
+                          index=pd.Index(list(self.terms), name='term'))
+        return df
+
+    def write_folder_matrix(self, csv_file, depth=None):
+        """Export the term x folder matrix to a CSV file."""
+        self.folder_matrix(depth).to_csv(csv_file)
+
+
+def scan_directory(path, terms, skip_folders=(), debug_mode=False):
+    """Scan the markdown and YAML files under a directory without changing them.
+
+    Args:
+        path: Directory to scan
+        terms: Dictionary of term -> list of pattern files (from load_scan_terms)
+        skip_folders: path_rules.PathRules, or folder names to skip during directory traversal
+        debug_mode: Whether to print debug information
+
+    Returns:
+        TermScan: The counts for every scanned file
+    """
+    scan = TermScan(terms, path)
+    for file_path in find_scan_files(path, skip_folders, debug_mode):
+        scan.add_file(file_path, read_text_lenient(file_path))
+    return scan
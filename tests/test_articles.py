@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Tests for the article fixes in front of rewritten terms"""
+
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from articles import fix_articles, indefinite_article
+from engine import RuleEngine
+from utils import safe_replace
+
+FIRST_MENTION = [("Azure AI Speech", "Azure Speech in Foundry Tools", "Speech")]
+ALWAYS = {"Azure AI Services": "Foundry Tools", "Azure OpenAI": "Azure OpenAI"}
+
+
+def test_indefinite_article():
+    assert [indefinite_article(phrase) for phrase in
+            ("Foundry", "Azure", "AI Foundry", "GPU", "SDK", "unified API", "hour", "8-core VM", "[x")] == \
+        ["a", "an", "an", "a", "an", "a", "an", "an", None]
+
+
+def test_fix_articles_only_at_spans():
+    spans = []
+    text = safe_replace("An Azure AI Services key, an [Azure AI Services](x.md) key and an Azure AI Services key.",
+                        "Azure AI Services", "Foundry Tools", spans=spans)
+    # The last replacement isn't passed on, so its article stays as it is
+    assert fix_articles(text, spans[:2]) == \
+        "A Foundry Tools key, a [Foundry Tools](x.md) key and an Foundry Tools key."
+    assert fix_articles("AN FOUNDRY and banFoundry", [(3, 10), (16, 23)]) == "A FOUNDRY and banFoundry"
+
+
+def test_engine_fixes_articles_of_rewritten_terms():
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, {})
+    text = ("# Create an Azure AI Speech resource\n\n"
+            "Create an Azure AI Speech resource with an [Azure AI Speech](s.md) key, an Azure OpenAI model "
+            "and an Azure AI Services resource.\n")
+    assert engine.rebrand_markdown(text) == (
+        "# Create an Azure Speech in Foundry Tools resource\n\n"
+        "Create an Azure Speech in Foundry Tools resource with a [Speech](s.md) key, an Azure OpenAI model "
+        "and a Foundry Tools resource.\n")
+    assert engine.rebrand_yaml("name: An Azure AI Speech resource\n") == "name: An Azure Speech in Foundry Tools resource\n"
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Tests for the binary change log and reverting recorded changes by rule or path"""
+
+import sys
+import os
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from changelog import (Change, change_log_from_env, ChangeLog, decode_records, drop_changes, encode_record, MAGIC,
+                       read_change_log, Replacements, revert_changes, select_changes)
+from engine import RuleEngine
+from handlers import get_handler
+
+
+def load_module(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+rebrand_md = load_module('rebrand_md', 'rebrand-md.py')
+
+FIRST_MENTION = [("Azure AI Speech", "Azure Speech in Foundry Tools", "Speech")]
+ALWAYS = {"Azure AI Services": "Foundry Tools", "Azure AI Foundry portal": "Foundry portal"}
+
+PAGE = """---
+title: Azure AI Services overview
+---
+# Use Azure AI Services
+
+Create an Azure AI Speech resource in the Azure AI Foundry portal, then call an Azure AI Speech API.
+"""
+
+
+def test_replacements_and_binary_round_trip():
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, {})
+    replacements = Replacements()
+    new_text = engine.rebrand_markdown(PAGE, replacements=replacements)
+    changes = replacements.changes(new_text)
+    assert [(change.line, change.old, change.new, change.rules) for change in changes] == [
+        (2, "Azure AI Services", "Foundry Tools", ("Azure AI Services",)),
+        (4, "Azure AI Services", "Foundry Tools", ("Azure AI Services",)),
+        (6, "Azure AI Speech", "Azure Speech in Foundry Tools", ("Azure AI Speech",)),
+        (6, "Azure AI Foundry portal", "Foundry portal", ("Azure AI Foundry portal",)),
+        # The article in front of a replacement is fixed by the same rule
+        (6, "an", "a", ("Azure AI Speech",)),
+        (6, "Azure AI Speech", "Speech", ("Azure AI Speech",)),
+    ]
+    line = new_text.split('\n')[5]
+    assert all(line[change.col:change.col + len(change.new)] == change.new for change in changes[2:])
+    assert replacements.counts == {"Azure AI Services": 2, "Azure AI Speech": 2, "Azure AI Foundry portal": 1}
+
+    changes.append(Change(300, 1000, "Café ☕", "", ()))
+    assert decode_records(MAGIC + encode_record('/docs/page.md', changes) * 2) == [('/docs/page.md', changes)] * 2
+
+
+def test_log_is_kept_under_the_processed_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('CHANGE_LOG', raising=False)
+    docs = tmp_path / 'docs'
+    assert change_log_from_env('docs').directory == os.path.join(str(docs), '.rebrand-cache', 'changes')
+    # Not the folder the script runs from
+    monkeypatch.chdir(docs.parent.parent)
+    assert change_log_from_env(str(docs)).directory == os.path.join(str(docs), '.rebrand-cache', 'changes')
+    # CHANGE_LOG picks another folder or turns the log off, and the argument wins over both
+    monkeypatch.setenv('CHANGE_LOG', str(tmp_path / 'log'))
+    assert change_log_from_env(str(docs)).directory == str(tmp_path / 'log')
+    assert change_log_from_env(str(docs), str(tmp_path / 'other')).directory == str(tmp_path / 'other')
+    for value in ('off', ''):
+        monkeypatch.setenv('CHANGE_LOG', value)
+        assert change_log_from_env(str(docs)) is None
+
+
+def test_each_change_has_only_the_rule_that_made_it(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first_mention = [("Azure AI Foundry Agent Service", "Foundry Agent Service", "Agent Service"),
+                     ("Azure AI Foundry", "Microsoft Foundry", "Foundry")]
+    text = "Build with Azure AI Foundry Agent Service today.\nAzure AI Foundry is a platform.\n"
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'page.md').write_text(text, encoding='utf-8')
+    log_dir = str(tmp_path / 'log')
+    engine = RuleEngine(first_mention, {"AI Foundry": "Foundry"}, {}, change_log=ChangeLog(log_dir))
+    assert rebrand_md.rebrand_markdown_files(str(docs), False, engine=engine) == 1
+
+    # The shorter terms inside "Azure AI Foundry Agent Service" didn't make that change
+    records = read_change_log(log_dir)
+    assert [change.rules for change in records[0].changes] == [("Azure AI Foundry Agent Service",),
+                                                               ("Azure AI Foundry",)]
+    reverted, missing = revert_changes(records, select_changes(records, rule="Azure AI Foundry"))
+    assert (len(reverted), missing) == (1, [])
+    assert (docs / 'page.md').read_text(encoding='utf-8') == (
+        "Build with Foundry Agent Service today.\nAzure AI Foundry is a platform.\n")
+
+
+def test_revert_by_rule_and_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    docs = tmp_path / 'docs'
+    for name in ('a/page.md', 'b/page.md', 'b/copy.md'):
+        os.makedirs(docs / os.path.dirname(name), exist_ok=True)
+        (docs / name).write_text(PAGE, encoding='utf-8')
+    log_dir = str(tmp_path / 'log')
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, {}, change_log=ChangeLog(log_dir))
+    assert rebrand_md.rebrand_markdown_files(str(docs), False, engine=engine, workers=2) == 3
+    rebranded = (docs / 'a/page.md').read_text(encoding='utf-8')
+
+    # The duplicate got the result of the first file, and its changes are recorded too
+    records = read_change_log(log_dir)
+    assert sorted(os.path.relpath(record.path, docs) for record in records) == [os.path.join('a', 'page.md'),
+                                                                              os.path.join('b', 'copy.md'),
+                                                                              os.path.join('b', 'page.md')]
+
+    # A hand edit after the run is kept
+    (docs / 'a/page.md').write_text(rebranded.replace("# Use", "# Start using"), encoding='utf-8')
+    selected = select_changes(records, rule="Azure AI Services", path_glob='a/*', root=str(docs))
+    reverted, missing = revert_changes(records, selected)
+    assert (len(reverted), missing) == (2, [])
+    drop_changes(records, reverted)
+    assert (docs / 'a/page.md').read_text(encoding='utf-8') == PAGE.replace("# Use", "# Start using").replace(
+        "an Azure AI Speech resource in the Azure AI Foundry portal, then call an Azure AI Speech",
+        "an Azure Speech in Foundry Tools resource in the Foundry portal, then call a Speech")
+
+    # The reverted changes are gone from the log, so a second revert finds nothing
+    records = read_change_log(log_dir)
+    assert select_changes(records, rule="Azure AI Services", path_glob='a/*', root=str(docs)) == []
+
+    # Revert everything in one file
+    selected = select_changes(records, path_glob=os.path.join(str(docs), 'b', 'copy.md').replace(os.sep, '/'))
+    reverted, missing = revert_changes(records, selected)
+    assert (len(reverted), missing) == (6, [])
+    assert (docs / 'b/copy.md').read_text(encoding='utf-8') == PAGE
+    assert (docs / 'b/page.md').read_text(encoding='utf-8') == rebranded
+
+
+def test_revert_json_and_notebook(tmp_path):
+    toc = '{"items": [{"name": "Azure AI Services caf\\u00e9 \\"x\\" Azure AI Speech", "href": "a.md"}]}\n'
+    notebook = ('{"cells": [{"cell_type": "markdown", "source": ["# Azure AI Speech\\n", "Use Azure AI Services.\\n"]},\n'
+                ' {"cell_type": "code", "source": ["Azure AI Services"]},\n'
+                ' {"cell_type": "markdown", "source": "Then call an Azure AI Speech API."}]}\n')
+    (tmp_path / 'toc.json').write_text(toc, encoding='utf-8')
+    (tmp_path / 'demo.ipynb').write_text(notebook, encoding='utf-8')
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, {}, change_log=ChangeLog(str(tmp_path / 'log')))
+    assert get_handler('json-toc').rebrand_file(str(tmp_path / 'toc.json'), engine).rules == {
+        "Azure AI Services": 1, "Azure AI Speech": 1}
+    assert get_handler('notebook').rebrand_file(str(tmp_path / 'demo.ipynb'), engine).rules == {
+        "Azure AI Services": 1, "Azure AI Speech": 2}
+
+    # The changes are recorded in the JSON text, escapes and all
+    records = read_change_log(str(tmp_path / 'log'))
+    assert records[0].changes[1].new == "Azure Speech in Foundry Tools"
+    reverted, missing = revert_changes(records, select_changes(records))
+    assert (len(reverted), missing) == (5, [])
+    assert (tmp_path / 'toc.json').read_text(encoding='utf-8') == toc
+    assert (tmp_path / 'demo.ipynb').read_text(encoding='utf-8') == notebook
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test script for content-addressed dedup of identical files"""
+
+import sys
+import os
+import shutil
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from dedup import file_digest, group_duplicates
+from engine import load_rule_engine, RuleEngine
+from exceptions import ExceptionEntry, ExceptionIndex
+from reports import RunReport, merge_reports
+
+
+def load_module(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+rebrand_md = load_module('rebrand_md', 'rebrand-md.py')
+rebrand_yml = load_module('rebrand_yml', 'rebrand-yml.py')
+
+
+def test_group_duplicates(tmp_path):
+    for name, content in [('a.md', b'same'), ('b.md', b'same'), ('c.md', b'other'), ('d.md', b''), ('e.md', b'')]:
+        (tmp_path / name).write_bytes(content)
+    files = [str(tmp_path / name) for name in ('a.md', 'b.md', 'c.md', 'd.md', 'e.md')]
+
+    assert file_digest(files[0]) == file_digest(files[1]) != file_digest(files[2])
+    assert [[os.path.basename(f) for f in group] for group in group_duplicates(files)] == [['a.md', 'b.md'], ['c.md'], ['d.md', 'e.md']]
+
+    # Same content with a different key (like a different first mention scope) is not a duplicate
+    keys = {file_path: file_path.endswith('b.md') for file_path in files}
+    assert len(group_duplicates(files, keys)) == 4
+
+
+def test_duplicates_get_the_golden_output(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    shutil.copytree(os.path.join(REPO_DIR, 'tests', 'test-data'), tmp_path / 'docs')
+    copies = ['overview.md', 'test-first-mention.md', 'test-yaml-replacements.yml']
+    os.mkdir(tmp_path / 'docs' / 'copy')
+    for name in copies:
+        shutil.copy(tmp_path / 'docs' / name, tmp_path / 'docs' / 'copy' / name)
+    monkeypatch.chdir(tmp_path)
+
+    engine = load_rule_engine()
+    report = RunReport('docs')
+    rebrand_md.rebrand_markdown_files('docs', False, engine=engine, report=report)
+    rebrand_yml.rebrand_yaml_files('docs', False, engine=engine, report=report)
+
+    assert report.dedup['rebrand-md']['duplicates'] == 2
+    assert report.dedup['rebrand-yml']['duplicates'] == 1
+    assert report.dedup['rebrand-md']['bytes_saved'] == sum(os.path.getsize(os.path.join(REPO_DIR, 'tests', 'test-data', name))
+                                                          for name in copies[:2])
+    # Every file is still in the report, duplicates included
+    assert {f'copy/{name}' for name in copies} <= {entry['path'] for entry in report.files}
+
+    for name in copies:
+        script = 'rebrand-yml' if name.endswith('.yml') else 'rebrand-md'
+        with open(tmp_path / 'docs' / 'copy' / name, 'rb') as f:
+            actual = f.read()
+        with open(os.path.join(REPO_DIR, 'tests', 'expected', script, name), 'rb') as f:
+            assert actual == f.read(), name
+
+    merged = merge_reports([report.to_dict()])
+    assert merged['dedup']['rebrand-md']['duplicates'] == 2
+
+
+def test_files_with_other_exceptions_are_not_duplicates(tmp_path):
+    faq = "- question: What is Azure AI Services?\n- answer: Azure AI Services hosts your models.\n"
+    for folder in ('a', 'b', 'c'):
+        os.makedirs(tmp_path / folder)
+        (tmp_path / folder / 'faq.yml').write_text(faq, encoding='utf-8')
+    exceptions = ExceptionIndex([ExceptionEntry('b/faq.yml', 1, None, None, "keeps the old name")])
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools"}, {}, exceptions=exceptions)
+    report = RunReport(str(tmp_path))
+    assert rebrand_yml.rebrand_yaml_files(str(tmp_path), False, engine=engine, report=report) == 3
+
+    # a and c share a result; b keeps its first line
+    assert report.dedup['rebrand-yml']['duplicates'] == 1
+    assert (tmp_path / 'a' / 'faq.yml').read_text(encoding='utf-8') == (
+        "- question: What is Foundry Tools?\n- answer: Foundry Tools hosts your models.\n")
+    assert (tmp_path / 'c' / 'faq.yml').read_text(encoding='utf-8') == (tmp_path / 'a' / 'faq.yml').read_text(encoding='utf-8')
+    assert (tmp_path / 'b' / 'faq.yml').read_text(encoding='utf-8') == (
+        "- question: What is Azure AI Services?\n- answer: Foundry Tools hosts your models.\n")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Property-based tests: the compiled rule engine matches the reference implementation
+
+The reference runs every rule of the compiled order one after the other with the
+plain utils functions, with no prefilter and no precompiled patterns. Cleanup rules
+run once per spelling (the term, and its "an [X" article variant) in any case, and
+the articles before the replacements of the other rules are fixed after each rule. The
+engine has to give exactly the same text for any document built from the pattern terms.
+"""
+
+import sys
+import os
+import re
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, HealthCheck, strategies as st
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from articles import fix_articles, indefinite_article
+from engine import load_rule_engine
+from matcher import TermMatcher, match_case
+from utils import (
+    protect_never_terms,
+    restore_never_terms,
+    first_mention_replace_in_body,
+    replace_all,
+    safe_replace,
+    word_boundary_pattern
+)
+
+ENGINE = load_rule_engine(os.path.join(REPO_DIR, 'patterns'))
+
+# Documents are built from the pattern terms and replacements plus the text around them
+# that changes how rules apply: word boundaries, formerly contexts, headings, front matter
+TOKENS = sorted({rule.term for rule in ENGINE.rules}
+                | {output for rule in ENGINE.rules for output in rule.outputs}
+                | set(ENGINE.never_terms)
+                | {' ', ' ', '\n', '\n# ', '---\n', '(formerly ', '(previously known as ', ')', 'an ', 'a ',
+                   '#', '-', '[', '](', '.md', 'x', 'Azure ', 'AI ', 'Foundry', 'An ', 'AN ', 'foundry '}
+                | {rule.term.upper() for rule in ENGINE.rules if rule.phase == 'cleanup'}
+                | {rule.term.swapcase() for rule in ENGINE.rules if rule.phase == 'cleanup'})
+documents = st.lists(st.sampled_from(TOKENS), max_size=40).map(''.join)
+
+PROPERTY_SETTINGS = settings(max_examples=200, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+
+
+def reference_cleanup(content, rule, word_boundaries=True):
+    """Apply a cleanup rule to each of its spellings in turn, in any case."""
+    spellings = [(rule.term, rule.outputs[0])]
+    term_article, term_rest = (rule.term.split(' ', 1) + [''])[:2]
+    output_article, output_rest = (rule.outputs[0].split(' ', 1) + [''])[:2]
+    if (term_article.lower() in ('a', 'an') and output_article.lower() in ('a', 'an') and term_rest and output_rest
+            and not term_rest.startswith('[')):
+        spellings.append((f"{term_article} [{term_rest}", f"{output_article} [{output_rest}"))
+    for spelling, output in spellings:
+        pattern = word_boundary_pattern(spelling) if word_boundaries else re.escape(spelling)
+        content = re.sub(pattern, lambda match: match_case(match.group(0), rule.term, output), content, flags=re.IGNORECASE)
+    return content
+
+
+def changes_article(rule):
+    return any(indefinite_article(output) != indefinite_article(rule.term) for output in rule.outputs)
+
+
+def reference_rebrand_markdown(content):
+    content, never_replacements = protect_never_terms(content, ENGINE.never_terms)
+    for rule in ENGINE.plan:
+        spans = []
+        if rule.phase == 'first_mention':
+            content = first_mention_replace_in_body(content, rule.term, *rule.outputs,
+                                                    formerly_keywords=ENGINE.formerly_keywords, spans=spans)
+        elif rule.phase == 'always':
+            content = safe_replace(content, rule.term, rule.outputs[0], formerly_keywords=ENGINE.formerly_keywords,
+                                   spans=spans)
+        else:
+            content = reference_cleanup(content, rule)
+        if changes_article(rule):
+            content = fix_articles(content, spans)
+    return restore_never_terms(content, never_replacements)
+
+
+def reference_rebrand_yaml(content):
+    content, never_replacements = protect_never_terms(content, ENGINE.never_terms)
+    for rule in ENGINE.plan:
+        spans = []
+        if rule.phase == 'first_mention':
+            content = safe_replace(content, rule.term, rule.outputs[0], formerly_keywords=ENGINE.formerly_keywords,
+                                   spans=spans)
+        elif rule.phase == 'always':
+            content = replace_all(content, rule.term, rule.outputs[0], spans)
+        else:
+            content = reference_cleanup(content, rule, not (' ' in rule.term or '[' in rule.term or '#' in rule.term))
+        if changes_article(rule):
+            content = fix_articles(content, spans)
+    return restore_never_terms(content, never_replacements)
+
+
+def reference_cleanup_markdown(content):
+    content, never_replacements = protect_never_terms(content, ENGINE.never_terms)
+    for rule in ENGINE.plan:
+        if rule.phase == 'cleanup':
+            content = reference_cleanup(content, rule)
+    return restore_never_terms(content, never_replacements)
+
+
+@PROPERTY_SETTINGS
+@given(documents)
+def test_markdown_matches_reference(content):
+    assert ENGINE.rebrand_markdown(content) == reference_rebrand_markdown(content)
+
+
+@PROPERTY_SETTINGS
+@given(documents)
+def test_yaml_matches_reference(content):
+    assert ENGINE.rebrand_yaml(content) == reference_rebrand_yaml(content)
+
+
+@PROPERTY_SETTINGS
+@given(documents)
+def test_cleanup_matches_reference(content):
+    assert ENGINE.cleanup_markdown(content) == reference_cleanup_markdown(content)
+
+
+@PROPERTY_SETTINGS
+@given(st.lists(st.text(alphabet='ab c', min_size=1, max_size=4), min_size=1, max_size=6),
+       st.text(alphabet='ab c', max_size=30))
+def test_matcher_finds_every_occurrence(terms, text):
+    matcher = TermMatcher(terms)
+    expected = sorted((start, start + len(term), term)
+                      for term in set(terms)
+                      for start in range(len(text)) if text.startswith(term, start))
+    assert sorted(matcher.find_all(text)) == expected
+    assert matcher.present_terms(text) == {term for _, _, term in expected}
+
+
+@PROPERTY_SETTINGS
+@given(st.lists(st.text(alphabet='aAb c[', min_size=1, max_size=4), min_size=1, max_size=6),
+       st.text(alphabet='aAbB c[', max_size=30))
+def test_folding_matcher_finds_every_variant(terms, text):
+    def variants(term):
+        return [term + '['] if term.startswith('a') else []
+
+    matcher = TermMatcher(terms, ignore_case=True, variants=variants)
+    expected = sorted({(start, start + len(spelling), term)
+                       for term in set(terms) for spelling in [term] + variants(term)
+                       for start in range(len(text)) if text.lower().startswith(spelling.lower(), start)})
+    assert sorted(matcher.find_all(text)) == expected
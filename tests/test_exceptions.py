@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Tests for the per-file and per-line exceptions of patterns/exceptions.csv"""
+
+import sys
+import json
+import os
+import pytest
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import RuleEngine
+from exceptions import ExceptionEntry, ExceptionIndex, load_exceptions
+from handlers import get_handler
+from term_check import TermChecker
+
+FIRST_MENTION = [("Azure AI Speech", "Azure Speech in Foundry Tools", "Speech")]
+ALWAYS = {"Azure AI Foundry portal": "Foundry portal", "Azure AI Services": "Foundry Tools"}
+CLEANUP = {"Azure Portal": "Azure portal"}
+
+FAQ = """# FAQ
+
+Use Azure AI Speech with Azure AI Services.
+Sign in to the Azure AI Foundry portal and the Azure Portal.
+The Azure AI Foundry portal (see the classic Azure AI Services page).
+Azure AI Speech and Azure AI Services again.
+"""
+
+
+def make_engine(entries):
+    return RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP, exceptions=ExceptionIndex(entries))
+
+
+def test_line_anchor_and_term_exceptions():
+    engine = make_engine([
+        ExceptionEntry('articles/faq.md', 4, None, None, "needs portal"),
+        ExceptionEntry('articles/faq.md', None, "classic Azure AI Services page", None, None),
+        ExceptionEntry('articles/faq.md', 6, None, "Azure AI Services", None),
+    ])
+    result = engine.rebrand_markdown(FAQ, file_path=os.path.join('docs', 'articles', 'faq.md'))
+    assert result.splitlines() == [
+        "# FAQ",
+        "",
+        "Use Azure Speech in Foundry Tools with Foundry Tools.",
+        "Sign in to the Azure AI Foundry portal and the Azure Portal.",
+        "The Foundry portal (see the classic Azure AI Services page).",
+        "Speech and Azure AI Services again.",
+    ]
+    # Idempotent: a rerun leaves the excepted places as they are
+    assert engine.rebrand_markdown(result, file_path='docs/articles/faq.md') == result
+    # Other files with the same name aren't covered
+    assert "Azure Portal" not in engine.rebrand_markdown(FAQ, file_path='docs/other/faq.md')
+    assert "Azure Portal" not in engine.rebrand_markdown(FAQ)
+
+    # The one-pass path and the term check skip the same places
+    assert engine.rebrand_in_one_pass(FAQ, file_path='docs/articles/faq.md') == result
+    diagnostics = TermChecker(engine).check_text(FAQ, 'docs/articles/faq.md')
+    assert [(d.line, d.term) for d in diagnostics] == [(3, "Azure AI Speech"), (3, "Azure AI Services"),
+                                                       (5, "Azure AI Foundry portal"), (6, "Azure AI Speech")]
+
+
+TOC = """{
+  "items": [
+    { "name": "Azure AI Speech", "href": "speech.md" },
+    { "name": "Azure AI Services", "href": "services.md" },
+    { "name": "Azure AI Services and Azure AI Speech", "href": "both.md" }
+  ]
+}
+"""
+
+NOTEBOOK = """{
+ "cells": [
+  {"cell_type": "markdown", "source": ["# Overview\\n", "Use Azure AI Speech with Azure AI Services."]},
+  {"cell_type": "markdown", "source": ["Azure AI Speech and Azure AI Services."]},
+  {"cell_type": "markdown", "source": ["Azure AI Services again."]}
+ ]
+}
+"""
+
+
+def test_json_line_exceptions_use_the_lines_of_the_file():
+    engine = make_engine([
+        ExceptionEntry('toc.json', 1, None, None, "the opening brace, which covers no value"),
+        ExceptionEntry('toc.json', 4, None, None, None),
+        ExceptionEntry('toc.json', 5, None, "Azure AI Speech", None),
+        ExceptionEntry('toc.json', None, "Azure AI Services and", None, None),
+    ])
+    result = get_handler('json-toc').rebrand(engine, TOC, 'docs/toc.json')
+    assert [item['name'] for item in json.loads(result)['items']] == [
+        "Azure Speech in Foundry Tools", "Azure AI Services", "Azure AI Services and Azure AI Speech"]
+    # A term the value doesn't contain doesn't cover it
+    engine = make_engine([ExceptionEntry('toc.json', 3, None, "Azure AI Services", None)])
+    result = get_handler('json-toc').rebrand(engine, TOC, 'docs/toc.json')
+    assert json.loads(result)['items'][0]['name'] == "Azure Speech in Foundry Tools"
+
+
+def test_notebook_line_exceptions_use_the_lines_of_the_file():
+    engine = make_engine([ExceptionEntry('intro.ipynb', 3, None, None, None),
+                          ExceptionEntry('intro.ipynb', 5, None, "Azure AI Speech", None)])
+    result = get_handler('notebook').rebrand(engine, NOTEBOOK, 'docs/intro.ipynb')
+    assert [''.join(cell['source']) for cell in json.loads(result)['cells']] == [
+        # The cell on line 3 of the file is left alone (line 3 of the joined page is a separator)
+        "# Overview\nUse Azure AI Speech with Azure AI Services.",
+        # ...and left out of the page, so the first mention is in the next cell
+        "Azure Speech in Foundry Tools and Foundry Tools.",
+        # The cell on line 5 doesn't contain the term of its exception
+        "Foundry Tools again.",
+    ]
+    # Without the exceptions, the first mention is in the first cell
+    result = get_handler('notebook').rebrand(make_engine([]), NOTEBOOK, 'docs/intro.ipynb')
+    assert json.loads(result)['cells'][1]['source'] == ["Speech and Foundry Tools."]
+
+
+def test_load_exceptions(tmp_path):
+    csv_file = tmp_path / 'exceptions.csv'
+    csv_file.write_text("path,line,anchor,term,note\n"
+                        "./articles/faq.yml,39,,,needs portal\n"
+                        "articles\\index.md,,\"Azure AI Services, classic\",Azure AI Services,\n", encoding='utf-8')
+    index = load_exceptions(str(csv_file))
+    assert index.entries == [ExceptionEntry('articles/faq.yml', 39, None, None, 'needs portal'),
+                             ExceptionEntry('articles/index.md', None, 'Azure AI Services, classic', 'Azure AI Services', None)]
+    assert index.for_file('/repo/articles/faq.yml') == index.entries[:1]
+    assert index.for_file('/repo/articles/toc.yml') == []
+    assert len(load_exceptions(str(tmp_path / 'missing.csv'))) == 0
+
+    csv_file.write_text("path,line\narticles/faq.yml,\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_exceptions(str(csv_file))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test script for the shared 'formerly' context index"""
+
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import FormerlyIndex, safe_replace, first_mention_replace
+
+TEXT = """Azure AI Services is a great platform.
+
+But note that (formerly referred to as Azure AI Services resources) are still supported.
+
+Use Azure AI Foundry (previously known as Azure AI Studio) with Azure AI Services.
+
+A group (Azure AI Services, formerly Cognitive Services) has the term before the keyword.
+
+Final Azure AI Services mention (renamed from Azure AI Services)."""
+
+
+def test_index_groups():
+    index = FormerlyIndex(TEXT)
+    # Only parenthetical groups that contain a keyword are indexed
+    assert len(index.starts) == 3
+    preserved = TEXT.index("Azure AI Services resources")
+    assert index.is_preserved("Azure AI Services", preserved)
+    assert not index.is_preserved("Azure AI Services", 0)
+    # The term has to follow the keyword somewhere in the group
+    assert index.has_context("Azure AI Studio")
+    assert not index.is_preserved("Azure AI Services", TEXT.index("Azure AI Services, formerly"))
+
+
+def test_safe_replace_uses_index():
+    result = safe_replace(TEXT, "Azure AI Services", "Foundry Tools")
+    assert "(formerly referred to as Azure AI Services resources)" in result
+    assert result.count("Azure AI Services") == 1
+    assert "(Foundry Tools, formerly Cognitive Services)" in result
+
+
+def test_custom_keywords():
+    result = safe_replace(TEXT, "Azure AI Services", "Foundry Tools", formerly_keywords=["renamed from"])
+    assert "(renamed from Azure AI Services)" in result
+    assert "(formerly referred to as Foundry Tools resources)" in result
+
+    result = first_mention_replace(TEXT, "Azure AI Services", "Foundry Tools", "Tools",
+                                   formerly_keywords=("formerly", "renamed from"))
+    assert result.startswith("Foundry Tools is a great platform.")
+    assert "(renamed from Azure AI Services)" in result
+
+
+if __name__ == "__main__":
+    test_index_groups()
+    test_safe_replace_uses_index()
+    test_custom_keywords()
+    print("🎉 Formerly index tests PASSED!")
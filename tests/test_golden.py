@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Golden-file regression tests for rebrand-md, rebrand-yml, rebrand-json, rebrand-ipynb and fix-bookmarks
+
+Each script runs over a copy of tests/test-data/ (the source tree is never written),
+and every output file is compared byte for byte with tests/expected/<script>/<file>.
+
+After an intended change to the patterns or the scripts, regenerate the expected
+files and review their diff:
+
+    UPDATE_GOLDEN=true python -m pytest tests/test_golden.py
+"""
+
+import sys
+import os
+import shutil
+import importlib.util
+import pytest
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+TEST_DATA_DIR = os.path.join(REPO_DIR, 'tests', 'test-data')
+EXPECTED_DIR = os.path.join(REPO_DIR, 'tests', 'expected')
+UPDATE_GOLDEN = os.getenv('UPDATE_GOLDEN', 'false').lower() in ('true', '1', 'yes')
+
+# Script name -> (script file, entry point, extensions of the files it rewrites)
+SCRIPTS = {
+    'rebrand-md': ('rebrand-md.py', 'rebrand_markdown_files', ('.md',)),
+    'rebrand-yml': ('rebrand-yml.py', 'rebrand_yaml_files', ('.yml', '.yaml')),
+    'fix-bookmarks': ('fix-bookmarks.py', 'fix_bookmarks', ('.md',)),
+    'rebrand-json': ('rebrand-json.py', 'rebrand_json_files', ('toc.json', 'docfx.json')),
+    'rebrand-ipynb': ('rebrand-ipynb.py', 'rebrand_notebook_files', ('.ipynb',)),
+}
+
+
+def load_module(module_name, file_path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def input_files(extensions):
+    """Return the test-data files with the given extensions as sorted '/' relative paths."""
+    found = []
+    for root, dirs, files in os.walk(TEST_DATA_DIR):
+        for file in files:
+            if file.endswith(extensions):
+                found.append(os.path.relpath(os.path.join(root, file), TEST_DATA_DIR).replace(os.sep, '/'))
+    return sorted(found)
+
+
+CASES = [(script, file) for script, (_, _, extensions) in SCRIPTS.items() for file in input_files(extensions)]
+
+
+@pytest.fixture(scope='module')
+def script_outputs(tmp_path_factory):
+    """Run each script once (per test worker) over a copy of test-data and return its output files."""
+    outputs = {}
+
+    def run(script):
+        if script not in outputs:
+            script_file, entry_point, extensions = SCRIPTS[script]
+            work_dir = tmp_path_factory.mktemp(script)
+            shutil.copytree(os.path.join(REPO_DIR, 'patterns'), work_dir / 'patterns')
+            shutil.copytree(TEST_DATA_DIR, work_dir / 'docs')
+            module = load_module(script.replace('-', '_'), os.path.join(REPO_DIR, script_file))
+
+            # The scripts read patterns/ (and write the include cache) relative to the working directory
+            old_cwd = os.getcwd()
+            os.chdir(work_dir)
+            try:
+                getattr(module, entry_point)('docs', debug_mode=False)
+            finally:
+                os.chdir(old_cwd)
+
+            outputs[script] = {}
+            for file in input_files(extensions):
+                with open(work_dir / 'docs' / file, 'rb') as f:
+                    outputs[script][file] = f.read()
+        return outputs[script]
+
+    return run
+
+
+@pytest.mark.parametrize('script,file', CASES, ids=[f"{script}:{file}" for script, file in CASES])
+def test_golden(script, file, script_outputs):
+    actual = script_outputs(script)[file]
+    expected_file = os.path.join(EXPECTED_DIR, script, file)
+
+    if UPDATE_GOLDEN:
+        os.makedirs(os.path.dirname(expected_file), exist_ok=True)
+        with open(expected_file, 'wb') as f:
+            f.write(actual)
+
+    assert os.path.exists(expected_file), f"No expected output for {file}; run with UPDATE_GOLDEN=true to create it"
+    with open(expected_file, 'rb') as f:
+        expected = f.read()
+    assert actual.decode('utf-8') == expected.decode('utf-8')
+
+
+def test_every_expected_file_has_an_input():
+    for script, (_, _, extensions) in SCRIPTS.items():
+        inputs = set(input_files(extensions))
+        script_dir = os.path.join(EXPECTED_DIR, script)
+        for root, dirs, files in os.walk(script_dir):
+            for file in files:
+                relative = os.path.relpath(os.path.join(root, file), script_dir).replace(os.sep, '/')
+                assert relative in inputs, f"tests/expected/{script}/{relative} has no input in tests/test-data"
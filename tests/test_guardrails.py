@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Tests for the super-linear regex check, the linear 'formerly' scan and the per-file time budget"""
+
+import sys
+import os
+import re
+import time
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import load_rule_engine, RuleEngine
+from guardrails import superlinear_reason, time_budget_from_env
+from profiling import FileProfile
+from utils import find_safe_matches, formerly_term_spans, FORMERLY_KEYWORDS
+
+FIRST_MENTION = [("Azure AI Speech", "Azure Speech in Foundry Tools", "Speech")]
+ALWAYS = {"Azure AI Services": "Foundry Tools"}
+CLEANUP = {"Azure Portal": "Azure portal"}
+
+ARTICLE = """---
+title: Azure AI Speech
+---
+# Azure AI Speech
+
+Create an Azure AI Speech resource. Azure AI Speech uses Azure AI Services.
+Sign in to the Azure Portal (formerly Azure AI Services).
+"""
+
+
+def test_superlinear_reason():
+    # The regex that used to find the 'formerly' contexts of terms with ')'
+    assert superlinear_reason(r'\([^)]*(?:formerly|previously)[^)]*Foo \(x\)[^)]*\)', re.IGNORECASE)
+    assert superlinear_reason(r'(\w+)+$') == "nested quantifiers"
+    assert superlinear_reason(r'\([^)]*\)') is None
+    assert superlinear_reason(r'a*b*') is None
+
+    # Every regex compiled from the shipped pattern files passes
+    engine = load_rule_engine(os.path.join(REPO_DIR, 'patterns'))
+    for pattern in list(engine._cleanup_patterns.values()) + list(engine._plain_patterns.values()):
+        assert superlinear_reason(pattern.pattern, pattern.flags) is None
+
+
+def test_formerly_term_spans_match_the_regex():
+    def regex_spans(text, term):
+        pattern = (r'\([^)]*(?:' + '|'.join(re.escape(keyword) for keyword in FORMERLY_KEYWORDS) + r')[^)]*'
+                   + re.escape(term) + r'[^)]*\)')
+        return [match.span() for match in re.finditer(pattern, text, re.IGNORECASE)]
+
+    term = "Azure AI Services (legacy)"
+    texts = ["Use Azure AI Services (legacy) (formerly Azure AI Services (legacy)).",
+             "(Formerly known as azure ai services (LEGACY) in 2023) and (formerly x) Azure AI Services (legacy))",
+             "((formerly (Azure AI Services (legacy)) (previously Azure AI Services (legacy)",
+             "(originally Azure AI Services (legacy) ) (formerly Azure AI Services (legacy)"]
+    for text in texts:
+        assert formerly_term_spans(text, term, FORMERLY_KEYWORDS) == regex_spans(text, term)
+
+
+def test_unbalanced_parentheses_stay_linear():
+    term = "Azure AI Services (legacy)"
+    text = ("(formerly " * 20000) + term + " (formerly"
+    start = time.perf_counter()
+    safe_matches, preserved_count = find_safe_matches(text, term)
+    # The regex backtracks over the whole line for every "(formerly"
+    assert time.perf_counter() - start < 5
+    assert (len(safe_matches), preserved_count) == (1, 0)
+
+
+def test_one_pass_matches_the_rules():
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP)
+    assert engine.rebrand_in_one_pass(ARTICLE) == engine.rebrand_markdown(ARTICLE)
+    yaml = "name: Azure AI Speech\nhref: an Azure AI Speech page\n"
+    assert engine.rebrand_in_one_pass(yaml, 'yaml') == engine.rebrand_yaml(yaml)
+
+
+def test_over_budget_file_falls_back_to_one_pass(capsys):
+    expected = RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP).rebrand_markdown(ARTICLE)
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP, time_budget=1e-9)
+    profile = FileProfile()
+    assert engine.rebrand_markdown(ARTICLE, file_path="slow.md", profile=profile) == expected
+    assert profile.over_budget and 'linear' in profile.phases
+    assert "Warning: slow.md went over the 1e-09s time budget" in capsys.readouterr().out
+
+
+def test_time_budget_from_env(monkeypatch):
+    monkeypatch.delenv('TIME_BUDGET', raising=False)
+    assert time_budget_from_env() == 30
+    monkeypatch.setenv('TIME_BUDGET', '0')
+    assert time_budget_from_env() is None
+    assert time_budget_from_env(2.5) == 2.5
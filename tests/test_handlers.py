@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Test script for the file handler registry and the JSON string lexer"""
+
+import sys
+import json
+import os
+import importlib.util
+import pytest
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import handlers
+from engine import RuleEngine
+from exceptions import ExceptionIndex
+from handlers import FileHandler, get_handler, handler_for, register_handler, registered_handlers
+from json_regions import MalformedJson, string_values, rewrite_strings
+from reports import RunReport
+
+spec = importlib.util.spec_from_file_location('rebrand_json', os.path.join(REPO_DIR, 'rebrand-json.py'))
+rebrand_json = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_json)
+
+
+def test_string_values_paths():
+    text = '{"a": ["x", {"b": "y", "c": [1, "z"]}], "d\\"e": "w", "n": null}'
+    found = [(path, text[start:end]) for path, start, end in string_values(text)]
+    assert found == [(('a', 0), '"x"'), (('a', 1, 'b'), '"y"'), (('a', 1, 'c', 1), '"z"'), (('d"e',), '"w"')]
+
+
+def test_rewrite_keeps_unchanged_literals():
+    text = '{"keep": "caf\\u00e9 Azure", "name": "Azure  \\u00e9", "other": "Azure"}'
+    spans = [(start, end) for path, start, end in string_values(text) if path == ('name',)]
+    result = rewrite_strings(text, spans, lambda value: value.replace('Azure', 'Contoso'))
+    # Only the selected literal changes, and it keeps \\u escapes because the original used them
+    assert result == '{"keep": "caf\\u00e9 Azure", "name": "Contoso  \\u00e9", "other": "Azure"}'
+    assert rewrite_strings(text, spans, lambda value: value) == text
+
+
+@pytest.mark.parametrize('text', ['{"items": [}]}', '{"items": [', ']', '"a", "b"'])
+def test_string_values_rejects_unbalanced_brackets(text):
+    with pytest.raises(MalformedJson):
+        list(string_values(text))
+
+
+def test_malformed_toc_is_quarantined(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    docs = tmp_path / 'docs'
+    for folder, text in [('broken', '{"items": [}]}'), ('fine', '{"items": [{"name": "Azure AI Services"}]}')]:
+        os.makedirs(docs / folder)
+        (docs / folder / 'toc.json').write_text(text, encoding='utf-8')
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools"}, {})
+
+    # The broken file is left as it is, and the run goes on with the other files
+    report = RunReport(str(docs))
+    assert rebrand_json.rebrand_json_files(str(docs), False, engine=engine, report=report) == 2
+    assert (docs / 'broken' / 'toc.json').read_text(encoding='utf-8') == '{"items": [}]}'
+    assert (docs / 'fine' / 'toc.json').read_text(encoding='utf-8') == '{"items": [{"name": "Foundry Tools"}]}'
+    assert "broken" in capsys.readouterr().out and "not valid JSON" in str(report.to_dict())
+
+
+def test_registry(monkeypatch):
+    assert handler_for('docs/articles/overview.md') is get_handler('markdown')
+    assert handler_for('docs/toc.yaml') is get_handler('yaml')
+    assert handler_for('docs/toc.json') is get_handler('json-toc')
+    assert handler_for('docfx.json') is get_handler('docfx')
+    assert handler_for('package.json') is None
+    with pytest.raises(KeyError):
+        get_handler('missing')
+
+    class TextHandler(FileHandler):
+        name = 'test-text'
+        extensions = ('.txt',)
+
+        def rebrand(self, engine, content, file_path, scope=None, profile=None):
+            return content.upper()
+
+    # Register on a copy of the registry so other tests don't see the handler
+    monkeypatch.setattr(handlers, '_handlers', dict(handlers._handlers))
+    handler = register_handler(TextHandler())
+    assert handler_for('notes.txt') is handler
+    assert registered_handlers()[-1] is handler
+    assert handler.rebrand(None, 'azure', 'notes.txt') == 'AZURE'
+
+
+class UpperEngine:
+    """Engine stand-in that upper-cases markdown and splits sentences onto their own lines."""
+    exceptions = ExceptionIndex()
+
+    def region_engine(self):
+        return self
+
+    def rebrand_markdown(self, content, scope=None, file_path=None, profile=None, replacements=None):
+        return content.upper().replace('. ', '.\n')
+
+
+def test_notebook_rewrites_only_markdown_lines():
+    notebook = ('{\n "cells": [\n  {"cell_type": "markdown", "source": ["# title\\n", "same line\\n", "caf\\u00e9"]},\n'
+                '  {"source": ["code"], "cell_type": "code", "outputs": [{"data": {"image/png": "aGVsbG8="}}]},\n'
+                '  {"cell_type": "markdown", "source": "one. two"}\n ]\n}\n')
+    result = get_handler('notebook').rebrand(UpperEngine(), notebook, 'test.ipynb')
+    assert json.loads(result)['cells'][0]['source'] == ["# TITLE\n", "SAME LINE\n", "CAFÉ"]
+    assert '"CAF\\u00c9"' in result
+    assert '{"source": ["code"], "cell_type": "code", "outputs": [{"data": {"image/png": "aGVsbG8="}}]}' in result
+    # A single string source stays a single string, even when the engine adds lines
+    assert json.loads(result)['cells'][2]['source'] == "ONE.\nTWO"
+
+
+def test_notebook_keeps_list_layout_when_lines_change():
+    notebook = '{"cells": [{"cell_type": "markdown", "source": [\n  "one. two\\n",\n  "three"\n]}]}'
+    result = get_handler('notebook').rebrand(UpperEngine(), notebook, 'test.ipynb')
+    assert result == '{"cells": [{"cell_type": "markdown", "source": [\n  "ONE.\\n",\n  "TWO\\n",\n  "THREE"\n]}]}'
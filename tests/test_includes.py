@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test script for first mention scoping across [!INCLUDE] files"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from includes import IncludeGraph, cache_file_for, find_includes, mentioned_before
+from utils import first_mention_replace_in_body
+
+RULES = [
+    ("Azure AI Foundry Agent Service", "Foundry Agent Service", "Agent Service"),
+    ("Azure AI Foundry", "Microsoft Foundry", "Foundry"),
+]
+
+PAGE = """---
+title: Azure AI Foundry overview
+---
+# What is Azure AI Foundry?
+
+[!INCLUDE [intro](includes/intro.md)]
+
+Use Azure AI Foundry to build agents with Azure AI Foundry Agent Service.
+
+[!INCLUDE [next steps](includes/next-steps.md)]
+"""
+
+INTRO = """Azure AI Foundry is a platform for AI apps.
+"""
+
+NEXT_STEPS = """- Deploy a model in Azure AI Foundry.
+"""
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def apply_rules(path, text, graph):
+    scope = graph.scope(path)
+    for term, first_replace, subsequent_replace in RULES:
+        if term in text:
+            text = first_mention_replace_in_body(text, term, first_replace, subsequent_replace,
+                                                 mentioned_before=mentioned_before(text, term, scope))
+    return text
+
+
+def test_find_includes():
+    offsets = find_includes(PAGE)
+    assert [target for _, target in offsets] == ["includes/intro.md", "includes/next-steps.md"]
+    assert find_includes("> [!include[Note](../includes/note.md)]") == [(2, "../includes/note.md")]
+
+
+def test_include_scopes():
+    with tempfile.TemporaryDirectory() as root:
+        page = os.path.join(root, "overview.md")
+        intro = os.path.join(root, "includes", "intro.md")
+        next_steps = os.path.join(root, "includes", "next-steps.md")
+        write(page, PAGE)
+        write(intro, INTRO)
+        write(next_steps, NEXT_STEPS)
+
+        cache_file = os.path.join(root, "cache.json")
+        graph = IncludeGraph([page, intro, next_steps], RULES, cache_file=cache_file)
+
+        # The intro renders first, so it keeps the long form and the page body does not repeat it
+        assert graph.scope(intro) == {}
+        assert graph.scope(page) == {"Azure AI Foundry": "includes/intro.md"}
+        # The next steps include comes after the page already mentioned both terms
+        assert graph.scope(next_steps) == {"Azure AI Foundry": None, "Azure AI Foundry Agent Service": None}
+
+        page_result = apply_rules(page, PAGE, graph)
+        assert "title: Microsoft Foundry overview" in page_result
+        assert "# What is Microsoft Foundry?" in page_result
+        assert "Use Foundry to build agents with Foundry Agent Service." in page_result
+        assert apply_rules(intro, INTRO, graph) == "Microsoft Foundry is a platform for AI apps.\n"
+        assert apply_rules(next_steps, NEXT_STEPS, graph) == "- Deploy a model in Foundry.\n"
+
+        # A second run reuses the cached index instead of reading the files again
+        graph.save()
+        cached = IncludeGraph([page, intro, next_steps], RULES, cache_file=cache_file)
+        assert cached.scope(page) == graph.scope(page)
+
+
+def test_cache_is_per_tree_and_keeps_only_the_indexed_files():
+    with tempfile.TemporaryDirectory() as root:
+        page = os.path.join(root, "overview.md")
+        intro = os.path.join(root, "includes", "intro.md")
+        write(page, PAGE)
+        write(intro, INTRO)
+        cache_file = cache_file_for(root)
+        assert cache_file == os.path.join(os.path.abspath(root), ".rebrand-cache", "include-graph.json")
+
+        IncludeGraph([page, intro], RULES, cache_file=cache_file).save()
+        os.remove(intro)
+        graph = IncludeGraph([page], RULES, cache_file=cache_file)
+        graph.save()
+
+        # The deleted file is dropped, and the cache was replaced without leaving a temporary file
+        with open(cache_file, encoding='utf-8') as f:
+            assert list(json.load(f)['files']) == [os.path.abspath(page)]
+        assert os.listdir(os.path.dirname(cache_file)) == ["include-graph.json"]
+
+
+def test_mentioned_before_without_scope():
+    assert mentioned_before(PAGE, "Azure AI Foundry", {}) is None
+    assert mentioned_before(PAGE, "Azure AI Foundry", {"Azure AI Foundry": None}) == 0
+
+
+if __name__ == "__main__":
+    test_find_includes()
+    test_include_scopes()
+    test_mentioned_before_without_scope()
+    print("🎉 Include scoping tests PASSED!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Tests for the image reference index of media-audit.py"""
+
+import sys
+import os
+import json
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import RuleEngine
+from media_audit import audit_page, changed_pages_from_reports, find_image_references, load_known_images, MediaAudit
+from scheduler import run_tasks
+
+PAGE = """# Hub overview
+
+Create a hub in Azure AI Services.
+
+:::image type="content" source="media/hub/create.png" alt-text="Create a hub." lightbox="media/hub/create.png":::
+
+![Settings](./media/hub/settings.PNG)
+<img src='https://learn.microsoft.com/media/logo.svg?w=40' alt="logo">
+"""
+
+OTHER = """# Other page
+
+Nothing to rebrand here. ![Settings](../media/hub/settings.PNG) [![Copy](../media/copy.png)](../media/copy.png)
+"""
+
+TOC = """- name: Hub
+  href: hub.md
+  image: media/hub/create.png
+"""
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content.encode('utf-8') if isinstance(content, str) else content)
+
+
+def make_tree(root):
+    write(os.path.join(root, 'hub.md'), PAGE)
+    write(os.path.join(root, 'sub', 'other.md'), OTHER)
+    write(os.path.join(root, 'toc.yml'), TOC)
+    write(os.path.join(root, 'media', 'hub', 'create.png'), b'\x89PNG create')
+    write(os.path.join(root, 'media', 'hub', 'settings.PNG'), b'\x89PNG settings')
+    # A byte-identical copy of create.png
+    write(os.path.join(root, 'media', 'copy.png'), b'\x89PNG create')
+
+
+def load_known_images_from(tmp_path, urls):
+    csv_file = tmp_path / 'known.csv'
+    csv_file.write_text('url\n' + '\n'.join(urls) + '\n', encoding='utf-8')
+    return load_known_images(str(csv_file))
+
+
+def test_find_image_references():
+    assert find_image_references(PAGE) == ['media/hub/create.png', 'media/hub/create.png',
+                                           './media/hub/settings.PNG', 'https://learn.microsoft.com/media/logo.svg']
+    assert find_image_references(TOC) == ['media/hub/create.png']
+
+
+def test_images_on_changed_pages_are_prioritized(tmp_path):
+    root = str(tmp_path)
+    make_tree(root)
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools"}, {})
+    files = [os.path.join(root, name) for name in ('hub.md', os.path.join('sub', 'other.md'), 'toc.yml')]
+
+    # Parallel and serial runs index the same images
+    results = [dict(run_tasks(audit_page, files, engine, workers)) for workers in (1, 2)]
+    assert results[0] == results[1]
+    audit = MediaAudit(root)
+    for file_path, media in results[0].items():
+        audit.add_page(file_path, media)
+    assert [file_path for file_path, media in audit.pages.items() if media.changed] == [files[0]]
+
+    known = load_known_images_from(tmp_path, ["https://raw.githubusercontent.com/org/docs/main/articles/media/hub/settings.PNG"])
+    usage = audit.image_usage(known)
+    assert [(entry.image, entry.copies, entry.changed_pages, entry.pages, entry.uses, entry.exists, entry.listed)
+            for entry in usage] == [
+        ('media/copy.png', ['media/hub/create.png'], 1, 3, 5, True, False),
+        ('media/hub/settings.PNG', [], 1, 2, 2, True, True),
+        ('https://learn.microsoft.com/media/logo.svg', [], 1, 1, 1, None, False),
+    ]
+    # Without a changed page, an image is only listed with changed_only=False
+    audit.add_page(files[0], audit.pages[files[0]]._replace(changed=False))
+    assert audit.image_usage() == []
+    assert len(audit.image_usage(changed_only=False)) == 3
+
+
+def test_changed_pages_from_reports(tmp_path):
+    report_file = tmp_path / 'run.json'
+    report_file.write_text(json.dumps({'version': 1, 'root': str(tmp_path), 'files': [
+        {'path': 'hub.md', 'script': 'rebrand-md', 'changed': True, 'size': 1},
+        {'path': 'sub/other.md', 'script': 'rebrand-md', 'changed': False, 'size': 1},
+    ]}), encoding='utf-8')
+    assert changed_pages_from_reports([str(report_file)]) == {os.path.join(str(tmp_path), 'hub.md')}
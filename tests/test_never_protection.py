@@ -72,10 +72,11 @@ Regular mentions of Azure AI Services should still be replaced though.
     print(f"✓ Protected terms preserved: {protected_terms_preserved}")
     print(f"✓ Regular terms replaced: {regular_terms_replaced}")
     
-    if protected_terms_preserved and regular_terms_replaced:
-        print("\n🎉 Never.csv protection test PASSED!")
-    else:
-        print("\n❌ Never.csv protection test FAILED!")
+    assert protected_terms_preserved
+    assert regular_terms_replaced
+    assert final_content.count("Foundry Tools") == 3
+    assert "__NEVER_REPLACE_" not in final_content
+    print("\n🎉 Never.csv protection test PASSED!")
 
 if __name__ == "__main__":
     test_never_protection()
\ No newline at end of file
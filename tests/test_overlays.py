@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for the per-folder .rebrand/ rule overlays"""
+
+import sys
+import os
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import overlays
+from engine import RuleEngine
+from overlays import RuleResolver
+
+
+def load_module(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+rebrand_md = load_module('rebrand_md', 'rebrand-md.py')
+
+PAGE = "# Page\n\nUse Azure AI Services and the Studio UI.\n"
+
+
+def make_tree(tmp_path):
+    overlay_files = {
+        'ml/.rebrand/remove.csv': "term\nStudio UI\n",
+        'ml/deep/.rebrand/always.csv': "search,replace\nAzure AI Services,Foundry Tools (ML)\n",
+        'legacy/.rebrand/disable.csv': "rules\nall\n",
+        'legacy/.rebrand/always.csv': "search,replace\nStudio UI,classic UI\n",
+    }
+    for name, content in overlay_files.items():
+        os.makedirs(tmp_path / os.path.dirname(name), exist_ok=True)
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    pages = ['a.md', 'ml/b.md', 'ml/sub/c.md', 'ml/deep/d.md', 'legacy/e.md']
+    for name in pages:
+        os.makedirs(tmp_path / os.path.dirname(name), exist_ok=True)
+        (tmp_path / name).write_text(PAGE, encoding='utf-8')
+    return [str(tmp_path / name) for name in pages]
+
+
+def test_overlays_add_remove_and_disable(tmp_path):
+    files = make_tree(tmp_path)
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools", "Studio UI": "Foundry portal"}, {})
+    resolver = RuleResolver(engine, str(tmp_path))
+    results = [resolver.engine_for(file_path).rebrand_markdown(PAGE) for file_path in files]
+    assert results == [
+        "# Page\n\nUse Foundry Tools and the Foundry portal.\n",
+        "# Page\n\nUse Foundry Tools and the Studio UI.\n",
+        "# Page\n\nUse Foundry Tools and the Studio UI.\n",
+        "# Page\n\nUse Foundry Tools (ML) and the Studio UI.\n",
+        "# Page\n\nUse Azure AI Services and the classic UI.\n",
+    ]
+
+
+def test_rules_are_resolved_once_per_directory(tmp_path, monkeypatch):
+    files = make_tree(tmp_path)
+    calls = []
+    apply_overlay = overlays.apply_overlay
+    monkeypatch.setattr(overlays, 'apply_overlay', lambda *args: calls.append(args[1]) or apply_overlay(*args))
+
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools"}, {})
+    resolver = RuleResolver(engine, str(tmp_path))
+    for _ in range(3):
+        engines = [resolver.engine_for(file_path) for file_path in files]
+    assert len(calls) == 3
+    # Folders without an overlay share the engine of their parent
+    assert engines[0] is engine
+    assert engines[1] is engines[2] is not engine
+
+
+def test_rebrand_run_uses_the_overlays(tmp_path, monkeypatch):
+    files = make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools", "Studio UI": "Foundry portal"}, {})
+    assert rebrand_md.rebrand_markdown_files(str(tmp_path), False, engine=engine) == len(files)
+
+    # The pages are identical, but only the ones with the same rules share a result
+    contents = [open(file_path, encoding='utf-8').read() for file_path in files]
+    assert contents[0] == "# Page\n\nUse Foundry Tools and the Foundry portal.\n"
+    assert contents[1] == contents[2] == "# Page\n\nUse Foundry Tools and the Studio UI.\n"
+    assert contents[4] == "# Page\n\nUse Azure AI Services and the classic UI.\n"
+
+
+def test_include_scopes_use_the_first_mention_rules_of_the_folder(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'docs' / 'ml' / '.rebrand')
+    os.makedirs(tmp_path / 'docs' / 'ml' / 'includes')
+    (tmp_path / 'docs' / 'ml' / '.rebrand' / 'first_mention.csv').write_text(
+        "term,first_replace,subsequent_replace\nStudio UI,Foundry portal UI,portal UI\n", encoding='utf-8')
+    (tmp_path / 'docs' / 'ml' / 'includes' / 'intro.md').write_text("Sign in to the Studio UI.\n", encoding='utf-8')
+    page = tmp_path / 'docs' / 'ml' / 'page.md'
+    page.write_text("# Page\n\n[!INCLUDE [intro](includes/intro.md)]\n\nOpen the Studio UI.\n", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    # The include introduces the overlay's term, so the page gets the subsequent replacement
+    rebrand_md.rebrand_markdown_files(str(tmp_path / 'docs'), False, engine=RuleEngine([], {}, {}))
+    assert page.read_text(encoding='utf-8').endswith("Open the portal UI.\n")
+    assert (tmp_path / 'docs' / 'ml' / 'includes' / 'intro.md').read_text(encoding='utf-8') == \
+        "Sign in to the Foundry portal UI.\n"
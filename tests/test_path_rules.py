@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for the skip and include path rules applied while the tree is walked"""
+
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import path_rules
+from path_rules import glob_regex, load_path_rules, PathRules
+from scheduler import list_files
+
+TREE = [
+    'index.md',
+    'luis/a.md',
+    'ai-services/luis/b.md',
+    'ai-services/openai/c.md',
+    'ai-services/openai/includes/note.md',
+    'ai-services/openai/old-includes/note.md',
+    'ai-studio/d.md',
+    'ai-studio/toc.yml',
+    'ai-studio-legacy/e.md',
+    'machine-learning/f.md',
+]
+
+
+def make_tree(root):
+    for name in TREE:
+        os.makedirs(os.path.join(root, os.path.dirname(name)), exist_ok=True)
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+            f.write("# Page\n")
+
+
+def relative(files, root):
+    return sorted(os.path.relpath(file_path, root).replace(os.sep, '/') for file_path in files)
+
+
+def test_glob_regex():
+    assert glob_regex('ai-studio/**') == r'ai\-studio/.*(?:/.*)?'
+    rules = PathRules(['luis', '*-legacy', 'ai-services/*/includes/old-*', '**/drafts'])
+    assert [rules.skip_rule(path) for path in ('luis', 'ai-services/luis', 'ai-studio-legacy', 'ai-studio',
+                                               'ai-services/openai/includes/old-notes', 'ai-services/openai/includes',
+                                               'drafts', 'a/b/drafts')] == \
+        ['luis', 'luis', '*-legacy', None, 'ai-services/*/includes/old-*', None, '**/drafts', '**/drafts']
+
+
+def test_skip_and_include_rules_prune_the_walk(tmp_path, monkeypatch, capsys):
+    root = str(tmp_path)
+    make_tree(root)
+
+    files = list_files(root, ('.md',), PathRules(['luis', '*-legacy', 'ai-services/*/old-*']))
+    assert relative(files, root) == ['ai-services/openai/c.md', 'ai-services/openai/includes/note.md',
+                                     'ai-studio/d.md', 'index.md', 'machine-learning/f.md']
+    # One summary line instead of one line per skipped folder
+    assert capsys.readouterr().out == "Skipped 4 folder(s): luis (2), *-legacy (1), ai-services/*/old-* (1)\n"
+
+    # Only the included paths are walked: machine-learning is never entered
+    walked = []
+    walk = os.walk
+    monkeypatch.setattr(path_rules.os, 'walk', lambda path: ((walked.append(folder) or (folder, dirs, names))
+                                                             for folder, dirs, names in walk(path)))
+    rules = PathRules(['luis', 'old-*'], ['ai-studio/**', 'ai-services/openai'])
+    files = list_files(root, ('.md', '.yml'), rules, show_skipped=False)
+    assert relative(files, root) == ['ai-services/openai/c.md', 'ai-services/openai/includes/note.md',
+                                     'ai-studio/d.md', 'ai-studio/toc.yml']
+    assert relative(walked, root) == ['.', 'ai-services', 'ai-services/openai', 'ai-services/openai/includes',
+                                      'ai-studio']
+    assert rules.includes_file('ai-studio/d.md') and not rules.includes_file('ai-services/luis/b.md')
+    assert not rules.includes_file('index.md')
+
+
+def test_load_path_rules(tmp_path):
+    assert not load_path_rules(str(tmp_path))
+    (tmp_path / 'skip_folders.csv').write_text("folder_name\nluis\nai-services/openai/includes/\n", encoding='utf-8')
+    (tmp_path / 'include_paths.csv').write_text("path\n./ai-services\n", encoding='utf-8')
+    rules = load_path_rules(str(tmp_path))
+    assert (rules.skip, rules.include) == (['luis', 'ai-services/openai/includes'], ['ai-services'])
+
+
+def test_rows_starting_with_dot_slash(tmp_path):
+    root = str(tmp_path / 'docs')
+    make_tree(root)
+    rules = PathRules(['./ai-services/luis', '.\\ai-studio-legacy'], ['./ai-services', './ai-studio/'])
+    assert rules.includes_file('ai-services/openai/c.md') and rules.includes_file('ai-studio/d.md')
+    assert rules.skip_rule('ai-services/luis') == 'ai-services/luis'
+    files = list_files(root, ('.md',), rules, show_skipped=False)
+    assert relative(files, root) == ['ai-services/openai/c.md', 'ai-services/openai/includes/note.md',
+                                     'ai-services/openai/old-includes/note.md', 'ai-studio/d.md']
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test script for the profiling flags and the slow-file log"""
+
+import sys
+import os
+import argparse
+import shutil
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import load_rule_engine
+from profiling import SlowLog, add_profiling_arguments, profile_run
+
+spec = importlib.util.spec_from_file_location('rebrand_md', os.path.join(REPO_DIR, 'rebrand-md.py'))
+rebrand_md = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_md)
+
+
+def parse(arguments):
+    parser = argparse.ArgumentParser()
+    add_profiling_arguments(parser)
+    return parser.parse_args(arguments)
+
+
+def test_slow_log_lists_phases_and_rule_hits(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    shutil.copytree(os.path.join(REPO_DIR, 'tests', 'test-data'), tmp_path / 'docs')
+    monkeypatch.chdir(tmp_path)
+
+    # With a threshold of 0 every file is slow
+    slow_log = SlowLog(0)
+    count = rebrand_md.rebrand_markdown_files('docs', False, engine=load_rule_engine(), workers=2, slow_log=slow_log)
+    assert len(slow_log.entries) == count
+
+    entries = {os.path.relpath(file_path, 'docs'): (seconds, profile) for _, file_path, seconds, profile in slow_log.entries}
+    seconds, profile = entries['test-bookmarks.md']
+    assert profile.size == os.path.getsize(os.path.join(REPO_DIR, 'tests', 'test-data', 'test-bookmarks.md'))
+    assert {'read', 'never', 'scan', 'first_mention', 'cleanup', 'write'} <= set(profile.phases)
+    assert sum(profile.phases.values()) <= seconds
+    assert profile.hits['Azure AI Foundry'] == 1
+    assert profile.hits['#azure-ai-foundry-project-roles'] == 1
+
+    text = slow_log.format()
+    assert text.startswith(f"{count} file(s) took longer than 0s")
+    assert f"{os.path.join('docs', 'test-bookmarks.md')} (rebrand-md)" in text
+
+
+def test_profile_run_writes_files(tmp_path):
+    args = parse(['--profile', str(tmp_path / 'run.prof'), '--trace-memory', str(tmp_path / 'memory.txt'),
+                  '--slow-log', str(tmp_path / 'slow.txt'), '--slow-seconds', '5'])
+    with profile_run(args) as slow_log:
+        load_rule_engine(os.path.join(REPO_DIR, 'patterns')).rebrand_markdown("Use Azure AI Foundry.\n")
+
+    assert slow_log.threshold == 5
+    assert (tmp_path / 'run.prof').stat().st_size > 0
+    assert 'load_rule_engine' in (tmp_path / 'run.prof.txt').read_text(encoding='utf-8')
+    assert (tmp_path / 'memory.txt').read_text(encoding='utf-8').startswith("Peak traced memory:")
+    assert (tmp_path / 'slow.txt').read_text(encoding='utf-8') == "0 file(s) took longer than 5s\n"
+
+    # Without the flags nothing is profiled
+    with profile_run(parse([])) as slow_log:
+        assert slow_log is None
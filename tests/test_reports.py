@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for the per-rule and per-folder summary of a run report"""
+
+import sys
+import os
+import csv
+import json
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import RuleEngine
+from reports import format_rule_totals, merge_reports, rule_summary, RunReport, write_summary
+
+spec = importlib.util.spec_from_file_location('rebrand_md', os.path.join(REPO_DIR, 'rebrand-md.py'))
+rebrand_md = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_md)
+
+FIRST_MENTION = [("Azure AI Speech", "Azure Speech in Foundry Tools", "Speech")]
+ALWAYS = {"Azure AI Services": "Foundry Tools"}
+
+PAGES = {
+    'ai-services/speech/overview.md': "# Azure AI Speech\n\nUse Azure AI Speech with Azure AI Services.\n",
+    'ai-services/speech/how-to/copy.md': "# Azure AI Speech\n\nUse Azure AI Speech with Azure AI Services.\n",
+    'ai-services/openai/intro.md': "# Intro\n\nAzure AI Services hosts Azure OpenAI.\n",
+    'index.md': "# Azure AI Services | Docs\n",
+    'unchanged.md': "# Foundry Tools\n",
+}
+
+
+def test_parallel_run_summary(tmp_path, capsys):
+    docs = tmp_path / 'docs'
+    for name, text in PAGES.items():
+        os.makedirs(docs / os.path.dirname(name), exist_ok=True)
+        (docs / name).write_text(text, encoding='utf-8')
+
+    # The rule counts come back from the worker processes with each file's result; the duplicate gets them too
+    report = RunReport(str(docs))
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, {})
+    assert rebrand_md.rebrand_markdown_files(str(docs), False, engine=engine, report=report, workers=2) == 5
+    assert "5/5 files, 4 changed" in capsys.readouterr().err
+
+    summary = rule_summary(merge_reports([report.to_dict()])['files'])
+    assert summary['rules'] == [
+        {'rule': "Azure AI Services", 'files': 4, 'changes': 4},
+        {'rule': "Azure AI Speech", 'files': 2, 'changes': 4},
+    ]
+    assert summary['folders'] == [
+        {'rule': "Azure AI Speech", 'folder': 'ai-services/speech', 'files': 2, 'changes': 4},
+        {'rule': "Azure AI Services", 'folder': 'ai-services/speech', 'files': 2, 'changes': 2},
+        {'rule': "Azure AI Services", 'folder': '.', 'files': 1, 'changes': 1},
+        {'rule': "Azure AI Services", 'folder': 'ai-services/openai', 'files': 1, 'changes': 1},
+    ]
+    assert rule_summary(report.files, depth=1)['folders'][1]['folder'] == 'ai-services'
+    assert format_rule_totals(summary, top=1) == ("  Azure AI Services: 4 change(s) in 4 file(s)\n"
+                                                  "  ... and 1 more rule(s)")
+
+    write_summary(summary, str(tmp_path / 'out' / 'summary.csv'))
+    write_summary(summary, str(tmp_path / 'out' / 'summary.json'))
+    write_summary(summary, str(tmp_path / 'out' / 'summary.md'))
+    with open(tmp_path / 'out' / 'summary.csv', encoding='utf-8', newline='') as f:
+        assert list(csv.DictReader(f))[2] == {'rule': "Azure AI Services", 'folder': '.', 'files': '1', 'changes': '1'}
+    with open(tmp_path / 'out' / 'summary.json', encoding='utf-8') as f:
+        assert json.load(f) == summary
+    markdown = (tmp_path / 'out' / 'summary.md').read_text(encoding='utf-8').split('\n')
+    assert markdown[:4] == ["| Rule | Files | Changes |", "|------|------:|--------:|",
+                            "| Azure AI Services | 4 | 4 |", "| Azure AI Speech | 2 | 4 |"]
+    assert "| Azure AI Speech | ai-services/speech | 2 | 4 |" in markdown
+
+
+def test_summary_counts_only_the_rule_that_made_each_change(tmp_path):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'agents.md').write_text("Build with Azure AI Foundry Agent Service today.\nAzure AI Foundry is a platform.\n",
+                                    encoding='utf-8')
+    report = RunReport(str(docs))
+    engine = RuleEngine([("Azure AI Foundry Agent Service", "Foundry Agent Service", "Agent Service"),
+                         ("Azure AI Foundry", "Microsoft Foundry", "Foundry")], {"AI Foundry": "Foundry"}, {})
+    assert rebrand_md.rebrand_markdown_files(str(docs), False, engine=engine, report=report) == 1
+    assert rule_summary(report.files)['rules'] == [
+        {'rule': "Azure AI Foundry", 'files': 1, 'changes': 1},
+        {'rule': "Azure AI Foundry Agent Service", 'files': 1, 'changes': 1},
+    ]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test script for the rule conflict analyzer and the compiled rule order"""
+
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import RuleEngine
+from matcher import TermMatcher
+from rule_analysis import build_rules, compile_order, analyze_rules
+
+FIRST_MENTION = [
+    ("Azure AI Foundry", "Microsoft Foundry", "Foundry"),
+    ("Azure AI Foundry Agent Service", "Foundry Agent Service", "Agent Service"),
+]
+ALWAYS = {
+    "Azure AI Foundry Models": "Foundry Models",
+    "AI Foundry": "Foundry",
+    "AI Foundry Tools": "Foundry Tools",
+    "Loop A": "Loop B",
+    "Loop B": "Loop A",
+}
+CLEANUP = {
+    "#azure-ai-foundry-tools": "#microsoft-foundry-tools",
+    "#microsoft-foundry-tools": "#foundry-tools",
+    "Azure Portal": "Azure Portal",
+}
+
+
+def kinds(findings, term):
+    return {finding['kind'] for finding in findings if finding['rule'].term == term}
+
+
+def test_matcher_finds_nested_terms():
+    matcher = TermMatcher(["Azure AI Foundry", "Azure AI Foundry Agent Service", "AI Foundry"])
+    found = [(start, term) for start, _, term in matcher.find_all("Try Azure AI Foundry Agent Service.")]
+    assert found == [(4, "Azure AI Foundry"), (4, "Azure AI Foundry Agent Service"), (10, "AI Foundry")]
+
+
+def test_analyzer_findings():
+    rules = build_rules(FIRST_MENTION, ALWAYS, CLEANUP)
+    findings = analyze_rules(rules, never_terms=["Azure Portal"])
+
+    assert 'shadowed' in kinds(findings, "Azure AI Foundry Agent Service")
+    assert 'shadowed' in kinds(findings, "AI Foundry Tools")
+    # Rewritten by the first mention rule before always.csv runs
+    assert 'dead' in kinds(findings, "Azure AI Foundry Models")
+    # Same replacement, and protected by never.csv
+    assert 'dead' in kinds(findings, "Azure Portal")
+    assert 'cyclic' in kinds(findings, "Loop A")
+    assert 'chain' in kinds(findings, "#azure-ai-foundry-tools")
+    assert 'overlapping' in kinds(findings, "Azure AI Foundry Models")
+
+
+def test_compiled_order_is_longest_match_first():
+    rules = build_rules(FIRST_MENTION, ALWAYS, CLEANUP)
+    plan, cycles = compile_order(rules)
+    terms = [rule.term for rule in plan]
+
+    assert terms.index("Azure AI Foundry Agent Service") < terms.index("Azure AI Foundry")
+    assert terms.index("Azure AI Foundry Models") < terms.index("Azure AI Foundry")
+    assert terms.index("AI Foundry Tools") < terms.index("AI Foundry")
+    assert terms.index("#azure-ai-foundry-tools") < terms.index("#microsoft-foundry-tools")
+    assert {(first.term, second.term) for first, second in cycles} <= {("Loop A", "Loop B"), ("Loop B", "Loop A")}
+
+
+def test_engine_uses_compiled_order():
+    engine = RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP)
+    text = ("Azure AI Foundry Agent Service runs in Azure AI Foundry. Deploy Azure AI Foundry Models "
+            "with Azure AI Foundry. See [tools](#azure-ai-foundry-tools).\n")
+    assert engine.rebrand_markdown(text) == (
+        "Foundry Agent Service runs in Microsoft Foundry. Deploy Foundry Models "
+        "with Foundry. See [tools](#foundry-tools).\n")
+    assert engine.rebrand_yaml("name: Azure AI Foundry Agent Service\n") == "name: Foundry Agent Service\n"
+
+
+def test_cleanup_matches_any_case_and_article_variants():
+    engine = RuleEngine([], {"Azure Speech": "Speech"}, {"an Speech": "a Speech", "Azure Portal": "Azure portal"})
+    text = "Create An [Azure Speech](s.md) resource and an Azure Speech key in the AZURE PORTAL or the azure Portal.\n"
+    assert engine.rebrand_markdown(text) == (
+        "Create A [Speech](s.md) resource and a Speech key in the AZURE PORTAL or the azure portal.\n")
+    matcher = TermMatcher(["an X"], ignore_case=True, variants=lambda term: ["an [X"])
+    assert [(start, term) for start, _, term in matcher.find_all("AN X, an [x")] == [(0, "an X"), (6, "an X")]
+
+
+if __name__ == "__main__":
+    test_matcher_finds_nested_terms()
+    test_analyzer_findings()
+    test_compiled_order_is_longest_match_first()
+    test_engine_uses_compiled_order()
+    test_cleanup_matches_any_case_and_article_variants()
+    print("🎉 Rule analysis tests PASSED!")
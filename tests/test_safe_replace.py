@@ -9,12 +9,6 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils import safe_replace
 
-# Test wrapper function
-def test_safe_replace_with_output(text, search_term, replace_term, max_replacements=None):
-    """Wrapper that calls safe_replace and shows debug output."""
-    result = safe_replace(text, search_term, replace_term, max_replacements, debug_mode=True)
-    return result
-
 # Test cases
 test_text = """Azure AI Services is a great platform.
 
@@ -30,12 +24,38 @@ And (originally known as Azure AI Services platform) documentation.
 
 Final Azure AI Services mention."""
 
-print("Original text:")
-print(test_text)
-print("\n" + "="*50 + "\n")
 
-# Test safe_replace
-result = test_safe_replace_with_output(test_text, "Azure AI Services", "Foundry Tools")
+def test_safe_replace_preserves_formerly_contexts():
+    """Regular references are replaced; references in formerly/previously/originally contexts are kept."""
+    result = safe_replace(test_text, "Azure AI Services", "Foundry Tools", debug_mode=True)
+
+    assert result.count("Foundry Tools") == 4
+    assert "(formerly referred to as Azure AI Services resources)" in result
+    assert "(previously called Azure AI Services)" in result
+    assert "(originally known as Azure AI Services platform)" in result
+    assert result.startswith("Foundry Tools is a great platform.")
+    assert result.endswith("Final Foundry Tools mention.")
+
+
+def test_safe_replace_max_replacements():
+    """max_replacements limits how many of the regular references are replaced."""
+    result = safe_replace(test_text, "Azure AI Services", "Foundry Tools", max_replacements=1)
+
+    assert result.count("Foundry Tools") == 1
+    assert result.count("Azure AI Services") == 6
+
+
+if __name__ == "__main__":
+    print("Original text:")
+    print(test_text)
+    print("\n" + "="*50 + "\n")
+
+    # Test safe_replace
+    result = safe_replace(test_text, "Azure AI Services", "Foundry Tools", debug_mode=True)
+
+    print("After safe_replace:")
+    print(result)
 
-print("After safe_replace:")
-print(result)
\ No newline at end of file
+    test_safe_replace_preserves_formerly_contexts()
+    test_safe_replace_max_replacements()
+    print("\n🎉 safe_replace test PASSED!")
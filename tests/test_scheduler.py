@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test script for size-ordered file lists and the parallel task runner"""
+
+import sys
+import os
+import shutil
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import load_rule_engine
+from handlers import get_handler
+from reports import RunReport
+from scheduler import list_files, run_tasks
+
+spec = importlib.util.spec_from_file_location('rebrand_md', os.path.join(REPO_DIR, 'rebrand-md.py'))
+rebrand_md = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_md)
+
+
+def test_list_files_largest_first(tmp_path):
+    for name, size in [('a.md', 10), ('sub/b.md', 300), ('c.md', 50), ('sub/new-name.md', 900),
+                       ('skip/d.md', 1000), ('e.yml', 500)]:
+        file_path = tmp_path / name
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_bytes(b'x' * size)
+
+    files = list_files(str(tmp_path), ('.md',), skip_folders=('skip',), skip_names=('new-name.md',))
+    assert [os.path.relpath(file_path, tmp_path) for file_path in files] == [os.path.join('sub', 'b.md'), 'c.md', 'a.md']
+
+
+def test_parallel_run_matches_golden_files(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    shutil.copytree(os.path.join(REPO_DIR, 'tests', 'test-data'), tmp_path / 'docs')
+    monkeypatch.chdir(tmp_path)
+    engine = load_rule_engine()
+
+    report = RunReport('docs')
+    count = rebrand_md.rebrand_markdown_files('docs', False, engine=engine, report=report, workers=2)
+    assert count == len(report.files)
+
+    # Both workers are accounted for, and every file was processed by one of them
+    stats = report.workers['rebrand-md']
+    assert len(stats) == 2
+    assert sum(stat['files'] for stat in stats) == count
+    assert all(0 <= stat['utilization'] <= 1 for stat in stats)
+
+    for entry in report.files:
+        with open(tmp_path / 'docs' / entry['path'], encoding='utf-8') as f:
+            actual = f.read()
+        with open(os.path.join(REPO_DIR, 'tests', 'expected', 'rebrand-md', entry['path']), encoding='utf-8') as f:
+            assert actual == f.read(), entry['path']
+
+
+def test_sequential_run_collects_stats(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'toc.yml').write_text("- name: Azure AI Speech\n", encoding='utf-8')
+
+    run = run_tasks(get_handler('yaml'), [str(tmp_path / 'toc.yml')], load_rule_engine(), workers=4)
+    results = list(run)
+    assert run.workers == 1
+    assert [(item, result.rules) for item, result in results] == [(str(tmp_path / 'toc.yml'), {'Azure AI Speech': 1})]
+    assert run.stats[0].files == 1
+
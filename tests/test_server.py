@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test script for the local HTTP/JSON rebrand server, run against localhost"""
+
+import sys
+import os
+import json
+import threading
+import http.client
+import importlib.util
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+spec = importlib.util.spec_from_file_location('rebrand_server', os.path.join(REPO_DIR, 'rebrand-server.py'))
+rebrand_server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_server)
+
+ARTICLE = """---
+title: Azure AI Foundry overview
+---
+# What is Azure AI Foundry?
+
+Use Azure AI Foundry to build apps. Azure AI Foundry is a platform.
+"""
+
+
+@pytest.fixture(scope='module')
+def server():
+    service = rebrand_server.RebrandService(os.path.join(REPO_DIR, 'patterns'))
+    server = rebrand_server.make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, endpoint, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_port}{endpoint}", data=data, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_rebrand_batch(server):
+    status, body = post(server, '/rebrand', {'documents': [
+        {'path': 'articles/overview.md', 'content': ARTICLE},
+        {'path': 'toc.yml', 'content': "- name: Azure AI Foundry\n"},
+        {'path': 'unchanged.md', 'content': "Nothing to do.\n"},
+    ]})
+    assert status == 200
+    markdown, yaml, unchanged = body['results']
+    assert markdown['content'] == server.service.engine.rebrand_markdown(ARTICLE)
+    assert "Use Microsoft Foundry to build apps. Foundry is a platform." in markdown['content']
+    assert yaml['content'] == "- name: Microsoft Foundry\n"
+    assert (markdown['changed'], yaml['changed'], unchanged['changed']) == (True, True, False)
+
+
+def test_diff_and_scan(server):
+    status, body = post(server, '/diff', {'documents': [{'path': 'a.md', 'content': ARTICLE}]})
+    assert status == 200
+    diff = body['results'][0]['diff']
+    assert diff.startswith("--- a/a.md\n+++ b/a.md\n")
+    assert "-# What is Azure AI Foundry?\n+# What is Microsoft Foundry?\n" in diff
+
+    status, body = post(server, '/scan', {'documents': [{'path': 'a.md', 'content': ARTICLE}]})
+    assert status == 200
+    assert body['results'][0]['terms']["Azure AI Foundry"] == {'metadata': 1, 'title': 1, 'body': 2}
+
+
+def test_concurrent_requests(server):
+    documents = [{'path': f"doc-{i}.md", 'content': ARTICLE.replace("apps", f"app {i}")} for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda document: post(server, '/rebrand', {'documents': [document]}), documents))
+    for document, (status, body) in zip(documents, responses):
+        assert status == 200
+        assert body['results'][0]['content'] == server.service.engine.rebrand_markdown(document['content'])
+
+
+def test_errors(server):
+    assert post(server, '/rebrand', b'not json')[0] == 400
+    status, body = post(server, '/rebrand', {'documents': [{'path': 'a.md'}]})
+    assert status == 400 and "content" in body['error']
+    for document, error in [(['a.md'], "JSON object"), ({'path': 3, 'content': "x"}, "'path' must be a string"),
+                            ({'path': ['a.md'], 'content': "x"}, "'path' must be a string"),
+                            ({'type': {'yaml': True}, 'content': "x"}, "'type' must be a string")]:
+        status, body = post(server, '/diff', {'documents': [{'content': "ok"}, document]})
+        assert status == 400 and body['error'].startswith("document 1") and error in body['error']
+    status, body = post(server, '/rebrand', {'documents': [{'type': 'yml', 'content': "x"}]})
+    assert status == 400 and "'type' must be one of markdown, yaml" in body['error']
+    assert post(server, '/rebrand', {'documents': [{'type': 'markdown', 'content': "x"}]})[0] == 200
+
+    # A negative or missing Content-Length is answered right away instead of waiting for a body
+    for headers, expected in [({'Content-Length': '-1'}, 400), ({'Content-Length': 'ten'}, 400), ({}, 411)]:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=10)
+        connection.putrequest('POST', '/rebrand')
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == expected and 'error' in json.loads(response.read())
+        connection.close()
+    assert post(server, '/unknown', {'documents': []})[0] == 404
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/health", timeout=10) as response:
+        assert json.loads(response.read()) == {'status': 'ok', 'rules': len(server.service.engine.rules)}
+
+
+def test_engine_errors_get_a_json_500(server, monkeypatch, capsys):
+    def rebrand_markdown(content, *args, **kwargs):
+        if "crash" in content:
+            raise IndexError("pop from empty list")
+        return content
+
+    monkeypatch.setattr(server.service.engine, 'rebrand_markdown', rebrand_markdown)
+    status, body = post(server, '/rebrand', {'documents': [{'path': 'a.md', 'content': "crash"}]})
+    assert status == 500 and body == {'error': "IndexError: pop from empty list"}
+    # The server keeps answering
+    assert post(server, '/rebrand', {'documents': [{'path': 'a.md', 'content': "fine"}]})[0] == 200
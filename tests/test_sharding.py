@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test script for sharded runs and merged shard reports"""
+
+import sys
+import os
+import shutil
+import importlib.util
+import pytest
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import load_rule_engine
+from reports import RunReport, merge_reports
+from sharding import parse_shard, assign_shards, relative_path, shard_files
+
+spec = importlib.util.spec_from_file_location('rebrand_md', os.path.join(REPO_DIR, 'rebrand-md.py'))
+rebrand_md = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_md)
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for spec in ("0/4", "5/4", "1/0", "two/4", "1"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_assignment_depends_only_on_the_relative_path(tmp_path):
+    files = []
+    for i in range(60):
+        file_path = tmp_path / f"dir{i % 3}" / f"file{i}.md"
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_bytes(b'x' * (i * 37 % 500))
+        files.append(str(file_path))
+
+    assignment = assign_shards(files, str(tmp_path), 3)
+    # Independent of the order the files were listed in
+    assert assign_shards(files[::-1], str(tmp_path), 3) == assignment
+
+    shards = [shard_files(files, str(tmp_path), (index, 3)) for index in (1, 2, 3)]
+    assert sorted(sum(shards, [])) == sorted(files)
+    assert all(shards)
+
+    # Other sizes (CRLF line endings, a file touched between jobs) don't move any file
+    for file_path in files[::2]:
+        with open(file_path, 'ab') as f:
+            f.write(b'\r\n' * 100)
+    assert assign_shards(files, str(tmp_path), 3) == assignment
+
+    # A checkout of the same tree in another place (another machine) gets the same split
+    moved = tmp_path / 'elsewhere'
+    for folder in ('dir0', 'dir1', 'dir2'):
+        shutil.copytree(tmp_path / folder, moved / folder)
+    moved_files = [str(moved / relative_path(file_path, str(tmp_path))) for file_path in files]
+    moved_assignment = assign_shards(moved_files, str(moved), 3)
+    assert [moved_assignment[file_path] for file_path in moved_files] == [assignment[file_path] for file_path in files]
+
+
+def test_sharded_run_matches_golden_files(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    monkeypatch.chdir(tmp_path)
+    engine = load_rule_engine()
+
+    # Every shard gets its own checkout, like separate CI jobs
+    reports = []
+    for index in (1, 2, 3):
+        docs = tmp_path / f"checkout{index}"
+        shutil.copytree(os.path.join(REPO_DIR, 'tests', 'test-data'), docs)
+        report = RunReport(str(docs), (index, 3))
+        rebrand_md.rebrand_markdown_files(str(docs), False, engine=engine, shard=(index, 3), report=report)
+        reports.append(report.to_dict())
+
+    merged = merge_reports(reports)
+    assert merged['problems'] == []
+    assert merged['totals']['rebrand-md']['processed'] == len(merged['files'])
+
+    for report, index in zip(reports, (1, 2, 3)):
+        for entry in report['files']:
+            with open(tmp_path / f"checkout{index}" / entry['path'], encoding='utf-8') as f:
+                actual = f.read()
+            with open(os.path.join(REPO_DIR, 'tests', 'expected', 'rebrand-md', entry['path']), encoding='utf-8') as f:
+                assert actual == f.read(), entry['path']
+
+    incomplete = merge_reports(reports[:2] + [reports[1]])
+    assert "shard 2/3 appears in 2 reports" in incomplete['problems']
+    assert "missing shard report(s): 3/3" in incomplete['problems']
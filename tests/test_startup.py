@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests that the scripts start fast: importing one doesn't load pandas or tqdm, and stays within a time budget"""
+
+import sys
+import os
+import glob
+import json
+import subprocess
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Milliseconds to import a script in a fresh interpreter (pandas alone takes longer than this).
+# Set STARTUP_BUDGET_MS on slow machines.
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '150'))
+HEAVY_MODULES = ('pandas', 'numpy', 'tqdm')
+ATTEMPTS = 3
+
+MEASURE = """
+import importlib.util, json, sys, time
+sys.path.insert(0, {repo_dir!r})
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('script', {script!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def measure(script, cwd, modules=HEAVY_MODULES):
+    code = MEASURE.format(repo_dir=REPO_DIR, script=script, heavy=modules)
+    output = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_scripts_import_within_budget(tmp_path):
+    scripts = sorted(glob.glob(os.path.join(REPO_DIR, '*-*.py'))) + [os.path.join(REPO_DIR, 'revert.py')]
+    slow = []
+    for script in scripts:
+        # Time a few fresh imports and keep the fastest, so a busy machine doesn't fail the test
+        timings = []
+        for _ in range(ATTEMPTS):
+            elapsed, heavy = measure(script, str(tmp_path))
+            assert heavy == [], f"importing {os.path.basename(script)} loads {', '.join(heavy)}"
+            timings.append(elapsed)
+            if elapsed <= STARTUP_BUDGET_MS:
+                break
+        if min(timings) > STARTUP_BUDGET_MS:
+            slow.append(f"{os.path.basename(script)}: {min(timings):.0f} ms")
+    assert slow == [], f"over the {STARTUP_BUDGET_MS:.0f} ms startup budget: {'; '.join(slow)}"
+
+
+def test_watch_loads_the_rebrand_scripts_when_it_starts_watching(tmp_path):
+    # Only rebrand-md.py and rebrand-yml.py import dedup and sharding
+    _, loaded = measure(os.path.join(REPO_DIR, 'rebrand-watch.py'), str(tmp_path), HEAVY_MODULES + ('dedup', 'sharding'))
+    assert loaded == []
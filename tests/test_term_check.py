@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Test script for the check mode that reports un-rebranded terms without rewriting"""
+
+import sys
+import os
+import json
+import shutil
+import subprocess
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import RuleEngine, load_rule_engine
+from term_check import TermChecker, format_diagnostics
+
+spec = importlib.util.spec_from_file_location('check_terms', os.path.join(REPO_DIR, 'check-terms.py'))
+check_terms = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(check_terms)
+
+spec = importlib.util.spec_from_file_location('rebrand_md', os.path.join(REPO_DIR, 'rebrand-md.py'))
+rebrand_md = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_md)
+
+FIRST_MENTION = [
+    ("Azure AI Foundry Agent Service", "Foundry Agent Service", "Agent Service"),
+    ("Azure AI Foundry", "Microsoft Foundry", "Foundry"),
+]
+ALWAYS = {"Azure AI Services": "Foundry Tools", "Azure Portal": "Azure Portal"}
+CLEANUP = {"#azure-ai-foundry-project-roles": "#foundry-project-roles"}
+
+ARTICLE = """---
+title: Azure AI Foundry overview
+---
+# What is Azure AI Foundry?
+
+Azure AI Foundry Agent Service runs in Azure AI Foundry. Use Azure AI Foundry.
+Azure AI Services (formerly Azure AI Services) and Azure AI Services (legacy) in the Azure Portal.
+See [roles](#azure-ai-foundry-project-roles) and [other roles](#azure-ai-foundry-project-roles-2).
+"""
+
+
+def test_check_text():
+    checker = TermChecker(RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP, never_terms=["Azure AI Services (legacy)"]))
+    found = [(d.line, d.col, d.term, d.replacement) for d in checker.check_text(ARTICLE, "overview.md")]
+    assert found == [
+        (2, 8, "Azure AI Foundry", "Microsoft Foundry"),
+        (4, 11, "Azure AI Foundry", "Microsoft Foundry"),
+        # Reported once, as the longer term
+        (6, 1, "Azure AI Foundry Agent Service", "Foundry Agent Service"),
+        (6, 40, "Azure AI Foundry", "Microsoft Foundry"),
+        (6, 62, "Azure AI Foundry", "Foundry"),
+        # The formerly context, the never-replace term and the no-op rule are skipped
+        (7, 1, "Azure AI Services", "Foundry Tools"),
+        (8, 13, "#azure-ai-foundry-project-roles", "#foundry-project-roles"),
+        # '-' is a word boundary, so cleanup.csv rewrites the start of this bookmark too
+        (8, 64, "#azure-ai-foundry-project-roles", "#foundry-project-roles"),
+    ]
+
+    yaml = checker.check_text("name: Azure AI Foundry\ntitle: Azure AI Foundry\n", "toc.yml", 'yaml')
+    assert [d.replacement for d in yaml] == ["Microsoft Foundry", "Microsoft Foundry"]
+
+
+def test_formats():
+    checker = TermChecker(RuleEngine(FIRST_MENTION, ALWAYS, CLEANUP))
+    diagnostics = checker.check_text("Try Azure AI Services.\n", "a.md")
+    assert format_diagnostics(diagnostics) == \
+        "a.md:1:5: warning: 'Azure AI Services' should be 'Foundry Tools' (always.csv:2 'Azure AI Services')"
+    assert format_diagnostics(diagnostics, 'github').startswith("::warning file=a.md,line=1,col=5,title=rebrand::")
+    assert json.loads(format_diagnostics(diagnostics, 'json'))[0]['term'] == "Azure AI Services"
+
+
+def test_cleanup_case_and_article_variants():
+    checker = TermChecker(RuleEngine([], {}, {"an Foundry": "a Foundry", "Foundry Portal": "Foundry portal"}))
+    text = "An [Foundry](x.md) resource in the FOUNDRY PORTAL or the foundry Portal, not the Foundry portal.\n"
+    found = [(d.col, d.term, d.replacement) for d in checker.check_text(text, "a.md")]
+    # Text that is already in the case of the replacement isn't reported
+    assert found == [(1, "An [Foundry", "A [Foundry"), (58, "foundry Portal", "foundry portal")]
+
+
+def test_rebranded_test_data_is_clean():
+    """The expected rebrand-md and rebrand-yml outputs have nothing left to report."""
+    checker = TermChecker(load_rule_engine(os.path.join(REPO_DIR, 'patterns')))
+    for script in ('rebrand-md', 'rebrand-yml'):
+        for root, dirs, files in os.walk(os.path.join(REPO_DIR, 'tests', 'expected', script)):
+            for file in files:
+                assert checker.check_file(os.path.join(root, file)) == []
+
+
+def test_single_file_uses_the_overlays_above_it(tmp_path, monkeypatch, capsys):
+    # articles/.rebrand/remove.csv keeps "Azure AI Foundry" (and the "AI Foundry" in it) in every article
+    os.makedirs(tmp_path / 'docs' / 'articles' / '.rebrand')
+    os.makedirs(tmp_path / 'docs' / 'articles' / 'ml')
+    (tmp_path / 'docs' / 'articles' / '.rebrand' / 'remove.csv').write_text("term\nAzure AI Foundry\nAI Foundry\n", encoding='utf-8')
+    page = tmp_path / 'docs' / 'articles' / 'ml' / 'x.md'
+    page.write_text("# Page\n\nUse Azure AI Foundry with Azure AI Services.\n", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    def check(*paths):
+        monkeypatch.setattr(sys, 'argv', ['check-terms.py', '--format', 'json',
+                                          '--patterns', os.path.join(REPO_DIR, 'patterns')] + list(paths))
+        check_terms.main()
+        return sorted(diagnostic['term'] for diagnostic in json.loads(capsys.readouterr().out))
+
+    # The root is DIRECTORY_PATH, or the top level of the git repo without it
+    monkeypatch.setenv('DIRECTORY_PATH', str(tmp_path / 'docs'))
+    assert check(str(page)) == check(str(tmp_path / 'docs' / 'articles')) == ["Azure AI Services"]
+    monkeypatch.delenv('DIRECTORY_PATH')
+    subprocess.run(['git', 'init', '-q', str(tmp_path / 'docs')], check=True)
+    assert check(str(page)) == ["Azure AI Services"]
+
+
+
+def apply_diagnostics(text, diagnostics):
+    """Make the replacements of the diagnostics of one file, last first."""
+    line_starts = [0] + [i + 1 for i, char in enumerate(text) if char == '\n']
+    for diagnostic in sorted(diagnostics, key=lambda d: (d['line'], d['col']), reverse=True):
+        start = line_starts[diagnostic['line'] - 1] + diagnostic['col'] - 1
+        assert text[start:start + len(diagnostic['term'])] == diagnostic['term']
+        text = text[:start] + diagnostic['replacement'] + text[start + len(diagnostic['term']):]
+    return text
+
+
+def test_include_scopes_match_rebrand_md(tmp_path, monkeypatch, capsys):
+    docs = tmp_path / 'docs'
+    shutil.copytree(os.path.join(REPO_DIR, 'tests', 'test-data'), docs)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('DIRECTORY_PATH', str(docs))
+    pages = [docs / 'test-include-page.md', docs / 'includes' / 'agents-intro.md']
+    originals = [page.read_text(encoding='utf-8') for page in pages]
+
+    # Each file checked on its own, so the include and the page that includes it are found in the tree
+    found = []
+    for page in pages:
+        monkeypatch.setattr(sys, 'argv', ['check-terms.py', '--format', 'json',
+                                          '--patterns', os.path.join(REPO_DIR, 'patterns'), str(page)])
+        check_terms.main()
+        found.append(json.loads(capsys.readouterr().out))
+    assert ("Azure AI Foundry Agent Service", "Agent Service") in [(d['term'], d['replacement']) for d in found[0]]
+
+    rebrand_md.rebrand_markdown_files(str(docs), False, engine=load_rule_engine(os.path.join(REPO_DIR, 'patterns')))
+    for page, original, diagnostics in zip(pages, originals, found):
+        assert apply_diagnostics(original, diagnostics) == page.read_text(encoding='utf-8'), page.name
+
+
+if __name__ == "__main__":
+    test_check_text()
+    test_formats()
+    test_rebranded_test_data_is_clean()
+    print("🎉 Check mode tests PASSED!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test script for the read-only term frequency scan"""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from term_scan import scan_directory, folder_of
+
+TERMS = {
+    "Azure AI Foundry": ["first_mention.csv"],
+    "Azure AI Foundry Agent Service": ["first_mention.csv"],
+    "Azure AI Services": ["always.csv"],
+    "Azure AI Studio": ["never.csv"],
+}
+
+ARTICLE = """---
+title: Azure AI Foundry overview
+---
+# What is Azure AI Foundry?
+
+Use Azure AI Foundry Agent Service in Azure AI Foundry.
+"""
+
+TOC = """- name: Azure AI Foundry
+  href: overview.md
+"""
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_scan_counts_by_section_and_folder():
+    with tempfile.TemporaryDirectory() as root:
+        write(os.path.join(root, 'agents', 'how-to', 'overview.md'), ARTICLE)
+        write(os.path.join(root, 'agents', 'toc.yml'), TOC)
+        write(os.path.join(root, 'skipped', 'overview.md'), ARTICLE)
+        write(os.path.join(root, 'agents', 'notes.txt'), ARTICLE)
+
+        scan = scan_directory(root, TERMS, skip_folders=['skipped'])
+        assert len(scan.files) == 2
+
+        counts = scan.term_counts()
+        foundry = counts.loc["Azure AI Foundry"]
+        # The nested occurrence inside "Azure AI Foundry Agent Service" counts too
+        assert (foundry['metadata'], foundry['title'], foundry['body'], foundry['yaml']) == (1, 1, 2, 1)
+        assert foundry['total'] == 5 and foundry['files'] == 2
+        assert counts.loc["Azure AI Studio", 'total'] == 0
+        assert counts.loc["Azure AI Studio", 'pattern_files'] == "never.csv"
+        assert counts.index[0] == "Azure AI Foundry"
+
+        matrix = scan.folder_matrix(depth=1)
+        assert list(matrix.columns) == ['agents']
+        assert matrix.loc["Azure AI Foundry Agent Service", 'agents'] == 1
+
+        csv_file = os.path.join(root, 'matrix.csv')
+        scan.write_folder_matrix(csv_file)
+        with open(csv_file, encoding='utf-8') as f:
+            assert f.readline().strip() == "term,agents,agents/how-to"
+
+
+def test_folder_of():
+    root = os.path.join('docs', 'foundry')
+    file_path = os.path.join(root, 'agents', 'how-to', 'a.md')
+    assert folder_of(file_path, root) == 'agents/how-to'
+    assert folder_of(file_path, root, depth=1) == 'agents'
+    assert folder_of(os.path.join(root, 'a.md'), root, depth=1) == '.'
+
+
+if __name__ == "__main__":
+    test_scan_counts_by_section_and_folder()
+    test_folder_of()
+    print("🎉 Term scan tests PASSED!")
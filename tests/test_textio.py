@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Tests for encoding, BOM and line ending detection and the quarantine of undecodable files"""
+
+import sys
+import os
+import codecs
+import importlib.util
+import shutil
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import load_rule_engine, RuleEngine
+from handlers import rebrand_markdown_file
+from reports import RunReport
+from textio import decode_text, encode_text, Quarantined, UndecodableFile
+
+
+def load_module(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+rebrand_md = load_module('rebrand_md', 'rebrand-md.py')
+
+TEXT = "# Café\r\n\r\nUse Azure AI Services.\r\n"
+
+
+def test_detection_round_trips():
+    cases = [
+        (TEXT.encode('utf-8'), 'utf-8', b'', 'CRLF'),
+        (codecs.BOM_UTF8 + TEXT.encode('utf-8'), 'utf-8', codecs.BOM_UTF8, 'CRLF'),
+        (codecs.BOM_UTF16_LE + TEXT.encode('utf-16-le'), 'utf-16-le', codecs.BOM_UTF16_LE, 'CRLF'),
+        (TEXT.replace('\r\n', '\n').encode('utf-16-be'), 'utf-16-be', b'', 'LF'),
+        (TEXT.encode('cp1252'), 'cp1252', b'', 'CRLF'),
+        ("Azure\rno line feeds\r".encode('latin-1'), 'utf-8', b'', 'CR'),
+    ]
+    for raw, encoding, bom, newline in cases:
+        text_file = decode_text(raw)
+        assert (text_file.encoding, text_file.bom, text_file.newline) == (encoding, bom, newline)
+        assert encode_text(text_file.text, text_file) == raw
+
+    # A file that is UTF-8 for its first few KB only
+    raw = b'Azure ' * 1000 + 'caf\xe9'.encode('latin-1')
+    assert decode_text(raw).text.endswith('café')
+
+    for raw in (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00', bytes(range(256)), codecs.BOM_UTF8 + b'\xff\xfe'):
+        try:
+            decode_text(raw)
+            assert False, raw
+        except UndecodableFile:
+            pass
+
+
+def test_rebrand_keeps_encoding_bom_and_line_endings(tmp_path):
+    engine = RuleEngine([], {"Azure AI Services": "Foundry Tools"}, {})
+    for encoding, bom in (('utf-16-le', codecs.BOM_UTF16_LE), ('cp1252', b''), ('utf-8', codecs.BOM_UTF8)):
+        file_path = tmp_path / f"{encoding}.md"
+        file_path.write_bytes(bom + TEXT.encode(encoding))
+        result = rebrand_markdown_file(str(file_path), engine)
+        assert result and result.rules == {"Azure AI Services": 1}
+        assert file_path.read_bytes() == bom + TEXT.replace("Azure AI Services", "Foundry Tools").encode(encoding)
+
+    # The new text can't be written in the file's encoding: the file is left alone
+    file_path = tmp_path / "latin.md"
+    file_path.write_bytes(TEXT.encode('cp1252'))
+    result = rebrand_markdown_file(str(file_path), RuleEngine([], {"Azure AI Services": "Foundry Tools Ω"}, {}))
+    assert isinstance(result, Quarantined) and not result and "cp1252 can't encode" in result.reason
+    assert file_path.read_bytes() == TEXT.encode('cp1252')
+
+
+def test_undecodable_file_is_quarantined_and_reported(tmp_path, monkeypatch, capsys):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    os.makedirs(tmp_path / 'docs')
+    binary = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x10'
+    for name in ('image.md', 'image-copy.md'):
+        (tmp_path / 'docs' / name).write_bytes(binary)
+    (tmp_path / 'docs' / 'page.md').write_text("# Page\n\nUse Azure AI Services.\n", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    report = RunReport('docs')
+    assert rebrand_md.rebrand_markdown_files('docs', False, engine=load_rule_engine(), report=report) == 3
+
+    # The run went on: the readable file was rebranded, the others are untouched and listed
+    assert "Azure AI Services" not in (tmp_path / 'docs' / 'page.md').read_text(encoding='utf-8')
+    assert (tmp_path / 'docs' / 'image.md').read_bytes() == binary
+    summary = report.to_dict()
+    assert sorted(entry['path'] for entry in summary['quarantined']) == ['image-copy.md', 'image.md']
+    assert summary['totals']['rebrand-md']['quarantined'] == 2
+    assert "Quarantined 2 file(s)" in capsys.readouterr().out
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test script for the watch mode that rebrands files as they change"""
+
+import sys
+import os
+import shutil
+import importlib.util
+
+# Add parent directory to path to import utils
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+spec = importlib.util.spec_from_file_location('rebrand_watch', os.path.join(REPO_DIR, 'rebrand-watch.py'))
+rebrand_watch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rebrand_watch)
+
+ARTICLE = """---
+title: Azure AI Foundry overview
+---
+# What is Azure AI Foundry?
+
+Use Azure AI Foundry to build apps. Azure AI Foundry is a platform for Contoso Widgets.
+"""
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def make_watcher(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'patterns')
+    os.makedirs(tmp_path / 'docs')
+    # The include cache is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return rebrand_watch.RebrandWatcher(str(tmp_path / 'docs'), str(tmp_path / 'patterns'))
+
+
+def test_new_and_modified_files_are_rebranded(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path, monkeypatch)
+    article = str(tmp_path / 'docs' / 'agents' / 'overview.md')
+    toc = str(tmp_path / 'docs' / 'toc.yml')
+    write(article, ARTICLE)
+    write(toc, "- name: Azure AI Foundry\n  href: agents/overview.md\n")
+
+    assert sorted(watcher.process([article, toc, str(tmp_path / 'docs' / 'notes.txt')])) == sorted([article, toc])
+    text = read(article)
+    assert "# What is Microsoft Foundry?" in text
+    assert "Use Microsoft Foundry to build apps. Foundry is a platform" in text
+    assert read(toc) == "- name: Microsoft Foundry\n  href: agents/overview.md\n"
+
+    # The change events of the watcher's own writes are ignored
+    assert watcher.process([article, toc]) == []
+
+
+def test_polling_snapshot_detects_changes(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path, monkeypatch)
+    article = str(tmp_path / 'docs' / 'overview.md')
+    before = watcher.snapshot()
+    write(article, ARTICLE)
+    after = watcher.snapshot()
+    assert [file_path for file_path in after if before.get(file_path) != after[file_path]] == [article]
+
+
+def test_pattern_changes_are_hot_reloaded(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path, monkeypatch)
+    article = str(tmp_path / 'docs' / 'overview.md')
+    always_csv = str(tmp_path / 'patterns' / 'always.csv')
+    with open(always_csv, 'a', encoding='utf-8') as f:
+        f.write("Contoso Widgets,Fabrikam Widgets\n")
+    write(article, ARTICLE)
+
+    watcher.process([always_csv, article])
+    assert "a platform for Fabrikam Widgets." in read(article)
+
+    # A broken pattern file keeps the current rules
+    engine = watcher.engine
+    with open(always_csv, 'w', encoding='utf-8') as f:
+        f.write("not,the,right,columns\n")
+    assert watcher.reload_rules() is False
+    assert watcher.engine is engine
+
+
+def test_rebrand_all_uses_the_watched_patterns(tmp_path, monkeypatch):
+    # The patterns are not in the working directory, so only the watcher's --patterns skips drafts/
+    shutil.copytree(os.path.join(REPO_DIR, 'patterns'), tmp_path / 'rules')
+    write(str(tmp_path / 'rules' / 'skip_folders.csv'), "folder_name\ndrafts\n")
+    os.makedirs(tmp_path / 'work')
+    monkeypatch.chdir(tmp_path / 'work')
+    draft = str(tmp_path / 'docs' / 'drafts' / 'overview.md')
+    article = str(tmp_path / 'docs' / 'overview.md')
+    write(draft, ARTICLE)
+    write(article, ARTICLE)
+    watcher = rebrand_watch.RebrandWatcher(str(tmp_path / 'docs'), str(tmp_path / 'rules'))
+
+    watcher.rebrand_all()
+    assert "# What is Microsoft Foundry?" in read(article)
+    assert read(draft) == ARTICLE
+
+
+def test_page_added_after_the_first_run_sees_the_rebranded_include(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path, monkeypatch)
+    page = "# Overview\n\n[!INCLUDE [intro](includes/intro.md)]\n\nThen use Azure AI Foundry.\n"
+    write(str(tmp_path / 'docs' / 'includes' / 'intro.md'), "Azure AI Foundry is a platform.\n")
+    old = str(tmp_path / 'docs' / 'old.md')
+    write(old, page)
+    watcher.rebrand_all()
+    assert read(str(tmp_path / 'docs' / 'includes' / 'intro.md')) == "Microsoft Foundry is a platform.\n"
+    assert "Then use Foundry." in read(old)
+
+    # The include already has the new name, which still introduces the term
+    new = str(tmp_path / 'docs' / 'new.md')
+    write(new, page)
+    assert watcher.process([new]) == [new]
+    assert read(new) == read(old)
@@ -3,54 +3,47 @@
 
 import sys
 import os
-import shutil
 
 # Add parent directory to path to import utils
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
 
-def test_yaml_replacements():
-    """Test the YAML replacement functionality"""
-    
-    # Create a copy of the test file to work with
-    test_file_original = "tests/test-yaml-replacements.yml" 
-    test_file_copy = "tests/test-yaml-copy.yml"
-    
-    # Read original content
-    with open(test_file_original, 'r') as f:
+from engine import load_rule_engine
+
+TEST_FILE = os.path.join(REPO_DIR, "tests", "test-data", "test-yaml-replacements.yml")
+
+
+def rebrand_test_file():
+    """Rebrand the test YAML file in memory (the file itself is never written)."""
+    with open(TEST_FILE, 'r', encoding='utf-8') as f:
         original_content = f.read()
-    
+    engine = load_rule_engine(os.path.join(REPO_DIR, "patterns"))
+    return original_content, engine.rebrand_yaml(original_content, TEST_FILE)
+
+
+def test_yaml_replacements():
+    """Every 'Azure AI Foundry' gets the first replacement - YAML has no first mention logic"""
+    original_content, modified_content = rebrand_test_file()
+
+    azure_ai_foundry_count = original_content.count("Azure AI Foundry")
+    assert azure_ai_foundry_count > 0
+    assert modified_content.count("Microsoft Foundry") == azure_ai_foundry_count
+    assert "Azure AI Foundry" not in modified_content
+    # The subsequent replacement is only used in markdown bodies
+    assert 'service: "Microsoft Foundry"' in modified_content
+
+
+if __name__ == "__main__":
+    original_content, modified_content = rebrand_test_file()
+
     print("Original YAML content:")
     print("=" * 50)
     print(original_content)
     print("=" * 50)
-    
-    # Create a copy to test on
-    shutil.copy2(test_file_original, test_file_copy)
-    
-    print("\nSimulating YAML replacements...")
-    print("This would replace:")
-    print("- All 'Azure AI Foundry' → 'Microsoft Foundry'")
-    print("- Apply special patterns, compound phrases, and cleanup")
-    print("- No 'formerly' context preservation (unlike markdown)")
-    
-    # Simulate the replacements that would happen
-    modified_content = original_content
-    
-    # Simple replacement simulation (the actual script would use CSV patterns)
-    azure_ai_foundry_count = modified_content.count("Azure AI Foundry")
-    modified_content = modified_content.replace("Azure AI Foundry", "Microsoft Foundry")
-    
-    print(f"\nWould replace {azure_ai_foundry_count} occurrences of 'Azure AI Foundry'")
-    print("\nModified content would be:")
-    print("=" * 50) 
+    print("\nModified content:")
+    print("=" * 50)
     print(modified_content)
     print("=" * 50)
-    
-    # Clean up the copy
-    if os.path.exists(test_file_copy):
-        os.remove(test_file_copy)
-    
-    print(f"\n✓ Test completed! Found {azure_ai_foundry_count} replacements in YAML file")
 
-if __name__ == "__main__":
-    test_yaml_replacements()
\ No newline at end of file
+    test_yaml_replacements()
+    print(f"\n✓ Test completed! Replaced {original_content.count('Azure AI Foundry')} occurrences in YAML file")
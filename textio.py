@@ -0,0 +1,188 @@
+"""
+Reading and writing the text files of a run, in whatever encoding they come in.
+
+The encoding, byte-order mark and line endings of a file are detected from its
+first few KB: a BOM (UTF-8, UTF-16 or UTF-32), else NUL bytes for BOM-less UTF-16,
+else UTF-8, which nearly every file decodes as. Files that turn out not to be UTF-8
+fall back to Windows-1252 and then Latin-1. Text is written back in the encoding,
+BOM and line endings it was read with, so an unchanged region stays byte for byte.
+
+A file that can't be decoded as text, or whose new text can't be written in its
+encoding, is quarantined: it is left as it is, its task returns a Quarantined
+result instead of True/False, and the scripts list it at the end of the run and
+in the report.
+"""
+import codecs
+import re
+from collections import namedtuple
+
+# Bytes read to detect the encoding and the line endings
+SNIFF_BYTES = 4096
+
+# BOMs in the order they are checked (UTF-32-LE starts with the UTF-16-LE BOM)
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Tried in order when a file isn't UTF-8
+FALLBACK_ENCODINGS = ('cp1252', 'latin-1')
+
+# Control characters that don't occur in text files (tab, line feed, form feed and carriage return do)
+_CONTROL_CHARACTERS = re.compile(r'[\x00-\x08\x0b\x0e-\x1f\x7f-\x9f]')
+
+# newline is 'CRLF', 'LF', 'CR' or None for a file without line breaks; bom is b'' if there is none
+TextFile = namedtuple('TextFile', 'text encoding bom newline')
+
+
+class UndecodableFile(ValueError):
+    """Raised for a file that can't be read or written as text."""
+
+
+class Quarantined:
+    """Task result for a file that was left alone because it can't be read or written as text.
+
+    It is false, like the result of a task that didn't change its file.
+    """
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"Quarantined({self.reason!r})"
+
+
+def sniff_encoding(head):
+    """Guess the encoding of a file from its first bytes.
+
+    Args:
+        head: The first SNIFF_BYTES bytes of the file (or all of it)
+
+    Returns:
+        tuple: (encoding, bom); encoding is None if the bytes don't look like UTF-8 or UTF-16
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, bom
+    if b'\x00' in head:
+        # BOM-less UTF-16: ASCII text has a NUL in every other byte
+        even_nuls = head[0::2].count(0)
+        odd_nuls = head[1::2].count(0)
+        if odd_nuls > len(head) // 4 and even_nuls == 0:
+            return 'utf-16-le', b''
+        if even_nuls > len(head) // 4 and odd_nuls == 0:
+            return 'utf-16-be', b''
+        return None, b''
+    try:
+        # The head can end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None, b''
+    return 'utf-8', b''
+
+
+def detect_newline(text):
+    """Return the line ending of a text ('CRLF', 'LF' or 'CR'), from its first line break."""
+    match = re.search(r'\r\n|\n|\r', text[:SNIFF_BYTES])
+    if not match:
+        return None
+    return {'\r\n': 'CRLF', '\n': 'LF', '\r': 'CR'}[match.group()]
+
+
+def decode_text(raw):
+    """Decode the bytes of a file.
+
+    Args:
+        raw: Contents of the file
+
+    Returns:
+        TextFile: The text, without its BOM, and how to write it back
+
+    Raises:
+        UndecodableFile: If the bytes aren't text in any of the supported encodings
+    """
+    encoding, bom = sniff_encoding(raw[:SNIFF_BYTES])
+    body = raw[len(bom):]
+    if encoding is not None:
+        try:
+            text = body.decode(encoding)
+        except UnicodeDecodeError:
+            if bom:
+                raise UndecodableFile(f"not valid {encoding} despite its byte-order mark")
+        else:
+            if encoding == 'utf-8' or _round_trips(text, encoding, body):
+                return TextFile(text, encoding, bom, detect_newline(text))
+            raise UndecodableFile(f"does not round-trip as {encoding}")
+
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            text = body.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        if not _CONTROL_CHARACTERS.search(text) and _round_trips(text, encoding, body):
+            return TextFile(text, encoding, b'', detect_newline(text))
+    raise UndecodableFile("not text in UTF-8, UTF-16, UTF-32, Windows-1252 or Latin-1")
+
+
+def _round_trips(text, encoding, body):
+    try:
+        return text.encode(encoding) == body
+    except UnicodeEncodeError:
+        return False
+
+
+def encode_text(text, text_file):
+    """Encode text the way the file it was read from was encoded.
+
+    Args:
+        text: The new text of the file
+        text_file: TextFile from decode_text
+
+    Returns:
+        bytes: The BOM (if the file had one) and the encoded text
+
+    Raises:
+        UndecodableFile: If the text has characters the file's encoding can't hold
+    """
+    try:
+        return text_file.bom + text.encode(text_file.encoding)
+    except UnicodeEncodeError as error:
+        raise UndecodableFile(f"the new text has {error.object[error.start:error.end]!r}, "
+                              f"which {text_file.encoding} can't encode")
+
+
+def read_text(file_path):
+    """Read and decode a file; raises UndecodableFile like decode_text."""
+    with open(file_path, 'rb') as f:
+        return decode_text(f.read())
+
+
+def read_text_lenient(file_path):
+    """Read a file for a read-only pass: decoded like read_text, or as UTF-8 with replacement characters.
+
+    Returns:
+        str: The text of the file, without a BOM
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        return decode_text(raw).text
+    except UndecodableFile:
+        return raw.decode('utf-8-sig', errors='replace')
+
+
+def format_quarantine(quarantined):
+    """Format the quarantined files of a run as readable lines.
+
+    Args:
+        quarantined: List of (file_path, reason) tuples
+    """
+    lines = [f"Quarantined {len(quarantined)} file(s) that can't be read or written as text (left unchanged):"]
+    lines.extend(f"  {file_path}: {reason}" for file_path, reason in quarantined)
+    return '\n'.join(lines)
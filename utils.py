@@ -2,9 +2,13 @@
 Utility functions for the rebrand script.
 """
 import os
-import pandas as pd
+import bisect
+import functools
 import re
 
+# pandas takes most of the startup time of a script, so the CSV loaders import it
+# when they are first called instead of here
+
 def load_csv_replacements(csv_file, description, required=False, debug_mode=False):
     """Load replacements from a CSV file with search,replace columns.
     
@@ -17,6 +21,7 @@ def load_csv_replacements(csv_file, description, required=False, debug_mode=Fals
     Returns:
         dict: Dictionary of search->replace mappings
     """
+    import pandas as pd
     replacements = {}
     if os.path.exists(csv_file):
         df = pd.read_csv(csv_file)
@@ -32,6 +37,50 @@ def load_csv_replacements(csv_file, description, required=False, debug_mode=Fals
     
     return replacements
 
+def load_never_terms(csv_file, debug_mode=False):
+    """Load the terms that should never be changed from a CSV file with a search column.
+    
+    Args:
+        csv_file: Path to the CSV file
+        debug_mode: Whether to print debug information
+    
+    Returns:
+        list: List of protected terms (empty if the file is not found)
+    """
+    import pandas as pd
+    never_terms = []
+    if os.path.exists(csv_file):
+        never_df = pd.read_csv(csv_file)
+        never_terms = never_df['search'].tolist()
+        if debug_mode:
+            print(f"Loaded {len(never_terms)} never-replace terms from {csv_file}")
+    elif debug_mode:
+        print(f"No {csv_file} found, no terms will be protected")
+    
+    return never_terms
+
+def load_skip_folders(csv_file='patterns/skip_folders.csv', debug_mode=False):
+    """Load the folder names to skip during directory traversal from a CSV file with a folder_name column.
+    
+    Args:
+        csv_file: Path to the CSV file
+        debug_mode: Whether to print debug information
+    
+    Returns:
+        list: List of folder names (empty if the file is not found)
+    """
+    import pandas as pd
+    skip_folders = []
+    if os.path.exists(csv_file):
+        skip_df = pd.read_csv(csv_file)
+        skip_folders = skip_df['folder_name'].tolist()
+        if debug_mode:
+            print(f"Loaded {len(skip_folders)} folders to skip from {csv_file}")
+    elif debug_mode:
+        print(f"No {csv_file} found, no folders will be skipped")
+    
+    return skip_folders
+
 def protect_never_terms(text, never_terms, debug_mode=False):
     """Temporarily replace terms that should never be changed with placeholders.
     
@@ -73,25 +122,14 @@ def restore_never_terms(text, replacements_map):
     return result
 
 
-def word_boundary_replace(text, search_term, replace_term, debug_mode=False):
-    """Replace text using word boundaries to avoid partial word matches.
-    
-    This function ensures that search terms match complete words, not parts of
-    larger words. For example, "an" matches "an Microsoft" but not "than Microsoft".
-    
-    Intelligently applies word boundaries based on the structure of the search term:
-    - For pure words: applies \b on both sides
-    - For patterns with non-word characters (# [ etc): only applies \b where appropriate
-    - For multi-word patterns: applies \b to the first word to prevent partial matches
+def word_boundary_pattern(search_term):
+    """Build the regex pattern used by word_boundary_replace for a search term.
     
     Args:
-        text: The text to search in
         search_term: The term to search for
-        replace_term: The replacement term
-        debug_mode: Whether to print debug information
     
     Returns:
-        str: Text with word-boundary replacements made
+        str: Regex pattern with word boundaries where the term starts or ends with a word character
     """
     escaped_term = re.escape(search_term)
     
@@ -117,6 +155,30 @@ def word_boundary_replace(text, search_term, replace_term, debug_mode=False):
         # Rebuild pattern with explicit word boundary after first word
         pattern = r'\b' + re.escape(first_word) + r'\b' + re.escape(rest)
     
+    return pattern
+
+def word_boundary_replace(text, search_term, replace_term, debug_mode=False):
+    """Replace text using word boundaries to avoid partial word matches.
+    
+    This function ensures that search terms match complete words, not parts of
+    larger words. For example, "an" matches "an Microsoft" but not "than Microsoft".
+    
+    Intelligently applies word boundaries based on the structure of the search term:
+    - For pure words: applies \b on both sides
+    - For patterns with non-word characters (# [ etc): only applies \b where appropriate
+    - For multi-word patterns: applies \b to the first word to prevent partial matches
+    
+    Args:
+        text: The text to search in
+        search_term: The term to search for
+        replace_term: The replacement term
+        debug_mode: Whether to print debug information
+    
+    Returns:
+        str: Text with word-boundary replacements made
+    """
+    pattern = word_boundary_pattern(search_term)
+    
     # Count matches before replacement for debug info
     matches_before = len(re.findall(pattern, text))
     
@@ -129,7 +191,216 @@ def word_boundary_replace(text, search_term, replace_term, debug_mode=False):
     return result
 
 
-def safe_replace(text, search_term, replace_term, max_replacements=None, debug_mode=False):
+# Keywords that mark a parenthetical as a historical reference, like "(formerly Azure AI Services)"
+FORMERLY_KEYWORDS = ('formerly', 'previously', 'originally')
+
+def load_formerly_keywords(csv_file, debug_mode=False):
+    """Load the keywords that mark 'formerly' contexts from a CSV file with a keyword column.
+    
+    Args:
+        csv_file: Path to the CSV file
+        debug_mode: Whether to print debug information
+    
+    Returns:
+        tuple: Keywords to use, or the default FORMERLY_KEYWORDS if the file is not found
+    """
+    import pandas as pd
+    if not os.path.exists(csv_file):
+        if debug_mode:
+            print(f"No {csv_file} found, using default 'formerly' keywords")
+        return FORMERLY_KEYWORDS
+    
+    df = pd.read_csv(csv_file)
+    keywords = tuple(str(keyword).strip() for keyword in df['keyword'].dropna() if str(keyword).strip())
+    if debug_mode:
+        print(f"Loaded {len(keywords)} 'formerly' keywords from {csv_file}")
+    return keywords
+
+class FormerlyIndex:
+    """Index of the parenthetical 'formerly' contexts in a document.
+    
+    The document is scanned once for parenthetical groups that contain a keyword.
+    A term is preserved when it occurs in a group that also has the term somewhere
+    after the keyword, like "(formerly known as Azure AI Services)". Every rule
+    queries the same index instead of running its own regex over the document.
+    """
+    
+    def __init__(self, text, keywords=FORMERLY_KEYWORDS):
+        self.starts = []
+        self.ends = []
+        # Lowercased text after the keyword, up to the closing parenthesis
+        self._tails = []
+        self._active = {}
+        
+        keywords = [keyword.lower() for keyword in keywords]
+        segment_start = 0
+        close = text.find(')')
+        while close != -1:
+            # A group runs from the first '(' after the previous ')' to this ')'
+            open_pos = text.find('(', segment_start, close)
+            if open_pos != -1:
+                group = text[open_pos + 1:close].lower()
+                keyword_ends = [group.find(keyword) + len(keyword) for keyword in keywords if keyword in group]
+                if keyword_ends:
+                    self.starts.append(open_pos)
+                    self.ends.append(close + 1)
+                    self._tails.append(group[min(keyword_ends):])
+            segment_start = close + 1
+            close = text.find(')', segment_start)
+    
+    def has_context(self, search_term):
+        """Return True if any group preserves the term."""
+        return any(self._is_active(i, search_term) for i in range(len(self.starts)))
+    
+    def is_preserved(self, search_term, start):
+        """Return True if an occurrence of the term at start is inside a 'formerly' context."""
+        i = bisect.bisect_right(self.starts, start) - 1
+        if i < 0 or start >= self.ends[i]:
+            return False
+        return self._is_active(i, search_term)
+    
+    def _is_active(self, i, search_term):
+        key = (i, search_term)
+        if key not in self._active:
+            self._active[key] = search_term.lower() in self._tails[i]
+        return self._active[key]
+
+@functools.lru_cache(maxsize=64)
+def get_formerly_index(text, keywords=FORMERLY_KEYWORDS):
+    """Return the FormerlyIndex of a text, reusing it while the text is unchanged."""
+    return FormerlyIndex(text, keywords)
+
+def formerly_term_spans(text, search_term, keywords=FORMERLY_KEYWORDS):
+    r"""Find the 'formerly' contexts of a term that contains ')' in linear time.
+    
+    Returns the spans the regex r'\([^)]*(?:keywords)[^)]*TERM[^)]*\)' would find
+    (ignoring case) without its backtracking, which grows with the square of the
+    length of an unclosed parenthetical. Before its own first ')', the term has to
+    end right at the first ')' after the '(', so every '(' has one possible place
+    for the term, and the text between them is searched for a keyword once.
+    
+    Args:
+        text: The text to search in
+        search_term: The term, containing ')'
+        keywords: Keywords that mark 'formerly' contexts
+    
+    Returns:
+        list: (start, end) spans of the contexts in document order, from '(' to the closing ')'
+    """
+    term = search_term.lower()
+    head_length = term.index(')')
+    keywords = [keyword.lower() for keyword in keywords]
+    spans = []
+    position = 0
+    while True:
+        open_pos = text.find('(', position)
+        if open_pos == -1:
+            break
+        close = text.find(')', open_pos)
+        if close == -1:
+            break
+        # Only the first '(' of a segment can start a match: later ones see less of it
+        term_start = close - head_length
+        term_end = term_start + len(term)
+        if term_start > open_pos and text[term_start:term_end].lower() == term:
+            group = text[open_pos + 1:term_start].lower()
+            group_end = text.find(')', term_end)
+            if group_end != -1 and any(keyword in group for keyword in keywords):
+                spans.append((open_pos, group_end + 1))
+                position = group_end + 1
+                continue
+        position = close + 1
+    return spans
+
+def find_safe_matches(text, search_term, formerly_keywords=None):
+    """Find occurrences of a term that are not inside 'formerly' contexts.
+    
+    Args:
+        text: The text to search in
+        search_term: The term to search for
+        formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+    
+    Returns:
+        tuple: (safe_matches, preserved_count) where safe_matches is a list of (start, end)
+               spans in document order
+    """
+    keywords = tuple(formerly_keywords) if formerly_keywords is not None else FORMERLY_KEYWORDS
+    
+    if ')' in search_term:
+        # A term with its own ')' can run across group boundaries, so find its contexts separately
+        formerly_matches = formerly_term_spans(text, search_term, keywords)
+        starts = [begin for begin, _ in formerly_matches]
+        def is_preserved(start):
+            i = bisect.bisect_right(starts, start) - 1
+            return i >= 0 and start < formerly_matches[i][1]
+    else:
+        formerly_index = get_formerly_index(text, keywords)
+        is_preserved = lambda start: formerly_index.is_preserved(search_term, start)
+    
+    safe_matches = []
+    preserved_count = 0
+    
+    start = text.find(search_term)
+    while start != -1:
+        end = start + len(search_term)
+        
+        # Check if this occurrence is inside a "formerly" context
+        if is_preserved(start):
+            preserved_count += 1
+        else:
+            safe_matches.append((start, end))
+        start = text.find(search_term, end)
+    
+    return safe_matches, preserved_count
+
+def replace_matches(text, matches, replacements, spans=None, offset=0):
+    """Replace the given matches of a term in one pass.
+    
+    Args:
+        text: The text to search in
+        matches: List of (start, end) spans to replace, in document order
+        replacements: One replacement string per match
+        spans: Optional list to append the (start, end) span of every replacement to,
+            in the coordinates of the returned text
+        offset: Added to the recorded spans, for text that is a part of a larger document
+    
+    Returns:
+        str: Text with the matches replaced
+    """
+    parts = []
+    last = 0
+    length = offset
+    for (start, end), replacement in zip(matches, replacements):
+        parts.append(text[last:start])
+        length += start - last
+        parts.append(replacement)
+        if spans is not None:
+            spans.append((length, length + len(replacement)))
+        length += len(replacement)
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+def replace_all(text, search_term, replace_term, spans=None, offset=0):
+    """Replace every occurrence of a term, like str.replace, recording the spans if asked.
+    
+    Args:
+        text: The text to search in
+        search_term: The term to search for
+        replace_term: The replacement term
+        spans: Optional list to append the spans of the replacements to (see replace_matches)
+        offset: Added to the recorded spans
+    
+    Returns:
+        str: Text with every occurrence replaced
+    """
+    if spans is None:
+        return text.replace(search_term, replace_term)
+    matches = [(match.start(), match.end()) for match in re.finditer(re.escape(search_term), text)]
+    return replace_matches(text, matches, [replace_term] * len(matches), spans, offset)
+
+def safe_replace(text, search_term, replace_term, max_replacements=None, debug_mode=False, formerly_keywords=None,
+                 spans=None):
     """Replace text while preserving occurrences in 'formerly' contexts.
     
     Args:
@@ -138,100 +409,105 @@ def safe_replace(text, search_term, replace_term, max_replacements=None, debug_m
         replace_term: The replacement term
         max_replacements: Maximum number of replacements (None for all)
         debug_mode: Whether to print debug information
+        formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+        spans: Optional list to append the (start, end) span of every replacement to
     
     Returns:
         str: Text with replacements made, except in 'formerly' contexts
     """
-    # Pattern to match "formerly/previously/originally" contexts
-    # Matches: (formerly ... search_term ...) or (previously ... search_term ...)
-    formerly_pattern = r'\([^)]*(?:formerly|previously|originally)[^)]*' + re.escape(search_term) + r'[^)]*\)'
-    
-    # Find all "formerly" contexts to preserve
-    formerly_matches = list(re.finditer(formerly_pattern, text, re.IGNORECASE))
+    keywords = tuple(formerly_keywords) if formerly_keywords is not None else FORMERLY_KEYWORDS
     
-    if not formerly_matches:
+    if ')' not in search_term and not get_formerly_index(text, keywords).has_context(search_term):
         # No "formerly" contexts, do normal replacement
         if max_replacements:
-            return text.replace(search_term, replace_term, max_replacements)
+            if spans is None:
+                return text.replace(search_term, replace_term, max_replacements)
+            matches = [(match.start(), match.end()) for match in re.finditer(re.escape(search_term), text)]
+            return replace_matches(text, matches[:max_replacements], [replace_term] * max_replacements, spans)
         else:
-            return text.replace(search_term, replace_term)
+            return replace_all(text, search_term, replace_term, spans)
     
     # There are "formerly" contexts - need to be careful
-    # Find all occurrences of search_term, process from end to beginning
-    all_matches = list(re.finditer(re.escape(search_term), text))
-    all_matches.reverse()  # Process from end to preserve positions
+    safe_matches, preserved_count = find_safe_matches(text, search_term, keywords)
     
-    result = text
-    replacements_made = 0
-    preserved_count = 0
-    
-    for match in all_matches:
-        start, end = match.span()
-        
-        # Check if this occurrence is inside a "formerly" context
-        in_formerly_context = any(
-            formerly_match.start() <= start < formerly_match.end()
-            for formerly_match in formerly_matches
-        )
-        
-        if in_formerly_context:
-            preserved_count += 1
-        else:
-            # Safe to replace this occurrence
-            if max_replacements is None or replacements_made < max_replacements:
-                result = result[:start] + replace_term + result[end:]
-                replacements_made += 1
+    # Only the last max_replacements safe occurrences are replaced
+    if max_replacements is not None:
+        safe_matches = safe_matches[max(0, len(safe_matches) - max_replacements):]
+    result = replace_matches(text, safe_matches, [replace_term] * len(safe_matches), spans)
     
     if debug_mode and preserved_count > 0:
         print(f"    Preserved {preserved_count} '{search_term}' in 'formerly' contexts")
     
     return result
 
-def first_mention_replace_in_body(text, search_term, first_replace, subsequent_replace, debug_mode=False):
-    """Replace occurrences with metadata/title getting first_replace, body getting first mention logic.
+def split_markdown_sections(text):
+    """Split markdown text into its YAML front matter, title heading and body.
     
     Args:
-        text: The full markdown text to search in
-        search_term: The term to search for
-        first_replace: Replacement for metadata, title, and first occurrence in body
-        subsequent_replace: Replacement for subsequent occurrences in body only
-        debug_mode: Whether to print debug information
+        text: The full markdown text
     
     Returns:
-        str: Text with metadata and title using first_replace, body using first mention logic,
-             except occurrences in 'formerly' contexts which are preserved
+        tuple: (metadata, title_section, body) where metadata keeps its '---' delimiters.
+               Concatenating the three parts gives back the original text.
     """
-    import re
-    
-    # Split content into metadata, title, and body sections
     metadata = ""
-    title_section = ""
     body_content = text
     
     # Handle YAML front matter
     if text.startswith('---'):
         parts = text.split('---', 2)
         if len(parts) >= 3:
-            metadata_content = parts[1]
+            metadata = f"---{parts[1]}---"
             body_content = parts[2]
-            
-            # Replace ALL occurrences in metadata with first_replace
-            metadata_content = metadata_content.replace(search_term, first_replace)
-            metadata = f"---{metadata_content}---"
     
     # Find the title (first # heading) in the body content
+    title_section = ""
     title_match = re.match(r'^(\s*#[^#\n]*\n)', body_content, re.MULTILINE)
     if title_match:
         title_section = title_match.group(1)
-        actual_body = body_content[len(title_section):]
-        
-        # Replace ALL occurrences in title with first_replace
-        title_section = title_section.replace(search_term, first_replace)
-    else:
-        actual_body = body_content
+        body_content = body_content[len(title_section):]
+    
+    return metadata, title_section, body_content
+
+def first_mention_replace_in_body(text, search_term, first_replace, subsequent_replace, debug_mode=False, mentioned_before=None, formerly_keywords=None,
+                                  spans=None):
+    """Replace occurrences with metadata/title getting first_replace, body getting first mention logic.
+    
+    Args:
+        text: The full markdown text to search in
+        search_term: The term to search for
+        first_replace: Replacement for metadata, title, and first occurrence in body
+        subsequent_replace: Replacement for subsequent occurrences in body only
+        debug_mode: Whether to print debug information
+        mentioned_before: Offset in text from which the term counts as already mentioned,
+            for example by an included file rendered earlier on the page (None if never)
+        formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+        spans: Optional list to append the (start, end) span of every replacement to
+    
+    Returns:
+        str: Text with metadata and title using first_replace, body using first mention logic,
+             except occurrences in 'formerly' contexts which are preserved
+    """
+    metadata, title_section, actual_body = split_markdown_sections(text)
+    
+    # Make the offset relative to the body
+    if mentioned_before is not None:
+        mentioned_before = max(0, mentioned_before - len(metadata) - len(title_section))
+    
+    # Replace ALL occurrences in metadata with first_replace
+    if metadata:
+        metadata = f"---{replace_all(metadata[3:-3], search_term, first_replace, spans, 3)}---"
+    
+    # Replace ALL occurrences in title with first_replace
+    title_section = replace_all(title_section, search_term, first_replace, spans, len(metadata))
     
     # Apply first mention logic only to the actual body (after metadata and title)
-    processed_body = first_mention_replace(actual_body, search_term, first_replace, subsequent_replace, debug_mode)
+    body_spans = [] if spans is not None else None
+    processed_body = first_mention_replace(actual_body, search_term, first_replace, subsequent_replace, debug_mode,
+                                           mentioned_before, formerly_keywords, body_spans)
+    if spans is not None:
+        body_offset = len(metadata) + len(title_section)
+        spans.extend((start + body_offset, end + body_offset) for start, end in body_spans)
     
     # Reconstruct the full text
     result = metadata + title_section + processed_body
@@ -248,7 +524,8 @@ def first_mention_replace_in_body(text, search_term, first_replace, subsequent_r
     
     return result
 
-def first_mention_replace(text, search_term, first_replace, subsequent_replace, debug_mode=False):
+def first_mention_replace(text, search_term, first_replace, subsequent_replace, debug_mode=False, mentioned_before=None, formerly_keywords=None,
+                          spans=None):
     """Replace the first occurrence of a term differently from subsequent occurrences.
     Preserves occurrences in 'formerly' contexts (does not replace them).
     
@@ -258,62 +535,33 @@ def first_mention_replace(text, search_term, first_replace, subsequent_replace,
         first_replace: Replacement for the first occurrence
         subsequent_replace: Replacement for subsequent occurrences
         debug_mode: Whether to print debug information
+        mentioned_before: Offset from which the term counts as already mentioned, so a first
+            occurrence at or after it gets subsequent_replace (None if never)
+        formerly_keywords: Keywords that mark 'formerly' contexts (None for the defaults)
+        spans: Optional list to append the (start, end) span of every replacement to
     
     Returns:
         str: Text with first occurrence replaced with first_replace, others with subsequent_replace,
              except occurrences in 'formerly' contexts which are preserved
     """
-    import re
-    
-    # Pattern to match "formerly/previously/originally" contexts
-    # Matches: (formerly ... search_term ...) or (previously ... search_term ...)
-    formerly_pattern = r'\([^)]*(?:formerly|previously|originally)[^)]*' + re.escape(search_term) + r'[^)]*\)'
-    
-    # Find all "formerly" contexts to preserve
-    formerly_matches = list(re.finditer(formerly_pattern, text, re.IGNORECASE))
-    
-    # Find all occurrences of the search term
-    all_matches = list(re.finditer(re.escape(search_term), text))
-    
-    if not all_matches:
-        return text
-    
-    # Filter out matches that are inside "formerly" contexts
-    safe_matches = []
-    preserved_count = 0
-    
-    for match in all_matches:
-        start, end = match.span()
-        
-        # Check if this occurrence is inside a "formerly" context
-        in_formerly_context = any(
-            formerly_match.start() <= start < formerly_match.end()
-            for formerly_match in formerly_matches
-        )
-        
-        if in_formerly_context:
-            preserved_count += 1
-        else:
-            safe_matches.append(match)
+    safe_matches, preserved_count = find_safe_matches(text, search_term, formerly_keywords)
     
     if not safe_matches:
         if debug_mode and preserved_count > 0:
             print(f"    Preserved all {preserved_count} '{search_term}' in 'formerly' contexts")
         return text
     
-    # Process safe matches from end to beginning to preserve positions
-    result = text
-    for i, match in enumerate(reversed(safe_matches)):
-        start, end = match.span()
-        # The first occurrence is the last one we process (index len-1 when reversed)
-        is_first = (len(safe_matches) - 1 - i) == 0
-        
-        replacement = first_replace if is_first else subsequent_replace
-        result = result[:start] + replacement + result[end:]
+    # The first occurrence only gets the long form if nothing earlier introduced the term
+    first_is_mention = mentioned_before is None or safe_matches[0][0] < mentioned_before
+    
+    replacements = [subsequent_replace] * len(safe_matches)
+    if first_is_mention:
+        replacements[0] = first_replace
+    result = replace_matches(text, safe_matches, replacements, spans)
     
     if debug_mode:
-        first_count = 1 if safe_matches else 0
-        subsequent_count = len(safe_matches) - 1 if len(safe_matches) > 1 else 0
+        first_count = 1 if first_is_mention else 0
+        subsequent_count = len(safe_matches) - first_count
         if first_count > 0:
             print(f"    First mention: '{search_term}' → '{first_replace}'")
         if subsequent_count > 0:
@@ -333,6 +581,7 @@ def load_first_mention_csv(csv_file, debug_mode=False):
     Returns:
         list: List of (term, first_replace, subsequent_replace) tuples
     """
+    import pandas as pd
     replacements = []
     if os.path.exists(csv_file):
         df = pd.read_csv(csv_file)
@@ -345,105 +594,3 @@ def load_first_mention_csv(csv_file, debug_mode=False):
             print(f"No {csv_file} found, no first mention replacements will be applied")
     
     return replacements
-
-def generate_article_cleanup_rules(always_csv_path, debug_mode=False):
-    """Generate 'an X' -> 'a X' cleanup rules from always.csv patterns.
-    
-    Finds patterns in always.csv where "Azure AI X" becomes just "X" and generates
-    article cleanup rules for "an X" -> "a X" variations.
-    
-    Args:
-        always_csv_path: Path to the always.csv file
-        debug_mode: Whether to print debug information
-    
-    Returns:
-        list: List of (search, replace) tuples for article cleanup
-    """
-    if not os.path.exists(always_csv_path):
-        if debug_mode:
-            print(f"Warning: {always_csv_path} not found")
-        return []
-    
-    df = pd.read_csv(always_csv_path)
-    cleanup_rules = []
-    
-    # Find patterns where "Azure X" becomes just "X" (single word)
-    for _, row in df.iterrows():
-        search_term = row['search']
-        replace_term = row['replace']
-        
-        # Skip if not an Azure pattern
-        if not search_term.startswith('Azure '):
-            continue
-            
-        # Extract the service name after "Azure "
-        service_name = search_term[6:]  # Remove "Azure " prefix
-        
-        # Check if replacement is just the service name (single word, no spaces)
-        # This indicates "Azure X" -> "X" pattern
-        if replace_term == service_name and ' ' not in service_name:
-            # Generate article cleanup variations
-            variations = [
-                (f"an {service_name}", f"a {service_name}"),
-                (f"An {service_name}", f"A {service_name}"),
-                (f"an [{service_name}", f"a [{service_name}"),
-                (f"An [{service_name}", f"A [{service_name}"),
-            ]
-            
-            cleanup_rules.extend(variations)
-            
-            if debug_mode:
-                print(f"Generated article cleanup rules for: {service_name}")
-    
-    return cleanup_rules
-
-def generate_first_mention_cleanup_rules(first_mention_csv_path, debug_mode=False):
-    """Generate 'an X' -> 'a X' cleanup rules from first_mention.csv patterns.
-    
-    Finds patterns in first_mention.csv where "Azure AI X" becomes just "X" in the 
-    subsequent_replace column and generates article cleanup rules for "an X" -> "a X" variations.
-    
-    Args:
-        first_mention_csv_path: Path to the first_mention.csv file
-        debug_mode: Whether to print debug information
-    
-    Returns:
-        list: List of (search, replace) tuples for article cleanup
-    """
-    if not os.path.exists(first_mention_csv_path):
-        if debug_mode:
-            print(f"Warning: {first_mention_csv_path} not found")
-        return []
-    
-    df = pd.read_csv(first_mention_csv_path)
-    cleanup_rules = []
-    
-    # Find patterns where "Azure X" becomes just "X" (single word) in subsequent_replace
-    for _, row in df.iterrows():
-        term = row['term']
-        subsequent_replace = row['subsequent_replace']
-        
-        # Skip if not an Azure pattern
-        if not term.startswith('Azure '):
-            continue
-            
-        # Extract the service name after "Azure "
-        service_name = term[6:]  # Remove "Azure " prefix
-        
-        # Check if subsequent replacement is just the service name (single word, no spaces)
-        # This indicates "Azure X" -> "X" pattern in subsequent mentions
-        if subsequent_replace == service_name and ' ' not in service_name:
-            # Generate article cleanup variations
-            variations = [
-                (f"an {service_name}", f"a {service_name}"),
-                (f"An {service_name}", f"A {service_name}"),
-                (f"an [{service_name}", f"a [{service_name}"),
-                (f"An [{service_name}", f"A [{service_name}"),
-            ]
-            
-            cleanup_rules.extend(variations)
-            
-            if debug_mode:
-                print(f"Generated article cleanup rules for: {service_name} (from first_mention.csv)")
-    
-    return cleanup_rules
\ No newline at end of file